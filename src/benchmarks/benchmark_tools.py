@@ -0,0 +1,18 @@
+# benchmark_tools.py
+#
+# Marché de référence et mesure des temps communs aux benchmarks.
+
+import time
+
+
+MARKET = dict(spot=100.0, strike=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+
+
+def best_time(function, repeat):
+    # Meilleur temps sur `repeat` exécutions, et le résultat de la dernière
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
@@ -0,0 +1,66 @@
+# fused_kernel_benchmark.py
+#
+# Temps des pricers à chemins (barrière, lookback, autocall) en simulation vectorisée NumPy
+# et avec les noyaux fusionnés (fused=True), sur les paramètres par défaut des pricers
+# (barrière : 500k chemins x 200 pas). La première exécution compile les noyaux numba
+# (cache sur disque ensuite) ; elle est exclue des mesures. Lancer depuis src/ :
+#     python -m benchmarks.fused_kernel_benchmark
+
+import argparse
+
+import pandas as pd
+
+from benchmarks.benchmark_tools import MARKET, best_time
+from models.pricing_method.fused_kernels import NUMBA_AVAILABLE
+from models.pricing_method.monte_carlo import MonteCarloPricer
+
+
+AUTOCALL = dict(spot=100.0, maturity=5.0, rate=0.03, volatility=0.2, dividend_yield=0.01, coupon=5.0,
+                barrier_capital=65.0, barrier_early=100.0, barrier_coupon=80.0, frequency_per_year="quarterly")
+
+CASES = {
+    "barrier (down-and-out put, 500k x 200)": lambda fused, **options: MonteCarloPricer.price_barrier(
+        type_option="put", barrier_level=85.0, barrier_type="down-and-out", seed=0, fused=fused, **options,
+        **MARKET),
+    "barrier continuous (500k x 200)": lambda fused, **options: MonteCarloPricer.price_barrier(
+        type_option="put", barrier_level=85.0, barrier_type="down-and-out", monitoring="continuous", seed=0,
+        fused=fused, **options, **MARKET),
+    "lookback (floating call, 500k x 200)": lambda fused, **options: MonteCarloPricer.price_lookback(
+        type_option="call", strike_type="floating", seed=0, fused=fused, **options, **MARKET),
+    "autocall (phoenix quarterly 5y, 100k)": lambda fused, **options: MonteCarloPricer.price_autocall(
+        seed=0, fused=fused, **options, **AUTOCALL),
+}
+
+
+def run(repeat=3):
+    rows = []
+    for name, pricer in CASES.items():
+        # Compilation des noyaux (et chargement du cache numba) hors mesure
+        pricer(True)
+        time_numpy, result_numpy = best_time(lambda: pricer(False), repeat)
+        time_fused, result_fused = best_time(lambda: pricer(True), repeat)
+        # Pic mémoire mesuré à part : tracemalloc fausserait les temps
+        memory_numpy = pricer(False, measure_memory=True).peak_memory
+        memory_fused = pricer(True, measure_memory=True).peak_memory
+        rows.append({
+            "Case": name,
+            "NumPy (s)": time_numpy,
+            "Fused (s)": time_fused,
+            "Speed-up": time_numpy / time_fused,
+            "Price NumPy": float(result_numpy),
+            "Price fused": float(result_fused),
+            "Std. Error": result_numpy.std_error,
+            "Peak MB NumPy": memory_numpy / 1e6,
+            "Peak MB fused": memory_fused / 1e6,
+        })
+    return pd.DataFrame(rows).set_index("Case")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    print(f"numba available: {NUMBA_AVAILABLE}")
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(run(arguments.repeat).T)
@@ -0,0 +1,55 @@
+# precision_benchmark.py
+#
+# Débit des pricers Monte Carlo en float64 et en float32, sur les paramètres par défaut
+# de price_barrier et price_asian. Lancer depuis src/ :
+#     python -m benchmarks.precision_benchmark
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.benchmark_tools import MARKET, best_time
+from models.pricing_method.monte_carlo import MonteCarloPricer
+
+
+CASES = {
+    "barrier (down-and-out put, 500k x 200)": lambda dtype, **options: MonteCarloPricer.price_barrier(
+        type_option="put", barrier_level=85.0, barrier_type="down-and-out", seed=0, dtype=dtype, **options,
+        **MARKET),
+    "asian (arithmetic daily call, 50k x 365)": lambda dtype, **options: MonteCarloPricer.price_asian(
+        type_option="call", average_type="arithmetic", observation_frequency="daily", seed=0, dtype=dtype,
+        **options, **MARKET),
+}
+
+
+def run(repeat=3):
+    rows = []
+    for name, pricer in CASES.items():
+        time_64, result_64 = best_time(lambda: pricer(np.float64), repeat)
+        time_32, result_32 = best_time(lambda: pricer(np.float32), repeat)
+        # Pic mémoire mesuré à part : tracemalloc fausserait les temps
+        memory_64 = pricer(np.float64, measure_memory=True).peak_memory
+        memory_32 = pricer(np.float32, measure_memory=True).peak_memory
+        rows.append({
+            "Case": name,
+            "float64 (s)": time_64,
+            "float32 (s)": time_32,
+            "Speed-up": time_64 / time_32,
+            "Price float64": float(result_64),
+            "Price float32": float(result_32),
+            "Difference": float(result_32) - float(result_64),
+            "Std. Error": result_64.std_error,
+            "Peak MB float64": memory_64 / 1e6,
+            "Peak MB float32": memory_32 / 1e6,
+        })
+    return pd.DataFrame(rows).set_index("Case")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(run(arguments.repeat).T)
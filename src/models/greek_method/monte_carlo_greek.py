@@ -2,16 +2,19 @@
 import numpy as np
 import pandas as pd
 from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.path_model import GBMModel
 
 class MonteCarloGreek:
     def __init__(self, option):
         self.option = option
 
     @staticmethod
-    def montecarlo_asian_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield, average_type, observation_frequency, num_paths=100_000, time_steps=100, seed=None):
-        S_paths, W_shocks = MonteCarloPricer.simulate_gbm_euler(
+    def montecarlo_asian_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield, average_type, observation_frequency, num_paths=100_000, time_steps=100, seed=None,
+                                antithetic=False, moment_matching=False, cache=False):
+        S_paths, W_shocks = GBMModel.simulate_gbm_euler(
             S=spot, T=maturity, r=rate, sigma=volatility, q=dividend_yield,
-            num_paths=num_paths, time_steps=time_steps, seed=seed
+            num_paths=num_paths, time_steps=time_steps, seed=seed,
+            antithetic=antithetic, moment_matching=moment_matching, cache=cache
         )
         
         dt = maturity / time_steps
@@ -73,11 +76,13 @@ class MonteCarloGreek:
 
 
     @staticmethod
-    def montecarlo_lookback_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield, strike_type, num_paths=6000, time_steps=40, seed=None):
+    def montecarlo_lookback_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield, strike_type, num_paths=6000, time_steps=40, seed=None,
+                                   antithetic=False, moment_matching=False, cache=False):
 
-        S_paths, dW = MonteCarloPricer.simulate_gbm_euler(
+        S_paths, dW = GBMModel.simulate_gbm_euler(
             S=spot, T=maturity, r=rate, sigma=volatility, q=dividend_yield,
-            num_paths=num_paths, time_steps=time_steps, seed=seed)
+            num_paths=num_paths, time_steps=time_steps, seed=seed,
+            antithetic=antithetic, moment_matching=moment_matching, cache=cache)
 
         dt = maturity / time_steps
         discount = np.exp(-rate * maturity)
@@ -128,6 +133,28 @@ class MonteCarloGreek:
 
 
 
+    @staticmethod
+    def autocall_tables(evaluation):
+        # Mise en forme du résultat de MonteCarloPricer.evaluate_autocall
+
+        # Probabilité de remboursement à chaque date et de choper le coupon
+        tab_probability_distribution = pd.DataFrame({
+            'Maturity Prob.': (evaluation["redemption_probabilities"] * 100).round(2).astype(str) + " %",
+            'Coupon Prob.': (evaluation["coupon_probabilities"] * 100).round(2).astype(str) + " %"
+        }, index=evaluation["observation_times"])
+        
+        tab_probability_distribution.index.name = 'Obs.'
+
+        tab_info2 = pd.DataFrame({
+            'Forward at maturity': [evaluation["forward_at_maturity"]],
+            'Expected maturity': [evaluation["expected_maturity"]],
+            'Capital loss Probability':  [f"{round(evaluation['capital_loss_probability'] * 100, 2)} %"]
+
+        }, index=["Value"])  
+
+        return tab_probability_distribution, tab_info2
+
+    @staticmethod
     def proba_autocall(
             spot,     
             maturity,    
@@ -142,173 +169,18 @@ class MonteCarloGreek:
             frequency_per_year='semestrially',
             memory_feature=True,
             barriers_as_percentage=True,
-            num_paths=6000,
-            time_steps=250 ):
-
-        FREQUENCIES = {
-            'annually': 1,
-            'semestrially': 2,
-            'quarterly': 4,
-            'monthly': 12
-        }
-
-
-        if type_autocall == 'athena':
-            barrier_coupon = barrier_early 
-
-        if barriers_as_percentage:
-            barrier_capital_abs = spot * barrier_capital / 100
-            barrier_coupon_abs = spot * barrier_coupon / 100
-            barrier_early_abs = spot * barrier_early / 100
-        else:
-            barrier_capital_abs = barrier_capital
-            barrier_coupon_abs = barrier_coupon
-            barrier_early_abs = barrier_early
-
-        if frequency_per_year not in FREQUENCIES:
-            raise ValueError(f"Fréquence non reconnue : {frequency_per_year}. "
-                            f"Choisir parmi {list(FREQUENCIES.keys())}.")
-        
-        
-        obs_per_year = FREQUENCIES[frequency_per_year]
-
-        # Nombre total d'observations
-        total_observations = int(round(obs_per_year * maturity))
-
-        # Dates d'observation en fraction d'années
-        observation_times = [(k+1)/obs_per_year for k in range(total_observations)]
-
-        # Dates d'observation à date step
-        observation_indices = [int(round((t_obs*time_steps) / maturity)) for t_obs in observation_times]
-
-        S, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed=None)
-
-
-
-
-        def verif_coupon(S, time_to_analyse,observation_indices, histo_coupon, duree_vie, barrier_coupon_abs, maturity, rate, coupon):
-        
-
-            obs_idx = observation_indices.index(time_to_analyse)
-
-            for i in range(num_paths):
-                if S[i, time_to_analyse] >= barrier_coupon_abs and duree_vie[i] == observation_indices[-1]:
-
-                    histo_coupon[i, obs_idx] = 1
-
-
-            return histo_coupon
-            
-
-        def verif_remboursement(S, time_to_analyse, resultat, duree_vie, barrier_early_abs, maturity, rate, index):
-            
-            for i in range(num_paths):
-                if S[i, time_to_analyse] >= barrier_early_abs and duree_vie[i] == observation_indices[-1]:
-
-                    resultat[i] = spot * np.exp(rate * (maturity -observation_times[index]))
-                    duree_vie[i] = time_to_analyse
-
-
-            return resultat , duree_vie
-
-
-        def verif_capital(S, time_to_analyse, resultat, duree_vie, barrier_capital_abs, maturity, rate, index):
-            
-            nb_crash = 0
-
-            for i in range(len(S)):
-                if S[i, time_to_analyse] <= barrier_capital_abs and duree_vie[i] == observation_indices[-1]:
-
-                    resultat[i] = S[i, time_to_analyse] * np.exp(rate * (maturity - observation_times[index]))
-                    duree_vie[i] = time_to_analyse
-                    nb_crash += 1
-                    
-            return resultat , duree_vie, nb_crash
-            
-
-        def memory_app(arr):
-
-            transformed = arr.copy()
-            
-            for i in range(arr.shape[0]):  
-                count = 0  
-                
-                for j in range(arr.shape[1]):  
-                    if arr[i, j] == 1:
-
-                        transformed[i, j] = count + 1
-                        count = 0  
-                    elif arr[i, j] == 0:
-                        count += 1  
-            return transformed
-
-                
-        resultat = np.zeros(num_paths)
-        
-
-        duree_vie = np.full(num_paths, observation_indices[-1])
-
-
-        histo_coupon = np.zeros((num_paths, len(observation_indices)))
-
-        tabl_actualisation = np.zeros(len(observation_indices))
-
-        nb_crash = 0
-        count_loss = 0
-
-
-        i = 0
-
-        for time_to_analyse in observation_indices:
-
-            histo_coupon = verif_coupon(S, time_to_analyse,observation_indices, histo_coupon, duree_vie, barrier_coupon_abs, maturity, rate, coupon)
-
-            resultat, duree_vie = verif_remboursement(S, time_to_analyse, resultat, duree_vie, barrier_early_abs, maturity, rate, i)
-
-            resultat, duree_vie, nb_crash = verif_capital(S, time_to_analyse, resultat, duree_vie, barrier_capital_abs, maturity, rate, i)
-
-            count_loss += nb_crash
-            tabl_actualisation[i] = np.exp(rate * (maturity - observation_times[i]))
-
-            i += 1
-        
-
-        if memory_feature:
-            histo_coupon = memory_app(histo_coupon)
-    
-
-
-        # Probabilité de choper coupon
-        proba_coupon = np.sum(histo_coupon, axis=0)
-        proba_coupon = proba_coupon / num_paths
-
-        #Probabilité de survie
-        unique, counts = np.unique(duree_vie, return_counts=True)
-        maturity_proba = counts / num_paths
-
-        tab_probability_distribution = pd.DataFrame({
-            'Maturity Prob.': (maturity_proba * 100).round(2).astype(str) + " %",
-            'Coupon Prob.': (proba_coupon * 100).round(2).astype(str) + " %"
-        }, index=observation_times)
-        
-        tab_probability_distribution.index.name = 'Obs.'
-
-        # Maturité espérée
-        df =  maturity_proba * observation_times       
-        except_maturity = df.sum()
-
-        # Forward à maturité
-        forward_at_maturity = spot * np.exp((rate-dividend_yield) * (maturity))
-
-        # Probabilité de perte en capital
-        prob_loss = count_loss / num_paths
-
-    
-        tab_info2 = pd.DataFrame({
-            'Forward at maturity': [forward_at_maturity],
-            'Expected maturity': [except_maturity],
-            'Capital loss Probability':  [f"{round(prob_loss * 100, 2)} %"]
-
-        }, index=["Value"])  
-
-        return tab_probability_distribution, tab_info2
+            num_paths=100000,
+            seed=None,
+            n_jobs=1,
+            antithetic=False,
+            moment_matching=False ):
+
+        evaluation = MonteCarloPricer.evaluate_autocall(
+            spot, maturity, rate, volatility, dividend_yield, coupon,
+            barrier_capital, barrier_early, barrier_coupon,
+            type_autocall=type_autocall, frequency_per_year=frequency_per_year,
+            memory_feature=memory_feature, barriers_as_percentage=barriers_as_percentage,
+            num_paths=num_paths, seed=seed, n_jobs=n_jobs,
+            antithetic=antithetic, moment_matching=moment_matching)
+
+        return MonteCarloGreek.autocall_tables(evaluation)
@@ -10,8 +10,10 @@ from models.greek_method.monte_carlo_greek import MonteCarloGreek
 
 
 class AsianOption(ExoticOption):
-    def __init__(self, average_type: str, observation_frequency=None, **kwargs):
+    def __init__(self, average_type: str, observation_frequency=None, first_block=None, **kwargs):
         self.observation_frequency = observation_frequency  
+        # Mode progressif (cf. price_progressive), conservé par les copies des courbes
+        self.first_block = first_block
         super().__init__(exotic_type='asian', **kwargs)  
 
         if average_type not in ['arithmetic', 'geometric']:
@@ -22,8 +24,16 @@ class AsianOption(ExoticOption):
         self.average_type = average_type
         self.frequency = observation_frequency if average_type == 'arithmetic' else None
 
-    def price(self, num_paths=20000, time_steps=70):
-        return MonteCarloPricer.price_asian(
+    def price(self, num_paths=20000, target_std_error=None, time_budget=None, control_variate=True,
+              seed=0, cache=True):
+        for price in self.price_progressive(num_paths, target_std_error, time_budget, control_variate, seed, cache):
+            pass
+        return price
+
+    def price_progressive(self, num_paths=20000, target_std_error=None, time_budget=None, control_variate=True,
+                          seed=0, cache=True):
+        # Estimations successives du prix ; une seule si first_block est None
+        return MonteCarloPricer.price_asian_progressive(
             type_option=self.type_option,
             spot=self.spot,
             strike=self.strike,
@@ -34,10 +44,16 @@ class AsianOption(ExoticOption):
             average_type=self.average_type,
             observation_frequency = self.observation_frequency,
             num_paths=num_paths,
-            time_steps=time_steps
+            first_block=self.first_block,
+            target_std_error=target_std_error,
+            time_budget=time_budget,
+            # L'asiatique géométrique sert de contrôle à la moyenne arithmétique
+            control_variate=control_variate and self.average_type == 'arithmetic',
+            seed=seed,
+            cache=cache
         )
 
-    def greek(self, num_paths=10000, time_steps=70, seed=None):
+    def greek(self, num_paths=10000, time_steps=70, seed=0, cache=True):
         return MonteCarloGreek.montecarlo_asian_greeks(
             type_option=self.type_option,
             spot=self.spot,
@@ -50,7 +66,8 @@ class AsianOption(ExoticOption):
             observation_frequency=self.observation_frequency,
             num_paths=num_paths,
             time_steps=time_steps,
-            seed=seed
+            seed=seed,
+            cache=cache
         )
 
 
@@ -7,7 +7,8 @@ from models.greek_method.monte_carlo_greek import MonteCarloGreek
 
 class AutoCallOption:
     def __init__(self, type_autocall, spot, rate, volatility, dividend_yield, frequency_per_year, coupon, barrier_capital, barrier_early,
-                 memory_feature,barrier_coupon,  maturity=5, num_paths=7000, time_steps=200, barriers_as_percentage=True, **kwargs):
+                 memory_feature,barrier_coupon,  maturity=5, num_paths=100000, barriers_as_percentage=True,
+                 target_std_error=None, time_budget=None, seed=0, cache=True, first_block=None, **kwargs):
         
         self.spot = spot
         self;type_autocall = type_autocall
@@ -24,58 +25,69 @@ class AutoCallOption:
         self.type_autocall = "call"
         self.memory_feature = memory_feature
         self.num_paths = num_paths
-        self.time_steps = time_steps
-
-
-
+        self.target_std_error = target_std_error
+        self.time_budget = time_budget
+        # Graine fixe : les copies à spot décalé (courbes lissées) réutilisent les chemins en cache
+        self.seed = seed
+        self.cache = cache
+        # Mode progressif (cf. evaluate_progressive), conservé par les copies des courbes
+        self.first_block = first_block
+
+
+
+
+    def evaluate(self):
+        for evaluation in self.evaluate_progressive():
+            pass
+        return evaluation
+
+    def evaluate_progressive(self):
+        # Prix et probabilités issus d'une même simulation, refaite uniquement si
+        # un paramètre du produit a changé (ex. copies modifiées par SmoothedGreek).
+        # Avec first_block, résultats successifs sur de plus en plus de chemins ;
+        # seul le dernier est conservé.
+        parameters = (self.spot, self.maturity, self.rate, self.volatility, self.dividend_yield,
+                      self.coupon, self.barrier_capital, self.barrier_early, self.barrier_coupon,
+                      self.type_autocall, self.frequency_per_year, self.memory_feature,
+                      self.barriers_as_percentage, self.num_paths, self.target_std_error, self.time_budget,
+                      self.seed, self.cache, self.first_block)
+
+        if getattr(self, "_evaluation_parameters", None) == parameters:
+            yield self._evaluation
+            return
+
+        for evaluation in MonteCarloPricer.evaluate_autocall_progressive(
+                spot=self.spot,
+                maturity=self.maturity,
+                rate=self.rate,
+                volatility=self.volatility,
+                dividend_yield=self.dividend_yield,
+                coupon=self.coupon,
+                barrier_capital=self.barrier_capital,
+                barrier_coupon=self.barrier_coupon,
+                barrier_early=self.barrier_early,
+                type_autocall=self.type_autocall,
+                frequency_per_year=self.frequency_per_year,  
+                memory_feature=self.memory_feature,
+                barriers_as_percentage=self.barriers_as_percentage,
+                num_paths= self.num_paths,
+                target_std_error=self.target_std_error,
+                time_budget=self.time_budget,
+                seed=self.seed,
+                cache=self.cache,
+                first_block=self.first_block
+            ):
+            yield evaluation
+
+        self._evaluation = evaluation
+        self._evaluation_parameters = parameters
 
     def price(self):
-        return MonteCarloPricer.price_autocall(
-            spot=self.spot,
-            maturity=self.maturity,
-            rate=self.rate,
-            volatility=self.volatility,
-            dividend_yield=self.dividend_yield,
-            coupon=self.coupon,
-            barrier_capital=self.barrier_capital,
-            barrier_coupon=self.barrier_coupon,
-            barrier_early=self.barrier_early,
-            type_autocall=self.type_autocall,
-            frequency_per_year=self.frequency_per_year,  
-            memory_feature=self.memory_feature,
-            barriers_as_percentage=self.barriers_as_percentage,
-            num_paths= self.num_paths,
-            time_steps= self.time_steps
-        )
-
-
+        return self.evaluate()["price"]
 
+    def price_progressive(self):
+        for evaluation in self.evaluate_progressive():
+            yield evaluation["price"]
 
     def prob_tab(self):
-        return MonteCarloGreek.proba_autocall(
-            spot=self.spot,
-            maturity=self.maturity,
-            rate=self.rate,
-            volatility=self.volatility,
-            dividend_yield=self.dividend_yield,
-            coupon=self.coupon,
-            barrier_capital=self.barrier_capital,
-            barrier_coupon=self.barrier_coupon,
-            barrier_early=self.barrier_early,
-            type_autocall=self.type_autocall,
-            frequency_per_year=self.frequency_per_year,  
-            memory_feature=self.memory_feature,
-            barriers_as_percentage=self.barriers_as_percentage,
-            num_paths= self.num_paths,
-            time_steps= self.time_steps
-        )
-
-
-
-
-
-
-
-
-
-
+        return MonteCarloGreek.autocall_tables(self.evaluate())
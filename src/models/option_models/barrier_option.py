@@ -1,7 +1,7 @@
 # barrier_option.py
 
 from models.option_models.exotic_option import ExoticOption
-from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.least_squares_monte_carlo import LongstaffSchwartzPricer
 from models.pricing_method.binomial_tree import BinomialTreePricer
 from models.greek_method.binomial_tree_greek import BinomialTreeGreek
 from models.pricing_method.black_scholes import BlackScholesPricer
@@ -20,9 +20,10 @@ class BarrierOption(ExoticOption):
         self.rebate = rebate
         self.type_exercise = type_exercise
 
-    def price(self, num_paths=10000, time_steps=60):
+    def price(self, num_paths=10000, time_steps=60, exercise_times=None, seed=0, cache=True):
         if self.type_exercise == "american":
-            return MonteCarloPricer.price_barrier(
+            # Exercice anticipé par régression (Longstaff-Schwartz), barrière observée sur la grille
+            return LongstaffSchwartzPricer.price_barrier_american(
                 type_option=self.type_option,
                 spot=self.spot,
                 strike=self.strike,
@@ -34,7 +35,10 @@ class BarrierOption(ExoticOption):
                 barrier_type=self.barrier_type,
                 rebate=self.rebate,
                 num_paths=num_paths,
-                time_steps=time_steps
+                time_steps=time_steps,
+                exercise_times=exercise_times,
+                seed=seed,
+                cache=cache
             )
         else:
             return BlackScholesPricer.price_barrier_euro(
@@ -17,7 +17,7 @@ class LookbackOption(ExoticOption):
         self.min_price_observed = min_price_observed
         self.max_price_observed = max_price_observed
 
-    def price(self, num_paths=10000, time_steps=60):
+    def price(self, num_paths=10000, time_steps=60, target_std_error=None, time_budget=None, seed=0, cache=True):
         return MonteCarloPricer.price_lookback(
             type_option=self.type_option,
             spot=self.spot,
@@ -28,13 +28,17 @@ class LookbackOption(ExoticOption):
             dividend_yield=self.dividend_yield,
             strike_type=self.strike_type,
             num_paths=num_paths,
-            time_steps=time_steps
+            time_steps=time_steps,
+            target_std_error=target_std_error,
+            time_budget=time_budget,
+            seed=seed,
+            cache=cache
         )
 
 
 
 
-    def greek(self, num_paths=10000, time_steps=70, seed=None):
+    def greek(self, num_paths=10000, time_steps=70, seed=0, cache=True):
         return MonteCarloGreek.montecarlo_lookback_greeks(
             type_option=self.type_option,
             spot=self.spot,
@@ -46,7 +50,8 @@ class LookbackOption(ExoticOption):
             strike_type=self.strike_type,
             num_paths=num_paths,
             time_steps=time_steps,
-            seed=seed
+            seed=seed,
+            cache=cache
         )
 
             
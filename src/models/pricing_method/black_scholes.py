@@ -22,6 +22,33 @@ class BlackScholesPricer:
         return price
     
 
+    def price_asian_geometric(S, K, T, r, sigma, q, observation_times, type_option):
+        # Asiatique géométrique à observations discrètes : log de la moyenne géométrique gaussien
+        times = np.sort(np.asarray(observation_times, dtype=float))
+        n = len(times)
+
+        mean_log = np.log(S) + (r - q - 0.5 * sigma**2) * np.mean(times)
+        # Var = sigma^2 / n^2 * somme_i somme_j min(t_i, t_j)
+        var_log = sigma**2 / n**2 * np.sum(times * (2 * (n - np.arange(n)) - 1))
+
+        if var_log <= 0:
+            average = np.exp(mean_log)
+            payoff = max(average - K, 0.0) if type_option == "call" else max(K - average, 0.0)
+            return np.exp(-r * T) * payoff
+
+        d2 = (mean_log - np.log(K)) / np.sqrt(var_log)
+        d1 = d2 + np.sqrt(var_log)
+        forward_average = np.exp(mean_log + 0.5 * var_log)
+
+        if type_option == "call":
+            price = np.exp(-r * T) * (forward_average * norm.cdf(d1) - K * norm.cdf(d2))
+        elif type_option == "put":
+            price = np.exp(-r * T) * (K * norm.cdf(-d2) - forward_average * norm.cdf(-d1))
+        else:
+            raise ValueError("type_option doit être 'call' ou 'put'.")
+        return price
+
+
     def price_option_digital(spot, strike, maturity, rate, volatility, cash_payout, type_option, barrier=None, barrier_type=None, dividend_yield=0.0):
 
      
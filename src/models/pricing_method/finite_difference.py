@@ -0,0 +1,129 @@
+# finite_difference.py
+
+import numpy as np
+from scipy.linalg import solve_banded
+
+
+class CrankNicolsonPricer:
+    # EDP de pricing en log-spot x = log S sous volatilité locale sigma(t, k), k = log(S / F(t)) :
+    #   V_t + sigma^2 / 2 V_xx + (r - q - sigma^2 / 2) V_x - r V = 0,
+    # résolue à rebours par Crank-Nicolson (systèmes tridiagonaux, plusieurs payoffs à la fois).
+    # Les premiers pas sont remplacés par des demi-pas implicites (lissage de Rannacher) pour
+    # amortir les oscillations dues au coude du payoff. Les barrières sont surveillées en continu
+    # et le rebate est versé à maturité, comme dans MonteCarloPricer.price_barrier.
+    # `model` fournit local_volatility(t, log_moneyness), ex. LocalVolatilityModel.
+
+    # Demi-largeur de la grille en écarts-types de la volatilité implicite la plus élevée
+    NUM_STD = 6.0
+    RANNACHER_STEPS = 2
+
+    @staticmethod
+    def reference_volatility(model):
+        return float(np.max(model.implied_vols))
+
+    @staticmethod
+    def solve(model, terminal, x, maturity, rate, dividend_yield, spot, lower_values, upper_values, time_steps):
+        # terminal : valeurs à maturité aux noeuds x, de forme (noeuds, colonnes).
+        # lower_values(tau), upper_values(tau) : conditions de Dirichlet aux bords, tau = temps restant.
+        h = x[1] - x[0]
+        dt = maturity / time_steps
+        V = np.array(terminal, dtype=float)
+        log_forward_0 = np.log(spot)
+
+        def operator(t):
+            sigma2 = model.local_volatility(t, x[1:-1] - log_forward_0 - (rate - dividend_yield) * t)**2
+            drift = rate - dividend_yield - 0.5 * sigma2
+            lower = 0.5 * sigma2 / h**2 - 0.5 * drift / h
+            diagonal = -sigma2 / h**2 - rate
+            upper = 0.5 * sigma2 / h**2 + 0.5 * drift / h
+            return lower, diagonal, upper
+
+        def step(V, t_start, step_dt, theta):
+            # De t_start + step_dt à t_start, coefficients pris au milieu du pas
+            lower, diagonal, upper = operator(t_start + 0.5 * step_dt)
+            tau = maturity - t_start
+            interior = V[1:-1]
+            rhs = interior + (1.0 - theta) * step_dt * (
+                lower[:, None] * V[:-2] + diagonal[:, None] * interior + upper[:, None] * V[2:])
+
+            V_new = np.empty_like(V)
+            V_new[0] = lower_values(tau)
+            V_new[-1] = upper_values(tau)
+            rhs[0] += theta * step_dt * lower[0] * V_new[0]
+            rhs[-1] += theta * step_dt * upper[-1] * V_new[-1]
+
+            banded = np.zeros((3, len(interior)))
+            banded[0, 1:] = -theta * step_dt * upper[:-1]
+            banded[1] = 1.0 - theta * step_dt * diagonal
+            banded[2, :-1] = -theta * step_dt * lower[1:]
+            V_new[1:-1] = solve_banded((1, 1), banded, rhs)
+            return V_new
+
+        for n in range(time_steps - 1, -1, -1):
+            t = n * dt
+            if n >= time_steps - CrankNicolsonPricer.RANNACHER_STEPS:
+                V = step(V, t + 0.5 * dt, 0.5 * dt, 1.0)
+                V = step(V, t, 0.5 * dt, 1.0)
+            else:
+                V = step(V, t, dt, 0.5)
+
+        return np.array([np.interp(log_forward_0, x, V[:, column]) for column in range(V.shape[1])])
+
+    @staticmethod
+    def grid(spot, maturity, model, space_steps, lower=None, upper=None):
+        half_width = CrankNicolsonPricer.NUM_STD * CrankNicolsonPricer.reference_volatility(model) * np.sqrt(maturity)
+        x_min = np.log(spot) - half_width if lower is None else np.log(lower)
+        x_max = np.log(spot) + half_width if upper is None else np.log(upper)
+        return np.linspace(x_min, x_max, space_steps + 1)
+
+    @staticmethod
+    def price_vanilla(type_option, spot, strike, maturity, rate, dividend_yield, model,
+                      space_steps=400, time_steps=200):
+        sign = 1.0 if type_option == "call" else -1.0
+        x = CrankNicolsonPricer.grid(spot, maturity, model, space_steps)
+        S = np.exp(x)
+
+        # Aux bords, payoff linéaire : valeur actualisée du payoff appliqué au forward
+        def edge(S_edge):
+            return lambda tau: np.array([
+                max(sign * (S_edge * np.exp(-dividend_yield * tau) - strike * np.exp(-rate * tau)), 0.0)])
+
+        return float(CrankNicolsonPricer.solve(
+            model, np.maximum(sign * (S - strike), 0.0)[:, None], x, maturity, rate, dividend_yield, spot,
+            edge(S[0]), edge(S[-1]), time_steps)[0])
+
+    @staticmethod
+    def price_barrier(type_option, spot, strike, maturity, rate, dividend_yield, barrier_level, barrier_type,
+                      model, rebate=0.0, space_steps=400, time_steps=200):
+        if barrier_type not in ("up-and-in", "up-and-out", "down-and-in", "down-and-out"):
+            raise ValueError("barrier_type must be 'up-and-in', 'up-and-out', 'down-and-in' or 'down-and-out'.")
+        up = "up" in barrier_type
+        knocked = spot >= barrier_level if up else spot <= barrier_level
+        vanilla = CrankNicolsonPricer.price_vanilla(
+            type_option, spot, strike, maturity, rate, dividend_yield, model, space_steps, time_steps)
+        if knocked:
+            return vanilla if "in" in barrier_type else rebate * np.exp(-rate * maturity)
+
+        sign = 1.0 if type_option == "call" else -1.0
+        x = CrankNicolsonPricer.grid(
+            spot, maturity, model, space_steps, lower=None if up else barrier_level, upper=barrier_level if up else None)
+        S = np.exp(x)
+
+        # Deux colonnes désactivées à la barrière : le payoff, et 1 (survie actualisée)
+        def far_edge(S_edge):
+            return lambda tau: np.array([
+                max(sign * (S_edge * np.exp(-dividend_yield * tau) - strike * np.exp(-rate * tau)), 0.0),
+                np.exp(-rate * tau)])
+
+        def barrier_edge(tau):
+            return np.zeros(2)
+
+        terminal = np.column_stack([np.maximum(sign * (S - strike), 0.0), np.ones_like(S)])
+        knock_out, survival = CrankNicolsonPricer.solve(
+            model, terminal, x, maturity, rate, dividend_yield, spot,
+            far_edge(S[0]) if up else barrier_edge, barrier_edge if up else far_edge(S[-1]), time_steps)
+
+        # Rebate versé à maturité si la barrière est touchée (out) ou jamais touchée (in)
+        if "out" in barrier_type:
+            return float(knock_out + rebate * (np.exp(-rate * maturity) - survival))
+        return float(vanilla - knock_out + rebate * survival)
@@ -0,0 +1,346 @@
+# fused_kernels.py
+
+import numpy as np
+
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.random_streams import RandomStreams
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba est optionnel : les simulations passent alors par les versions NumPy ci-dessous
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda function: function
+
+
+# Générateur à compteur : chaque chemin a son propre flux splitmix64, dérivé de la clé du bloc
+# et de son indice, transformé en gaussiennes par la méthode ziggurat (celle de NumPy : une
+# lecture de table et une comparaison pour 99 % des tirages). Le résultat ne dépend ni du nombre
+# de threads, ni de la présence de numba : noyaux compilés et versions NumPy tirent les mêmes nombres.
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+SHIFT_8 = np.uint64(8)
+SHIFT_9 = np.uint64(9)
+SHIFT_11 = np.uint64(11)
+SHIFT_27 = np.uint64(27)
+SHIFT_30 = np.uint64(30)
+SHIFT_31 = np.uint64(31)
+MASK_8 = np.uint64(0xFF)
+MASK_52 = np.uint64(0x000FFFFFFFFFFFFF)
+ONE = np.uint64(1)
+UNIT = 2.0**-53
+ZIGGURAT_TAIL = 3.6541528853610088
+
+
+def ziggurat_tables(layers=256, tail=ZIGGURAT_TAIL, area=0.00492867323399):
+    # Tables de Marsaglia-Tsang sur 52 bits : seuils d'acceptation K, largeurs W et densités F des couches
+    density = lambda x: np.exp(-0.5 * x * x)
+    scale = 2.0**52
+    K = np.zeros(layers, dtype=np.uint64)
+    W = np.zeros(layers)
+    F = np.zeros(layers)
+    x = previous = tail
+    base = area / density(tail)
+    K[0] = np.uint64(tail / base * scale)
+    W[0], W[-1] = base / scale, tail / scale
+    F[0], F[-1] = 1.0, density(tail)
+    for i in range(layers - 2, 0, -1):
+        x = np.sqrt(-2.0 * np.log(area / x + density(x)))
+        K[i + 1] = np.uint64(x / previous * scale)
+        previous = x
+        F[i] = density(x)
+        W[i] = x / scale
+    return K, W, F
+
+
+ZIGGURAT_K, ZIGGURAT_W, ZIGGURAT_F = ziggurat_tables()
+
+
+@njit(cache=True)
+def mix64(z):
+    # Fonction de mélange de splitmix64 (scalaire sous numba, tableau en NumPy)
+    z = (z ^ (z >> SHIFT_30)) * MIX_1
+    z = (z ^ (z >> SHIFT_27)) * MIX_2
+    return z ^ (z >> SHIFT_31)
+
+
+@njit(cache=True)
+def uniform(state):
+    # Avance le flux d'un tirage : (état, u) avec u uniforme sur [0, 1)
+    state = state + GOLDEN_GAMMA
+    return state, (mix64(state) >> SHIFT_11) * UNIT
+
+
+@njit(cache=True)
+def normal(state):
+    # Gaussienne par ziggurat : (état, z). Les rejets (coins des couches, queue au-delà
+    # de ZIGGURAT_TAIL) consomment des tirages supplémentaires du même flux.
+    while True:
+        state = state + GOLDEN_GAMMA
+        bits = mix64(state)
+        layer = bits & MASK_8
+        negative = (bits >> SHIFT_8) & ONE
+        magnitude = (bits >> SHIFT_9) & MASK_52
+        x = magnitude * ZIGGURAT_W[layer]
+        if negative:
+            x = -x
+        if magnitude < ZIGGURAT_K[layer]:
+            return state, x
+        if layer == 0:
+            while True:
+                state, u1 = uniform(state)
+                state, u2 = uniform(state)
+                excess = -np.log1p(-u1) / ZIGGURAT_TAIL
+                if -2.0 * np.log1p(-u2) > excess * excess:
+                    return state, -(ZIGGURAT_TAIL + excess) if negative else ZIGGURAT_TAIL + excess
+        state, u = uniform(state)
+        if (ZIGGURAT_F[layer - ONE] - ZIGGURAT_F[layer]) * u + ZIGGURAT_F[layer] < np.exp(-0.5 * x * x):
+            return state, x
+
+
+@njit(cache=True)
+def path_stream(key, path, half):
+    # Etat initial et signe des tirages du chemin `path` : en antithétique, le chemin
+    # half + i reprend le flux du chemin i au signe près (cf. MonteCarloEngine.standard_normals)
+    if path >= half:
+        return mix64(key ^ mix64(np.uint64(path - half))), -1.0
+    return mix64(key ^ mix64(np.uint64(path))), 1.0
+
+
+@njit(cache=True, parallel=True)
+def extrema_kernel(key, half, drift, diffusion, final, minimum, maximum):
+    for path in prange(final.shape[0]):
+        state, sign = path_stream(key, path, half)
+        log_return, log_min, log_max = 0.0, 0.0, 0.0
+        for step in range(drift.shape[0]):
+            state, z = normal(state)
+            log_return += drift[step] + diffusion[step] * sign * z
+            log_min = min(log_min, log_return)
+            log_max = max(log_max, log_return)
+        final[path] = np.exp(log_return)
+        minimum[path] = np.exp(log_min)
+        maximum[path] = np.exp(log_max)
+
+
+@njit(cache=True, parallel=True)
+def survival_kernel(key, half, drift, diffusion, log_barrier, direction, final, survival):
+    for path in prange(final.shape[0]):
+        state, sign = path_stream(key, path, half)
+        log_return = 0.0
+        distance = max(direction * log_barrier, 0.0)
+        alive = 1.0
+        for step in range(drift.shape[0]):
+            state, z = normal(state)
+            log_return += drift[step] + diffusion[step] * sign * z
+            next_distance = max(direction * (log_barrier - log_return), 0.0)
+            # Loin de la barrière la probabilité de franchissement est sous la précision du float64
+            exponent = -2.0 * distance * next_distance / diffusion[step]**2
+            if exponent > -40.0:
+                alive *= 1.0 - np.exp(exponent)
+            distance = next_distance
+        final[path] = np.exp(log_return)
+        survival[path] = alive
+
+
+@njit(cache=True, parallel=True)
+def paths_kernel(key, half, drift, diffusion, levels):
+    for path in prange(levels.shape[0]):
+        state, sign = path_stream(key, path, half)
+        log_return = 0.0
+        for step in range(drift.shape[0]):
+            state, z = normal(state)
+            log_return += drift[step] + diffusion[step] * sign * z
+            levels[path, step] = np.exp(log_return)
+
+
+class FusedKernels:
+    # Simulations GBM fusionnées : chaque chemin est généré pas à pas dans les registres et seul
+    # ce que le produit observe est écrit en mémoire (spot final et extrema, probabilité de survie,
+    # spots aux dates d'observation). Aucune matrice de tirages ni de chemins n'est matérialisée.
+    # Avec numba, les chemins sont répartis sur les threads (prange) ; sans numba, une version
+    # NumPy vectorisée sur les chemins tire les mêmes nombres pas à pas, en mémoire O(num_paths),
+    # mais plus lentement que la simulation vectorisée standard (ziggurat par masques).
+    # Calculs en float64 dans les registres, sorties au dtype demandé.
+    # Avec n_jobs > 1, limiter les threads de chaque processus (NUMBA_NUM_THREADS).
+
+    @staticmethod
+    def stream_setup(seed, num_paths, antithetic=False, moment_matching=False, sampling="pseudo"):
+        # Clé du bloc (un tirage du flux du bloc) et indice du premier chemin antithétique
+        if moment_matching or sampling != "pseudo":
+            raise ValueError("fused kernels support sampling='pseudo' without moment_matching.")
+        key = RandomStreams.generator(seed).integers(0, 2**64, dtype=np.uint64)
+        half = (num_paths + 1) // 2 if antithetic else num_paths
+        return key, half
+
+    @staticmethod
+    def numpy_streams(key, num_paths, half):
+        paths = np.arange(num_paths, dtype=np.uint64)
+        signs = np.ones(num_paths)
+        paths[half:] -= np.uint64(half)
+        signs[half:] = -1.0
+        return mix64(key ^ mix64(paths)), signs
+
+    @staticmethod
+    def ziggurat_round(state):
+        # Un essai du ziggurat sur tous les chemins : (état, z, accepté)
+        state = state + GOLDEN_GAMMA
+        bits = mix64(state)
+        layer = (bits & MASK_8).astype(np.intp)
+        negative = ((bits >> SHIFT_8) & ONE).astype(bool)
+        magnitude = (bits >> SHIFT_9) & MASK_52
+        x = magnitude * ZIGGURAT_W[layer]
+        np.negative(x, out=x, where=negative)
+        accepted = magnitude < ZIGGURAT_K[layer]
+
+        wedge = np.flatnonzero(~accepted & (layer > 0))
+        state[wedge], u = uniform(state[wedge])
+        F_low, F_high = ZIGGURAT_F[layer[wedge]], ZIGGURAT_F[layer[wedge] - 1]
+        accepted[wedge] = (F_high - F_low) * u + F_low < np.exp(-0.5 * x[wedge]**2)
+
+        tail = np.flatnonzero(~accepted & (layer == 0))
+        while tail.size:
+            state[tail], u1 = uniform(state[tail])
+            state[tail], u2 = uniform(state[tail])
+            excess = -np.log1p(-u1) / ZIGGURAT_TAIL
+            hit = -2.0 * np.log1p(-u2) > excess * excess
+            x[tail[hit]] = np.where(negative[tail[hit]], -1.0, 1.0) * (ZIGGURAT_TAIL + excess[hit])
+            accepted[tail[hit]] = True
+            tail = tail[~hit]
+        return state, x, accepted
+
+    @staticmethod
+    def numpy_normals(state):
+        # Ziggurat vectorisé sur les chemins, mêmes tirages que normal() : les rares rejets
+        # sont repris sur le seul sous-ensemble des chemins concernés
+        state, z, accepted = FusedKernels.ziggurat_round(state)
+        pending = np.flatnonzero(~accepted)
+        while pending.size:
+            state[pending], z[pending], accepted = FusedKernels.ziggurat_round(state[pending])
+            pending = pending[~accepted]
+        return state, z
+
+    @staticmethod
+    def numpy_increments(key, num_paths, half, drift, diffusion):
+        # Accroissements du log-spot pas à pas, identiques à ceux des noyaux compilés
+        state, signs = FusedKernels.numpy_streams(key, num_paths, half)
+        for step in range(len(drift)):
+            state, z = FusedKernels.numpy_normals(state)
+            z *= signs
+            z *= diffusion[step]
+            z += drift[step]
+            yield z
+
+    @staticmethod
+    def gbm_steps(r, sigma, q, times):
+        dt = np.diff(np.asarray(times, dtype=float), prepend=0.0)
+        if np.any(dt < 0):
+            raise ValueError("observation_times must be non-decreasing and non-negative.")
+        return (r - q - 0.5 * sigma**2) * dt, sigma * np.sqrt(dt)
+
+    @staticmethod
+    def gbm_extrema(S, T, r, sigma, q, num_paths, time_steps, seed=None, antithetic=False,
+                    moment_matching=False, dtype=np.float64, cache=False):
+        # Même sortie que GBMModel.simulate_gbm_extrema
+        if cache:
+            unit_extrema = MonteCarloEngine.cached_paths(
+                ("fused-extrema", T, r, sigma, q, num_paths, time_steps, antithetic, np.dtype(dtype).str), seed,
+                lambda: FusedKernels.gbm_extrema(
+                    1.0, T, r, sigma, q, num_paths, time_steps, seed, antithetic, moment_matching, dtype))
+            return tuple(MonteCarloEngine.scale_paths(unit_S, S) for unit_S in unit_extrema)
+
+        key, half = FusedKernels.stream_setup(seed, num_paths, antithetic, moment_matching)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        drift, diffusion = FusedKernels.gbm_steps(r, sigma, q, T * np.arange(1, time_steps + 1) / time_steps)
+        S = np.maximum(S, 1e-8)
+
+        if NUMBA_AVAILABLE:
+            extrema = tuple(np.empty(num_paths, dtype=dtype) for _ in range(3))
+            extrema_kernel(key, half, drift, diffusion, *extrema)
+            for S_values in extrema:
+                S_values *= dtype.type(S)
+            return extrema
+
+        log_return = np.zeros(num_paths)
+        log_min = np.zeros(num_paths)
+        log_max = np.zeros(num_paths)
+        for increment in FusedKernels.numpy_increments(key, num_paths, half, drift, diffusion):
+            log_return += increment
+            np.minimum(log_min, log_return, out=log_min)
+            np.maximum(log_max, log_return, out=log_max)
+        return tuple((S * np.exp(log_values)).astype(dtype, copy=False)
+                     for log_values in (log_return, log_min, log_max))
+
+    @staticmethod
+    def gbm_barrier_survival(S, T, r, sigma, q, num_paths, time_steps, barrier_level, up, seed=None,
+                             antithetic=False, moment_matching=False, dtype=np.float64, cache=False):
+        # Même sortie que GBMModel.simulate_gbm_barrier_survival
+        if cache:
+            moneyness = barrier_level / np.maximum(S, 1e-8)
+            unit_final, survival = MonteCarloEngine.cached_paths(
+                ("fused-survival", T, r, sigma, q, num_paths, time_steps, moneyness, up, antithetic,
+                 np.dtype(dtype).str), seed,
+                lambda: FusedKernels.gbm_barrier_survival(
+                    1.0, T, r, sigma, q, num_paths, time_steps, moneyness, up, seed, antithetic,
+                    moment_matching, dtype))
+            return MonteCarloEngine.scale_paths(unit_final, S), survival
+
+        key, half = FusedKernels.stream_setup(seed, num_paths, antithetic, moment_matching)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        drift, diffusion = FusedKernels.gbm_steps(r, sigma, q, T * np.arange(1, time_steps + 1) / time_steps)
+        S = np.maximum(S, 1e-8)
+        log_barrier = float(np.log(barrier_level / S))
+        direction = 1.0 if up else -1.0
+
+        if NUMBA_AVAILABLE:
+            final = np.empty(num_paths, dtype=dtype)
+            survival = np.empty(num_paths, dtype=dtype)
+            survival_kernel(key, half, drift, diffusion, log_barrier, direction, final, survival)
+            final *= dtype.type(S)
+            return final, survival
+
+        log_return = np.zeros(num_paths)
+        distance = np.full(num_paths, max(direction * log_barrier, 0.0))
+        survival = np.ones(num_paths)
+        for step, increment in enumerate(FusedKernels.numpy_increments(key, num_paths, half, drift, diffusion)):
+            log_return += increment
+            next_distance = np.maximum(direction * (log_barrier - log_return), 0.0)
+            crossing = distance * next_distance
+            crossing *= -2.0 / diffusion[step]**2
+            np.exp(crossing, out=crossing)
+            survival *= 1.0 - crossing
+            distance = next_distance
+        return (S * np.exp(log_return)).astype(dtype, copy=False), survival.astype(dtype, copy=False)
+
+    @staticmethod
+    def gbm_paths(S, r, sigma, q, observation_times, num_paths, seed=None, antithetic=False,
+                  moment_matching=False, sampling="pseudo", dtype=np.float64, cache=False):
+        # Même sortie que GBMModel.simulate_gbm_exact : spots aux seules dates d'observation
+        if cache:
+            (unit_paths,) = MonteCarloEngine.cached_paths(
+                ("fused-paths", r, sigma, q, tuple(observation_times), num_paths, antithetic,
+                 np.dtype(dtype).str), seed,
+                lambda: (FusedKernels.gbm_paths(
+                    1.0, r, sigma, q, observation_times, num_paths, seed, antithetic, moment_matching,
+                    sampling, dtype),))
+            return MonteCarloEngine.scale_paths(unit_paths, S)
+
+        key, half = FusedKernels.stream_setup(seed, num_paths, antithetic, moment_matching, sampling)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        drift, diffusion = FusedKernels.gbm_steps(r, sigma, q, observation_times)
+        S = np.maximum(S, 1e-8)
+
+        levels = np.empty((num_paths, len(drift)), dtype=dtype)
+        if NUMBA_AVAILABLE:
+            paths_kernel(key, half, drift, diffusion, levels)
+        else:
+            log_return = np.zeros(num_paths)
+            for step, increment in enumerate(FusedKernels.numpy_increments(key, num_paths, half, drift, diffusion)):
+                log_return += increment
+                np.exp(log_return, out=levels[:, step], casting="same_kind")
+        levels *= dtype.type(S)
+        return levels
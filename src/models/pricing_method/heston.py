@@ -0,0 +1,103 @@
+# heston.py
+
+import numpy as np
+from scipy.special import ndtr
+
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.path_model import PathModel
+
+
+class HestonModel(PathModel):
+    # Volatilité stochastique de Heston :
+    #   dS / S = (r - q) dt + sqrt(v) dW1,   dv = kappa (theta - v) dt + xi sqrt(v) dW2,   d<W1, W2> = rho dt.
+    # Discrétisation QE d'Andersen (2008) : la variance suit une loi quadratique-gaussienne ou
+    # exponentielle-Dirac selon psi = s^2 / m^2, le log-spot est intégré avec correction de martingale.
+    # Tout en vecteurs sur les chemins : seule la boucle sur les pas de temps reste en Python.
+
+    # Seuil de bascule entre les deux lois de la variance
+    PSI_CRITICAL = 1.5
+
+    def __init__(self, v0, kappa, theta, xi, rho, max_step=1 / 12):
+        # max_step : pas maximal entre deux dates d'observation éloignées (autocall) ; le schéma QE
+        # reste précis avec des pas de l'ordre du mois.
+        if min(v0, theta) < 0 or kappa <= 0 or xi <= 0:
+            raise ValueError("Heston parameters require v0, theta >= 0 and kappa, xi > 0.")
+        if not -1 <= rho <= 1:
+            raise ValueError("rho must lie in [-1, 1].")
+        if max_step <= 0:
+            raise ValueError("max_step must be positive.")
+        self.v0 = float(v0)
+        self.kappa = float(kappa)
+        self.theta = float(theta)
+        self.xi = float(xi)
+        self.rho = float(rho)
+        self.max_step = float(max_step)
+
+    def key(self):
+        # Identifiant du modèle dans les clés du cache de chemins
+        return ("heston", self.v0, self.kappa, self.theta, self.xi, self.rho, self.max_step)
+
+    def log_increments(self, rng, grid, num_paths, r, q, antithetic=False, moment_matching=False,
+                       dtype=np.float64):
+        # Accroissements du log-spot pas à pas, de forme (num_paths,) : la variance courante est
+        # le seul état conservé. Deux gaussiennes par pas (variance, spot) ; l'uniforme de la
+        # branche exponentielle est Phi(Z_v), ce qui préserve le couplage antithétique.
+        # La branche quadratique est évaluée sur tous les chemins, l'exponentielle (psi > 1.5,
+        # variance proche de 0) seulement sur les chemins concernés.
+        kappa, theta, xi, rho = self.kappa, self.theta, self.xi, self.rho
+        v = np.full(num_paths, self.v0, dtype=dtype)
+
+        # Constantes de pas en float Python : les calculs restent dans la précision des chemins
+        for dt in np.diff(grid, prepend=0.0).tolist():
+            Z_v = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+            Z_S = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+
+            # Moments conditionnels de v(t + dt) : m = E[v'], s2 = Var[v'], psi = s2 / m^2
+            decay = float(np.exp(-kappa * dt))
+            m = v * decay + theta * (1.0 - decay)
+            s2 = v * (xi**2 * decay * (1.0 - decay) / kappa) + theta * xi**2 * (1.0 - decay)**2 / (2.0 * kappa)
+            np.maximum(m, np.finfo(dtype).tiny, out=m)
+            psi = s2 / (m * m)
+            exponential = np.flatnonzero(psi > HestonModel.PSI_CRITICAL)
+
+            # Schéma du log-spot (gamma1 = gamma2 = 1/2) ; K0 est corrigé pour que
+            # E[S(t + dt) | S(t), v(t)] = S(t) exp((r - q) dt)
+            K2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+            K3 = 0.5 * dt * (1.0 - rho**2)
+            A = K2 + 0.5 * K3
+
+            # Branche quadratique : v' = a (b + Z_v)^2, avec b^2 = 2/psi - 1 + sqrt(2/psi (2/psi - 1))
+            inv_psi = 2.0 / np.clip(psi, 1e-12, HestonModel.PSI_CRITICAL)
+            b2 = np.sqrt(inv_psi * (inv_psi - 1.0))
+            b2 += inv_psi - 1.0
+            a = m / (1.0 + b2)
+            v_next = np.sqrt(b2)
+            v_next += Z_v
+            v_next *= v_next
+            v_next *= a
+            denominator = 1.0 - 2.0 * A * a
+            with np.errstate(divide="ignore", invalid="ignore"):
+                K0 = 0.5 * np.log(denominator) - A * b2 * a / denominator
+
+            # Branche exponentielle : masse p en 0, loi exponentielle de paramètre beta au-delà
+            if exponential.size:
+                psi_e, m_e = psi[exponential], m[exponential]
+                p = (psi_e - 1.0) / (psi_e + 1.0)
+                beta = (1.0 - p) / m_e
+                U = ndtr(Z_v[exponential])
+                with np.errstate(divide="ignore"):
+                    tail = np.log((1.0 - p) / np.maximum(1.0 - U, 1e-300)) / beta
+                v_next[exponential] = np.where(U <= p, 0.0, tail)
+                K0[exponential] = -np.log(p + beta * (1.0 - p) / (beta - A))
+
+            # (K1 v se simplifie avec la correction - (K1 + K3 / 2) v de K0)
+            increment = np.add(v, v_next, dtype=dtype)
+            increment *= K3
+            np.sqrt(increment, out=increment)
+            increment *= Z_S
+            increment += K0
+            increment += K2 * v_next
+            increment -= 0.5 * K3 * v
+            increment += (r - q) * dt
+            v = v_next
+            yield increment
@@ -0,0 +1,116 @@
+# least_squares_monte_carlo.py
+
+import time
+
+import numpy as np
+
+from models.pricing_method.monte_carlo_statistics import PayoffAccumulator, MonteCarloResult
+from models.pricing_method.path_model import GBMModel
+
+
+class LongstaffSchwartzPricer:
+    # Monte Carlo à exercice anticipé (Longstaff-Schwartz) : induction rétrograde sur les dates
+    # d'exercice, la valeur de continuation étant la régression des flux futurs actualisés
+    # sur une base de fonctions du spot, ajustée sur les chemins dans la monnaie.
+    # Les barrières sont surveillées aux dates de la grille ; le rebate est versé à maturité,
+    # comme dans MonteCarloPricer.price_barrier.
+
+    BASES = {
+        "laguerre": np.polynomial.laguerre.lagvander,
+        "polynomial": np.polynomial.polynomial.polyvander,
+    }
+
+    @staticmethod
+    def exercise_indices(maturity, time_steps, exercise_times=None):
+        # Dates d'exercice ramenées aux points de la grille ; None = exercice américain (chaque pas)
+        if exercise_times is None:
+            return np.arange(time_steps + 1)
+        exercise_times = np.asarray(exercise_times, dtype=float)
+        if np.any(exercise_times < 0) or np.any(exercise_times > maturity):
+            raise ValueError("exercise_times must lie in [0, maturity].")
+        indices = np.rint(exercise_times / maturity * time_steps).astype(int)
+        # La maturité est toujours une date d'exercice (payoff final)
+        return np.union1d(indices, [time_steps])
+
+    @staticmethod
+    def continuation_values(S, future_values, strike, basis, degree):
+        # Une seule résolution lstsq par date sur la matrice de base (chemins x (degree + 1))
+        design = LongstaffSchwartzPricer.BASES[basis](S / strike, degree)
+        coefficients, *_ = np.linalg.lstsq(design, future_values, rcond=None)
+        return design @ coefficients
+
+    @staticmethod
+    def price_american(
+        type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+        num_paths=100000, time_steps=50, exercise_times=None, basis="laguerre", degree=3,
+        barrier_level=None, barrier_type=None, rebate=0.0,
+        seed=None, antithetic=False, moment_matching=False, dtype=np.float64, cache=False):
+        # exercise_times : dates d'exercice (bermudéenne) ; None pour une option américaine.
+        # barrier_level / barrier_type : option à barrière américaine ; l'exercice n'est possible
+        # que sur les chemins actifs (non désactivés pour un "out", déjà activés pour un "in").
+        if type_option not in ("call", "put"):
+            raise ValueError("type_option must be 'call' or 'put'.")
+        if basis not in LongstaffSchwartzPricer.BASES:
+            raise ValueError(f"basis must be one of {list(LongstaffSchwartzPricer.BASES)}.")
+        start_time = time.perf_counter()
+
+        S_paths, _ = GBMModel.simulate_gbm_euler(
+            spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed=seed,
+            antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache)
+        sign = 1.0 if type_option == "call" else -1.0
+        intrinsic = np.maximum(sign * (S_paths - strike), 0.0)
+
+        # active[:, j] : le chemin peut être exercé à la date j
+        if barrier_level is None:
+            active = np.ones(S_paths.shape, dtype=bool)
+        else:
+            if "up" in barrier_type:
+                crossed = np.logical_or.accumulate(S_paths >= barrier_level, axis=1)
+            else:
+                crossed = np.logical_or.accumulate(S_paths <= barrier_level, axis=1)
+            active = crossed if "in" in barrier_type else ~crossed
+
+        dt = maturity / time_steps
+        step_discount = np.exp(-rate * dt)
+        exercise_dates = set(LongstaffSchwartzPricer.exercise_indices(maturity, time_steps, exercise_times).tolist())
+
+        # Flux à maturité, puis remontée date par date : values est actualisé à la date courante
+        values = np.where(active[:, -1], intrinsic[:, -1], rebate)
+        for j in range(time_steps - 1, 0, -1):
+            values *= step_discount
+            if j not in exercise_dates:
+                continue
+            candidates = np.flatnonzero(active[:, j] & (intrinsic[:, j] > 0))
+            if candidates.size <= degree + 1:
+                continue
+            continuation = LongstaffSchwartzPricer.continuation_values(
+                S_paths[candidates, j], values[candidates], strike, basis, degree)
+            exercise = intrinsic[candidates, j] > continuation
+            values[candidates[exercise]] = intrinsic[candidates[exercise], j]
+        values *= step_discount
+
+        accumulator = PayoffAccumulator().add(values, antithetic)
+        price, std_error = accumulator.mean, accumulator.std_error
+        # Exercice immédiat si autorisé à la date 0 et plus favorable que la continuation
+        if 0 in exercise_dates and active[0, 0] and intrinsic[0, 0] > price:
+            price, std_error = intrinsic[0, 0], 0.0
+
+        return MonteCarloResult(
+            price, std_error=std_error, num_paths=num_paths, time_steps=time_steps,
+            wall_time=time.perf_counter() - start_time,
+            variance_reduction_factor=accumulator.variance_reduction_factor)
+
+    @staticmethod
+    def price_barrier_american(
+        type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+        barrier_level, barrier_type, rebate=0.0, num_paths=100000, time_steps=50, exercise_times=None,
+        basis="laguerre", degree=3, seed=None, antithetic=False, moment_matching=False,
+        dtype=np.float64, cache=False):
+        if barrier_type not in ("up-and-in", "up-and-out", "down-and-in", "down-and-out"):
+            raise ValueError("barrier_type must be 'up-and-in', 'up-and-out', 'down-and-in' or 'down-and-out'.")
+
+        return LongstaffSchwartzPricer.price_american(
+            type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+            num_paths=num_paths, time_steps=time_steps, exercise_times=exercise_times, basis=basis,
+            degree=degree, barrier_level=barrier_level, barrier_type=barrier_type, rebate=rebate,
+            seed=seed, antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache)
@@ -0,0 +1,129 @@
+# local_volatility.py
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from scipy.interpolate import RectBivariateSpline
+
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.path_model import PathModel
+
+
+class LocalVolatilityModel(PathModel):
+    # Volatilité locale de Dupire sigma(t, k), k = log(S / F(t)) log-moneyness forward.
+    # La surface est calculée une fois à partir d'une grille de volatilités implicites
+    # (maturités x moneyness K / F(T)) : spline bicubique de la variance totale w(T, k),
+    # dérivées analytiques de la spline, formule de Dupire en variance totale (Gatheral) :
+    #   sigma^2 = w_T / (1 - k w_k / w + (-1/4 - 1/w + k^2 / w^2) w_k^2 / 4 + w_kk / 2).
+    # Elle est tabulée sur une grille fine, gardée dans un cache propre (SURFACES, hors du
+    # cache de chemins) pour être partagée par les modèles du processus ; l'évaluation
+    # interpole en temps une fois par pas puis en moneyness sur tous les chemins (np.interp),
+    # soit une interpolation bilinéaire sans appel Python par chemin.
+    # Hors de la grille, la volatilité locale est prolongée par des constantes.
+
+    # Plancher de la variance locale (surface d'entrée avec arbitrage, ailes de la spline)
+    MIN_LOCAL_VARIANCE = 1e-6
+
+    # Surfaces tabulées par clé de surface, les moins récemment utilisées évincées au-delà de MAX_SURFACES
+    SURFACES = OrderedDict()
+    MAX_SURFACES = 16
+
+    def __init__(self, maturities, moneyness, implied_vols, max_step=1 / 52, time_points=100, moneyness_points=200):
+        # implied_vols[i, j] : volatilité implicite de maturité maturities[i] et de strike moneyness[j] * F(T).
+        # max_step : pas du schéma d'Euler entre deux dates d'observation éloignées.
+        maturities = np.asarray(maturities, dtype=float)
+        moneyness = np.asarray(moneyness, dtype=float)
+        implied_vols = np.asarray(implied_vols, dtype=float)
+        # Dérivées de la spline : w_T demande un degré >= 2 en temps, w_kk un degré 3 en moneyness
+        if maturities.ndim != 1 or len(maturities) < 3 or np.any(np.diff(maturities) <= 0) or maturities[0] <= 0:
+            raise ValueError("maturities must contain at least 3 increasing positive values.")
+        if moneyness.ndim != 1 or len(moneyness) < 4 or np.any(np.diff(moneyness) <= 0) or moneyness[0] <= 0:
+            raise ValueError("moneyness must contain at least 4 increasing positive values.")
+        if implied_vols.shape != (len(maturities), len(moneyness)) or np.any(implied_vols <= 0):
+            raise ValueError("implied_vols must be a positive (maturities x moneyness) grid.")
+        if max_step <= 0:
+            raise ValueError("max_step must be positive.")
+
+        self.maturities = maturities
+        self.moneyness = moneyness
+        self.implied_vols = implied_vols
+        self.max_step = float(max_step)
+
+        digest = hashlib.sha1()
+        for array in (maturities, moneyness, implied_vols):
+            digest.update(array.tobytes())
+        self.surface_key = ("dupire", digest.hexdigest(), time_points, moneyness_points)
+        self.times, self.log_moneyness, self.local_vols = LocalVolatilityModel.cached_surface(
+            self.surface_key,
+            lambda: LocalVolatilityModel.dupire_surface(
+                maturities, moneyness, implied_vols, time_points, moneyness_points))
+
+    @staticmethod
+    def cached_surface(key, factory):
+        surfaces = LocalVolatilityModel.SURFACES
+        if key in surfaces:
+            surfaces.move_to_end(key)
+            return surfaces[key]
+        surface = surfaces[key] = factory()
+        while len(surfaces) > LocalVolatilityModel.MAX_SURFACES:
+            surfaces.popitem(last=False)
+        return surface
+
+    def key(self):
+        return self.surface_key + (self.max_step,)
+
+    @staticmethod
+    def dupire_surface(maturities, moneyness, implied_vols, time_points=100, moneyness_points=200):
+        # Renvoie la grille des temps, la grille des log-moneyness et la volatilité locale (temps x moneyness)
+        log_moneyness = np.log(moneyness)
+        total_variance = implied_vols**2 * maturities[:, None]
+        spline = RectBivariateSpline(
+            maturities, log_moneyness, total_variance,
+            kx=min(3, len(maturities) - 1), ky=min(3, len(log_moneyness) - 1), s=0)
+
+        times = np.linspace(maturities[0], maturities[-1], time_points)
+        k = np.linspace(log_moneyness[0], log_moneyness[-1], moneyness_points)
+        w = np.maximum(spline(times, k), 1e-12)
+        w_T = spline(times, k, dx=1)
+        w_k = spline(times, k, dy=1)
+        w_kk = spline(times, k, dy=2)
+
+        denominator = 1.0 - k * w_k / w + 0.25 * (-0.25 - 1.0 / w + k**2 / w**2) * w_k**2 + 0.5 * w_kk
+        with np.errstate(divide="ignore", invalid="ignore"):
+            local_variance = w_T / denominator
+        local_variance = np.where(np.isfinite(local_variance) & (denominator > 0), local_variance, 0.0)
+        local_vols = np.sqrt(np.maximum(local_variance, LocalVolatilityModel.MIN_LOCAL_VARIANCE))
+        return times, k, local_vols
+
+    def volatility_row(self, t):
+        # Tranche de la surface à la date t (interpolation linéaire entre les temps tabulés)
+        position = np.interp(t, self.times, np.arange(len(self.times)))
+        lower = int(np.floor(position))
+        upper = min(lower + 1, len(self.times) - 1)
+        weight = position - lower
+        return (1.0 - weight) * self.local_vols[lower] + weight * self.local_vols[upper]
+
+    def local_volatility(self, t, log_moneyness):
+        # sigma(t, k) pour une date t et un tableau de log-moneyness forward
+        return np.interp(log_moneyness, self.log_moneyness, self.volatility_row(t))
+
+    def log_increments(self, rng, grid, num_paths, r, q, antithetic=False, moment_matching=False,
+                       dtype=np.float64):
+        # Euler sur le log-spot avec la volatilité locale lue en début de pas
+        dtype = np.dtype(dtype)
+        log_return = np.zeros(num_paths, dtype=dtype)
+        previous = 0.0
+        for t in np.asarray(grid, dtype=float).tolist():
+            dt = t - previous
+            sigma = self.local_volatility(previous, log_return - (r - q) * previous).astype(dtype, copy=False)
+            increment = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+            increment *= sigma
+            increment *= np.sqrt(dt)
+            sigma *= sigma
+            sigma *= -0.5 * dt
+            increment += sigma
+            increment += (r - q) * dt
+            log_return += increment
+            previous = t
+            yield increment
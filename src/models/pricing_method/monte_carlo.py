@@ -1,328 +1,644 @@
-
-
 #monte_carlo.py
 
 import numpy as np
 import pandas as pd
 
 from models.pricing_method.black_scholes import BlackScholesPricer
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.monte_carlo_statistics import PayoffAccumulator, MonteCarloResult
+from models.pricing_method.path_model import GBMModel
+from models.pricing_method.payoffs import AsianPayoff, AutocallPayoff, BarrierPayoff, LookbackPayoff, Payoff
 
 class MonteCarloPricer:
+    # Point d'entrée par produit : chaque méthode price_* décrit le produit (payoffs.py) et la
+    # dynamique (GBMModel de volatilité `volatility`, ou `model` : HestonModel, LocalVolatilityModel...),
+    # puis délègue la simulation à MonteCarloEngine. Les prix par lot et les échelles de strikes
+    # partagent une même simulation entre plusieurs contrats.
 
     @staticmethod
-    def simulate_gbm_euler(S, T, r, sigma, q, num_paths, time_steps, seed=None):
-        if seed is not None:
-            np.random.seed(seed)
-
-        dt = T / time_steps
-        dW = np.random.randn(num_paths, time_steps) * np.sqrt(dt)
-        
-        log_increments = (r - q - 0.5 * sigma**2) * dt + sigma * dW
-        log_S = np.cumsum(log_increments, axis=1) 
-        log_S = np.log(np.maximum(S, 1e-8)) + log_S  
-        S_paths = np.exp(log_S) 
-        
-        S_paths = np.hstack((np.full((num_paths, 1), S), S_paths))
-        
-        return S_paths, dW
+    def path_model(volatility, model=None, fused=False):
+        # GBM de volatilité `volatility` par défaut ; fused=True : noyaux compilés de fused_kernels.py
+        if model is None:
+            return GBMModel(volatility, fused=fused)
+        if fused:
+            raise ValueError("fused=True applies to the built-in GBM model only.")
+        return model
+
+    @staticmethod
+    def simulate_gbm_euler(S, T, r, sigma, q, num_paths, time_steps, seed=None,
+                           antithetic=False, moment_matching=False, sampling="pseudo", dtype=np.float64,
+                           cache=False):
+        # Chemins GBM sur grille d'Euler, (S_paths, dW) : cf. GBMModel.simulate_gbm_euler
+        return GBMModel.simulate_gbm_euler(
+            S, T, r, sigma, q, num_paths, time_steps, seed=seed, antithetic=antithetic,
+            moment_matching=moment_matching, sampling=sampling, dtype=dtype, cache=cache)
 
     @staticmethod
     def price_barrier(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
         barrier_level, barrier_type, rebate=0.0,
-        num_paths=500000, time_steps=200, seed=None):
+        num_paths=500000, time_steps=200, seed=None, chunk_size=None, n_jobs=1,
+        target_std_error=None, time_budget=None, antithetic=False, moment_matching=False,
+        control_variate=False, monitoring="discrete", dtype=np.float64, cache=False, model=None, fused=False,
+        measure_memory=False):
+        # monitoring="continuous" ou "bgk" : prix de la barrière surveillée en continu,
+        # précis dès une grille grossière (20 pas) au lieu de time_steps croissant.
+        # model : dynamique du sous-jacent (ex. HestonModel), `volatility` est alors ignorée.
+        # fused=True : chemins générés et réduits à leurs extrema en un passage compilé (numba).
+        # measure_memory=True : pic mémoire de la simulation dans result.peak_memory (plus lent).
 
         if barrier_type == 'up-and-out' and spot >= barrier_level:
-            return rebate  
+            return MonteCarloResult(rebate)
         elif barrier_type == 'down-and-out' and spot <= barrier_level:
-            return rebate
-
-
-        S_paths, _ = MonteCarloPricer.simulate_gbm_euler(
-            S=spot, T=maturity, r=rate, sigma=volatility, q=dividend_yield,
-            num_paths=num_paths, time_steps=time_steps, seed=seed)
-        
-        if "up" in barrier_type:
-            crossed = np.any(S_paths >= barrier_level, axis=1)
-        else:  
-            crossed = np.any(S_paths <= barrier_level, axis=1)
-        
-
-
-        final_underlyings = S_paths[:, -1]  
-
-        if "call" in type_option:
-            vanilla_payoffs = np.maximum(final_underlyings - strike, 0.0)
-        else:  
-            vanilla_payoffs = np.maximum(strike - final_underlyings, 0.0)
-  
-        payoffs = vanilla_payoffs.copy() 
-        if "in" in barrier_type:
-            payoffs[~crossed] = rebate
-        else:
-            payoffs[crossed] = rebate
+            return MonteCarloResult(rebate)
 
-        discounted_payoffs = np.exp(-rate * maturity) * payoffs
-        price = np.mean(discounted_payoffs)
-        return price
+        return MonteCarloEngine.price(
+            MonteCarloPricer.path_model(volatility, model, fused),
+            BarrierPayoff(type_option, spot, strike, maturity, rate, dividend_yield,
+                          barrier_level, barrier_type, rebate, time_steps, monitoring),
+            num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+            moment_matching=moment_matching, control_variate=control_variate, dtype=dtype, cache=cache,
+            measure_memory=measure_memory)
 
     @staticmethod
     def price_asian(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
-        average_type, observation_frequency, num_paths = 50000, time_steps=200, seed=None
+        average_type, observation_frequency, num_paths = 50000, seed=None,
+        chunk_size=None, n_jobs=1, target_std_error=None, time_budget=None,
+        antithetic=False, moment_matching=False, control_variate=False,
+        sampling="pseudo", num_randomisations=None, dtype=np.float64, cache=False, model=None,
+        measure_memory=False
     ):
-    
-        if maturity > 1.8:
-            time_steps = 500
-        
-        S_paths, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed)
-
-        if observation_frequency == 'daily':
-            num_observations = round(maturity * 365)
-        elif observation_frequency == 'weekly':
-            num_observations = round(maturity * 52)
-        elif observation_frequency == 'monthly':
-            num_observations = round(maturity * 12)
-        else:
-            raise ValueError("frequency must be 'daily', 'weekly', or 'monthly'.")
-
-        observation_indices = np.linspace(0, time_steps, num_observations, endpoint=False, dtype=int)
-        observed_prices = S_paths[:, observation_indices]
-
+        # sampling="sobol" : quasi-Monte Carlo randomisé, num_paths est réparti en
+        # num_randomisations blocs de 2^m points et l'erreur standard est mesurée entre blocs.
+
+        return MonteCarloEngine.price(
+            MonteCarloPricer.path_model(volatility, model),
+            AsianPayoff(type_option, spot, strike, maturity, rate, dividend_yield, average_type,
+                        observation_frequency),
+            num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+            moment_matching=moment_matching, control_variate=control_variate, sampling=sampling,
+            num_randomisations=num_randomisations, dtype=dtype, cache=cache, measure_memory=measure_memory)
 
-        if average_type == "arithmetic":
-            averages = np.mean(observed_prices, axis=1)
-        elif average_type == "geometric":
-            averages = np.exp(np.mean(np.log(observed_prices), axis=1))
-        else:
-            raise ValueError("average_type must be 'arithmetic' or 'geometric'.")
-
-        # Calcul des payoffs
-        if type_option == "call":
-            payoffs = np.maximum(averages - strike, 0)
-        else:  # put
-            payoffs = np.maximum(strike - averages, 0)
-
-        # Actualisation du payoff
-        return np.exp(-rate * maturity) * np.mean(payoffs)
+    @staticmethod
+    def price_asian_progressive(
+        type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+        average_type, observation_frequency, num_paths=50000, first_block=MonteCarloEngine.FIRST_BLOCK,
+        seed=None, chunk_size=None, n_jobs=1, target_std_error=None, time_budget=None,
+        antithetic=False, moment_matching=False, control_variate=False, dtype=np.float64, cache=False, model=None,
+        measure_memory=False
+    ):
+        # Générateur de prix de plus en plus précis (cf. MonteCarloEngine.price_progressive) :
+        # une première estimation sur first_block chemins, puis des blocs de taille doublée.
+
+        return MonteCarloEngine.price_progressive(
+            MonteCarloPricer.path_model(volatility, model),
+            AsianPayoff(type_option, spot, strike, maturity, rate, dividend_yield, average_type,
+                        observation_frequency),
+            num_paths, first_block=first_block, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+            moment_matching=moment_matching, control_variate=control_variate, dtype=dtype, cache=cache,
+            measure_memory=measure_memory)
 
     @staticmethod
     def price_lookback(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
-        strike_type, num_paths=500000, time_steps=200, seed=None):
- 
-
-        S_paths, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed)
-
-
-        min_S = np.min(S_paths, axis=1)
-        max_S = np.max(S_paths, axis=1)
-        final_S = S_paths[:, -1]
-
-        if strike_type == "fixed":
-            if type_option == "call":
-                payoffs = np.maximum(max_S - strike, 0)
-            else:  
-                payoffs = np.maximum(strike - min_S, 0)
-        elif strike_type == "floating":
-            if type_option == "call":
-                payoffs = np.maximum(final_S - min_S, 0)
-            else:  
-                payoffs = np.maximum(max_S - final_S, 0)
-        else:
-            raise ValueError("strike_type must be 'fixed' or 'floating'.")
-
-        return np.exp(-rate * maturity) * np.mean(payoffs)
-
-
-    def price_autocall(
-            spot,     
-            maturity,   
-            rate,            
-            volatility,     
-            dividend_yield,  
-            coupon,         
-            barrier_capital,
-            barrier_early,
-            barrier_coupon,
-            type_autocall='phoenix', 
-            frequency_per_year='semestrially',
-            memory_feature=True,
-            barriers_as_percentage=True,
-            num_paths=6000,
-            time_steps=250
-        ):
-
-        FREQUENCIES = {
-            'annually': 1,
-            'semestrially': 2,
-            'quarterly': 4,
-            'monthly': 12
-        }
-
-
-
-        if type_autocall == 'athena':
-            barrier_coupon = barrier_early 
-
-
-        if barriers_as_percentage:
-            barrier_capital_abs = spot * barrier_capital / 100
-            barrier_coupon_abs = spot * barrier_coupon / 100
-            barrier_early_abs = spot * barrier_early / 100
-        else:
-            barrier_capital_abs = barrier_capital
-            barrier_coupon_abs = barrier_coupon
-            barrier_early_abs = barrier_early
-
-        if frequency_per_year not in FREQUENCIES:
-            raise ValueError(f"Fréquence non reconnue : {frequency_per_year}. "
-                            f"Choisir parmi {list(FREQUENCIES.keys())}.")
-        
-        
-        obs_per_year = FREQUENCIES[frequency_per_year]
-
-        # Nombre total d'observations
-        total_observations = int(round(obs_per_year * maturity))
-
-        # Dates d'observation en fraction d'années
-        observation_times = [(k+1)/obs_per_year for k in range(total_observations)]
-
-        # Dates d'observation à date step
-        observation_indices = [int(round((t_obs*time_steps) / maturity)) for t_obs in observation_times]
-
-        S, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed=None)
-
-        
-            
-
-
-        def verif_coupon(S, time_to_analyse,observation_indices, histo_coupon, duree_vie, barrier_coupon_abs, maturity, rate, coupon):
-        
-
-            obs_idx = observation_indices.index(time_to_analyse)
-
-            for i in range(num_paths):
-                if S[i, time_to_analyse] >= barrier_coupon_abs and duree_vie[i] == observation_indices[-1]:
-
-                    histo_coupon[i, obs_idx] = 1
-
-
-            return histo_coupon
-        
-   
-            
-
-        def verif_remboursement(S, time_to_analyse, resultat, duree_vie, barrier_early_abs, maturity, rate, index):
-            
-            for i in range(num_paths):
-                if S[i, time_to_analyse] >= barrier_early_abs and duree_vie[i] == observation_indices[-1]:
-
-                    resultat[i] = spot * np.exp(rate * (maturity -observation_times[index]))
-                    duree_vie[i] = time_to_analyse
-
-
-            return resultat , duree_vie
-
-
-        def verif_capital(S, time_to_analyse, resultat, duree_vie, barrier_capital_abs, maturity, rate, index):
-            
-            nb_crash = 0
-
-            for i in range(len(S)):
-                if S[i, time_to_analyse] <= barrier_capital_abs and duree_vie[i] == observation_indices[-1]:
-
-                    resultat[i] = S[i, time_to_analyse] * np.exp(rate * (maturity - observation_times[index]))
-                    duree_vie[i] = time_to_analyse
-                    nb_crash += 1
-                    
-            return resultat , duree_vie, nb_crash
-            
-
-  
-        def memory_app(arr):
-
-            transformed = arr.copy()
-            
-            for i in range(arr.shape[0]):  
-                count = 0  
-                
-                for j in range(arr.shape[1]):  
-                    if arr[i, j] == 1:
-
-                        transformed[i, j] = count + 1
-                        count = 0  
-                    elif arr[i, j] == 0:
-                        count += 1  
-            return transformed
-
-    
-
-
-
-
-
-                
-        resultat = np.zeros(num_paths)
-        
-
-        duree_vie = np.full(num_paths, observation_indices[-1])
+        strike_type, num_paths=500000, time_steps=200, seed=None, chunk_size=None, n_jobs=1,
+        target_std_error=None, time_budget=None, antithetic=False, moment_matching=False,
+        control_variate=False, dtype=np.float64, cache=False, model=None, fused=False, measure_memory=False):
+
+        return MonteCarloEngine.price(
+            MonteCarloPricer.path_model(volatility, model, fused),
+            LookbackPayoff(type_option, spot, strike, maturity, rate, dividend_yield, strike_type, time_steps),
+            num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+            moment_matching=moment_matching, control_variate=control_variate, dtype=dtype, cache=cache,
+            measure_memory=measure_memory)
 
+    @staticmethod
+    def batch_contracts(contracts, required, defaults):
+        # Spécifications de contrats (DataFrame, liste de dicts ou dict de listes),
+        # complétées par les valeurs par défaut des colonnes optionnelles
+        contracts = pd.DataFrame(contracts).reset_index(drop=True)
+        missing = [column for column in required if column not in contracts]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans les contrats : {missing}.")
+        for column, value in defaults.items():
+            if column not in contracts:
+                contracts[column] = value
+        if not contracts["type_option"].isin(["call", "put"]).all():
+            raise ValueError("type_option must be 'call' or 'put'.")
+        return contracts
 
-        histo_coupon = np.zeros((num_paths, len(observation_indices)))
+    @staticmethod
+    def batch_results(contracts, accumulator, discount):
+        prices, std_errors = accumulator.batch_estimates()
+        results = contracts.copy()
+        results["Price"] = discount * prices
+        results["Std. Error"] = discount * std_errors
+        results["Paths"] = accumulator.raw_count
+        return results
 
-        tabl_actualisation = np.zeros(len(observation_indices))
-        nb_crash = 0
-        count_loss = 0
+    @staticmethod
+    def run_shared(block_function, block_arguments, model, num_paths, **options):
+        # run_blocks pour les blocs qui partagent une simulation entre plusieurs contrats : le modèle
+        # est passé aux blocs, et un modèle lu sur disque reçoit l'indice de ligne de chaque bloc
+        if model.stored_paths is not None and num_paths > model.stored_paths:
+            raise ValueError(f"num_paths exceeds the {model.stored_paths} stored scenarios.")
+        return MonteCarloEngine.run_blocks(
+            block_function, dict(block_arguments, model=model), num_paths,
+            stored=model.stored_paths is not None, **options)
 
+    @staticmethod
+    def barrier_batch_block(size, rng, model, spot, maturity, rate, dividend_yield, time_steps,
+                            signs, strikes, barrier_levels, up, knock_in, rebates,
+                            antithetic=False, moment_matching=False, control_variate=False,
+                            dtype=np.float64, cache=False):
+        # Une simulation, puis une colonne de payoffs par contrat (matrice chemins x contrats)
+        final_S, min_S, max_S = model.simulate_extrema(
+            spot, maturity, rate, dividend_yield, size, time_steps, seed=rng,
+            antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache)
+
+        vanilla = np.maximum(signs * (final_S[:, None] - strikes), 0.0)
+        crossed = np.where(up, max_S[:, None] >= barrier_levels, min_S[:, None] <= barrier_levels)
+        payoffs = np.where(crossed == knock_in, vanilla, rebates)
+        return PayoffAccumulator().add_batch(payoffs, antithetic, vanilla if control_variate else None)
 
-        i = 0
+    @staticmethod
+    def price_barrier_batch(
+        contracts, spot, maturity, rate, volatility, dividend_yield,
+        num_paths=500000, time_steps=200, seed=None, chunk_size=None, n_jobs=1,
+        antithetic=False, moment_matching=False, control_variate=False, monitoring="discrete",
+        dtype=np.float64, cache=False, model=None, fused=False):
+        # contracts : une ligne par contrat avec type_option, strike, barrier_level, barrier_type
+        # et éventuellement rebate. Tous les contrats sont évalués sur le même jeu de chemins.
+        # Renvoie les contrats complétés des colonnes Price, Std. Error et Paths.
+        contracts = MonteCarloPricer.batch_contracts(
+            contracts, ["type_option", "strike", "barrier_level", "barrier_type"], {"rebate": 0.0})
+        barrier_types = contracts["barrier_type"]
+        if not barrier_types.isin(["up-and-in", "up-and-out", "down-and-in", "down-and-out"]).all():
+            raise ValueError("barrier_type must be 'up-and-in', 'up-and-out', 'down-and-in' or 'down-and-out'.")
+
+        model = MonteCarloPricer.path_model(volatility, model, fused)
+        up = barrier_types.str.startswith("up").to_numpy()
+        barrier_levels = contracts["barrier_level"].to_numpy(dtype=float)
+        if monitoring == "bgk":
+            barrier_levels = BarrierPayoff.bgk_barrier(barrier_levels, up, model, maturity, time_steps)
+        elif monitoring != "discrete":
+            raise ValueError("monitoring must be 'discrete' or 'bgk' for batch pricing.")
+
+        accumulator = MonteCarloPricer.run_shared(
+            MonteCarloPricer.barrier_batch_block,
+            dict(spot=spot, maturity=maturity, rate=rate, dividend_yield=dividend_yield, time_steps=time_steps,
+                 signs=np.where(contracts["type_option"] == "call", 1.0, -1.0),
+                 strikes=contracts["strike"].to_numpy(dtype=float),
+                 barrier_levels=barrier_levels, up=up,
+                 knock_in=barrier_types.str.endswith("in").to_numpy(),
+                 rebates=contracts["rebate"].to_numpy(dtype=float),
+                 antithetic=antithetic, moment_matching=moment_matching, control_variate=control_variate,
+                 dtype=dtype, cache=cache),
+            model, num_paths, chunk_size=chunk_size, seed=seed, n_jobs=n_jobs,
+            control_mean=np.exp(rate * maturity) * np.array([
+                BlackScholesPricer.price_vanilla_euro(spot, strike, maturity, rate,
+                                                      Payoff.black_scholes_volatility(model), dividend_yield,
+                                                      type_option)
+                for strike, type_option in zip(contracts["strike"], contracts["type_option"])])
+            if control_variate else None)
+
+        return MonteCarloPricer.batch_results(contracts, accumulator, np.exp(-rate * maturity))
 
-        for time_to_analyse in observation_indices:
+    @staticmethod
+    def asian_batch_block(size, rng, model, spot, rate, dividend_yield, observation_times,
+                          signs, strikes, geometric, antithetic=False, moment_matching=False,
+                          control_variate=False, sampling="pseudo", dtype=np.float64, cache=False):
+        observed_prices = model.simulate_paths(
+            spot, rate, dividend_yield, observation_times, size, seed=rng,
+            antithetic=antithetic, moment_matching=moment_matching, sampling=sampling, dtype=dtype, cache=cache)
+
+        # Chaque moyenne n'est calculée qu'une fois pour tous les contrats
+        averages = AsianPayoff.averages(observed_prices, "arithmetic")[:, None]
+        control = None
+        if np.any(geometric) or control_variate:
+            geometric_averages = AsianPayoff.averages(observed_prices, "geometric")[:, None]
+            averages = np.where(geometric, geometric_averages, averages)
+            if control_variate:
+                control = np.maximum(signs * (geometric_averages - strikes), 0.0)
+
+        payoffs = np.maximum(signs * (averages - strikes), 0.0)
+        return PayoffAccumulator().add_batch(payoffs, antithetic, control, pooled=sampling == "sobol")
 
-            histo_coupon = verif_coupon(S, time_to_analyse,observation_indices, histo_coupon, duree_vie, barrier_coupon_abs, maturity, rate, coupon)
+    @staticmethod
+    def price_asian_batch(
+        contracts, spot, maturity, rate, volatility, dividend_yield, observation_frequency,
+        num_paths=50000, seed=None, chunk_size=None, n_jobs=1, antithetic=False, moment_matching=False,
+        control_variate=False, sampling="pseudo", num_randomisations=None, dtype=np.float64, cache=False,
+        model=None):
+        # contracts : une ligne par contrat avec type_option, strike et éventuellement average_type
+        # (arithmétique par défaut), tous observés à la même fréquence.
+        contracts = MonteCarloPricer.batch_contracts(
+            contracts, ["type_option", "strike"], {"average_type": "arithmetic"})
+        if not contracts["average_type"].isin(["arithmetic", "geometric"]).all():
+            raise ValueError("average_type must be 'arithmetic' or 'geometric'.")
 
-            resultat, duree_vie = verif_remboursement(S, time_to_analyse, resultat, duree_vie, barrier_early_abs, maturity, rate, i)
+        model = MonteCarloPricer.path_model(volatility, model)
+        observation_times = AsianPayoff.asian_observation_times(maturity, observation_frequency)
+        num_paths, chunk_size = MonteCarloEngine.sampling_plan(num_paths, chunk_size, sampling, num_randomisations)
+
+        accumulator = MonteCarloPricer.run_shared(
+            MonteCarloPricer.asian_batch_block,
+            dict(spot=spot, rate=rate, dividend_yield=dividend_yield, observation_times=observation_times,
+                 signs=np.where(contracts["type_option"] == "call", 1.0, -1.0),
+                 strikes=contracts["strike"].to_numpy(dtype=float),
+                 geometric=(contracts["average_type"] == "geometric").to_numpy(),
+                 antithetic=antithetic, moment_matching=moment_matching, control_variate=control_variate,
+                 sampling=sampling, dtype=dtype, cache=cache),
+            model, num_paths, chunk_size=chunk_size, seed=seed, n_jobs=n_jobs,
+            control_mean=np.exp(rate * maturity) * np.array([
+                BlackScholesPricer.price_asian_geometric(
+                    spot, strike, maturity, rate, Payoff.black_scholes_volatility(model), dividend_yield,
+                    observation_times, type_option)
+                for strike, type_option in zip(contracts["strike"], contracts["type_option"])])
+            if control_variate else None)
+
+        return MonteCarloPricer.batch_results(contracts, accumulator, np.exp(-rate * maturity))
 
-            resultat, duree_vie, nb_crash = verif_capital(S, time_to_analyse, resultat, duree_vie, barrier_capital_abs, maturity, rate, i)
+    @staticmethod
+    def strike_ladder_sums(values, strikes, type_option, weights=None, offsets=None, antithetic=False):
+        # Sommes des payoffs a_i (X_i - K)+ + c_i (call) ou a_i (K - X_i)+ + c_i (put) et de leurs carrés,
+        # pour tous les strikes K à la fois : un tri des X puis des sommes cumulées,
+        # soit O(N log N + K log N) au lieu de O(N K).
+        # weights (a) et offsets (c) servent aux barrières : indicatrice ou probabilité de survie, rebate.
+        # antithetic=True : sommes des échantillons moyennés par paire (cf. PayoffAccumulator.samples).
+        values = np.asarray(values, dtype=np.float64)
+        strikes = np.asarray(strikes, dtype=np.float64)
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        offsets = np.zeros_like(values) if offsets is None else np.asarray(offsets, dtype=np.float64)
+
+        if antithetic:
+            # Paire (i, i + (n+1)//2) : ((p + p')/2)^2 = (p^2 + p'^2 + 2 p p') / 4, seul p p' demande
+            # un calcul croisé ; pour n impair, le chemin du milieu reste un échantillon à lui seul
+            n = len(values)
+            first, second, middle = slice(0, n // 2), slice((n + 1) // 2, n), slice(n // 2, (n + 1) // 2)
+            (totals_first, totals_sq_first), (totals_second, totals_sq_second), (totals_middle, totals_sq_middle) = [
+                MonteCarloPricer.strike_ladder_sums(values[part], strikes, type_option, weights[part], offsets[part])
+                for part in (first, second, middle)]
+            cross = MonteCarloPricer.strike_ladder_cross(
+                values[first], values[second], strikes, type_option,
+                weights[first], weights[second], offsets[first], offsets[second])
+            return (0.5 * (totals_first + totals_second) + totals_middle,
+                    0.25 * (totals_sq_first + totals_sq_second + 2.0 * cross) + totals_sq_middle)
+
+        # Centrage pour limiter les compensations dans (X - K)^2 = X^2 - 2 K X + K^2
+        center = values.mean() if values.size else 0.0
+        order = np.argsort(values)
+        x = values[order] - center
+        a = weights[order]
+        ac = a * offsets[order]
+        k = strikes - center
+
+        def cumulative(array):
+            return np.concatenate([[0.0], np.cumsum(array)])
+
+        prefix = {name: cumulative(array) for name, array in
+                  dict(a=a, ax=a * x, a2=a * a, a2x=a * a * x, a2x2=a * a * x * x, ac=ac, acx=ac * x).items()}
 
-            count_loss += nb_crash
-            tabl_actualisation[i] = np.exp(rate * (maturity - observation_times[i]))
+        if type_option == "call":
+            # Chemins tels que X > K : fin du tableau trié
+            index = np.searchsorted(x, k, side="right")
+            region = {name: cumsum[-1] - cumsum[index] for name, cumsum in prefix.items()}
+            sign = 1.0
+        elif type_option == "put":
+            # Chemins tels que X < K : début du tableau trié
+            index = np.searchsorted(x, k, side="left")
+            region = {name: cumsum[index] for name, cumsum in prefix.items()}
+            sign = -1.0
+        else:
+            raise ValueError("type_option must be 'call' or 'put'.")
 
-            i += 1
-        
+        intrinsic = sign * (region["ax"] - k * region["a"])
+        intrinsic_sq = region["a2x2"] - 2.0 * k * region["a2x"] + k**2 * region["a2"]
+        cross = sign * (region["acx"] - k * region["ac"])
 
-        # Calcul de la matrice de coupon
-        if memory_feature:
-            histo_coupon = memory_app(histo_coupon)
+        totals = intrinsic + offsets.sum()
+        totals_sq = intrinsic_sq + 2.0 * cross + np.dot(offsets, offsets)
+        return totals, totals_sq
 
-        tab_coupon = histo_coupon * tabl_actualisation * coupon
+    @staticmethod
+    def strike_ladder_cross(values, paired_values, strikes, type_option, weights, paired_weights,
+                            offsets, paired_offsets):
+        # Sommes des produits p_i p'_i des payoffs d'une paire antithétique, pour tous les strikes :
+        # p p' = a a' (X - K)+ (X' - K)+ + a c' (X - K)+ + a' c (X' - K)+ + c c' (call, idem put).
+        # Le premier terme est non nul si min(X, X') > K (call) ou max(X, X') < K (put), où il vaut
+        # a a' (X X' - K (X + X') + K^2) : tri sur min ou max puis sommes cumulées, comme strike_ladder_sums.
+        strikes = np.asarray(strikes, dtype=np.float64)
+        center = np.concatenate([values, paired_values]).mean() if values.size else 0.0
+        x, y, k = values - center, paired_values - center, strikes - center
 
-        
+        if type_option == "call":
+            bound = np.minimum(x, y)
+        elif type_option == "put":
+            bound = np.maximum(x, y)
+        else:
+            raise ValueError("type_option must be 'call' or 'put'.")
+        order = np.argsort(bound)
+        bound = bound[order]
+        aa = (weights * paired_weights)[order]
+        prefix = {name: np.concatenate([[0.0], np.cumsum(array)]) for name, array in
+                  dict(aa=aa, aas=aa * (x + y)[order], aap=aa * (x * y)[order]).items()}
+        if type_option == "call":
+            index = np.searchsorted(bound, k, side="right")
+            region = {name: cumsum[-1] - cumsum[index] for name, cumsum in prefix.items()}
+        else:
+            index = np.searchsorted(bound, k, side="left")
+            region = {name: cumsum[index] for name, cumsum in prefix.items()}
+        both = region["aap"] - k * region["aas"] + k**2 * region["aa"]
 
+        first_only = MonteCarloPricer.strike_ladder_sums(values, strikes, type_option, weights * paired_offsets)[0]
+        second_only = MonteCarloPricer.strike_ladder_sums(paired_values, strikes, type_option,
+                                                          paired_weights * offsets)[0]
+        return both + first_only + second_only + np.dot(offsets, paired_offsets)
 
+    @staticmethod
+    def ladder_results(strikes, accumulator, discount):
+        prices, std_errors = accumulator.batch_estimates()
+        return pd.DataFrame({
+            "Strike": np.asarray(strikes, dtype=float),
+            "Price": discount * prices,
+            "Std. Error": discount * std_errors,
+            "Paths": accumulator.raw_count,
+        })
 
+    @staticmethod
+    def asian_ladder_block(size, rng, model, type_option, spot, strikes, rate, dividend_yield,
+                           average_type, observation_times, antithetic=False, moment_matching=False,
+                           sampling="pseudo", dtype=np.float64, cache=False):
+        observed_prices = model.simulate_paths(
+            spot, rate, dividend_yield, observation_times, size, seed=rng,
+            antithetic=antithetic, moment_matching=moment_matching, sampling=sampling, dtype=dtype, cache=cache)
+        averages = AsianPayoff.averages(observed_prices, average_type)
 
+        totals, totals_sq = MonteCarloPricer.strike_ladder_sums(averages, strikes, type_option, antithetic=antithetic)
+        return PayoffAccumulator().add_batch_totals(size, totals, totals_sq, antithetic, pooled=sampling == "sobol")
 
-        
+    @staticmethod
+    def lookback_ladder_block(size, rng, model, type_option, spot, strikes, maturity, rate, dividend_yield,
+                              time_steps, antithetic=False, moment_matching=False, dtype=np.float64, cache=False):
+        # Strike fixe : le call porte sur le maximum, le put sur le minimum
+        final_S, min_S, max_S = model.simulate_extrema(
+            spot, maturity, rate, dividend_yield, size, time_steps, seed=rng,
+            antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache)
+        extremes = max_S if type_option == "call" else min_S
+        totals, totals_sq = MonteCarloPricer.strike_ladder_sums(extremes, strikes, type_option, antithetic=antithetic)
+        return PayoffAccumulator().add_batch_totals(size, totals, totals_sq, antithetic)
 
+    @staticmethod
+    def barrier_ladder_block(size, rng, model, payoff, strikes, antithetic=False, moment_matching=False,
+                             dtype=np.float64, cache=False):
+        # Payoff vanille pondéré par l'activation de la barrière (indicatrice, ou probabilité
+        # de pont brownien en surveillance continue), rebate sinon : même découpage que BarrierPayoff.
+        # Le strike de `payoff` est ignoré : seuls comptent son observation et sa barrière.
+        kind, arguments = payoff.observation(model)
+        observations = getattr(model, "simulate_" + kind)(
+            num_paths=size, seed=rng, antithetic=antithetic, moment_matching=moment_matching,
+            dtype=dtype, cache=cache, **arguments)
+        if payoff.monitoring == "continuous":
+            final_S, survival = observations
+            active = 1.0 - survival if "in" in payoff.barrier_type else survival
+        else:
+            final_S, min_S, max_S = observations
+            barrier_level = payoff.monitored_barrier(model)
+            crossed = max_S >= barrier_level if "up" in payoff.barrier_type else min_S <= barrier_level
+            active = crossed if "in" in payoff.barrier_type else ~crossed
 
+        active = np.asarray(active, dtype=np.float64)
+        totals, totals_sq = MonteCarloPricer.strike_ladder_sums(
+            final_S, strikes, "call" if "call" in payoff.type_option else "put",
+            weights=active, offsets=payoff.rebate * (1.0 - active), antithetic=antithetic)
+        return PayoffAccumulator().add_batch_totals(size, totals, totals_sq, antithetic)
 
-      
-        for i in range(len(resultat)):
-            if duree_vie[i] == observation_indices[-1] and S[i, -1] >= barrier_capital_abs:
-                resultat[i] = spot
+    # Échelles de strikes : un prix par strike du vecteur `strikes`, tous calculés sur le même
+    # jeu de chemins. En mode antithétique, les erreurs standard portent sur les paires de chemins,
+    # comme pour les pricers à un strike. Renvoient un DataFrame Strike / Price / Std. Error / Paths.
 
-            resultat[i] += np.sum(tab_coupon[i,:])
+    @staticmethod
+    def price_asian_strike_ladder(
+        type_option, spot, strikes, maturity, rate, volatility, dividend_yield,
+        average_type, observation_frequency, num_paths=50000, seed=None, chunk_size=None, n_jobs=1,
+        antithetic=False, moment_matching=False, sampling="pseudo", num_randomisations=None,
+        dtype=np.float64, cache=False, model=None):
+
+        observation_times = AsianPayoff.asian_observation_times(maturity, observation_frequency)
+        num_paths, chunk_size = MonteCarloEngine.sampling_plan(num_paths, chunk_size, sampling, num_randomisations)
+
+        accumulator = MonteCarloPricer.run_shared(
+            MonteCarloPricer.asian_ladder_block,
+            dict(type_option=type_option, spot=spot, strikes=strikes, rate=rate, dividend_yield=dividend_yield,
+                 average_type=average_type, observation_times=observation_times,
+                 antithetic=antithetic, moment_matching=moment_matching, sampling=sampling,
+                 dtype=dtype, cache=cache),
+            MonteCarloPricer.path_model(volatility, model), num_paths,
+            chunk_size=chunk_size, seed=seed, n_jobs=n_jobs)
+
+        return MonteCarloPricer.ladder_results(strikes, accumulator, np.exp(-rate * maturity))
 
+    @staticmethod
+    def price_lookback_strike_ladder(
+        type_option, spot, strikes, maturity, rate, volatility, dividend_yield,
+        num_paths=500000, time_steps=200, seed=None, chunk_size=None, n_jobs=1,
+        antithetic=False, moment_matching=False, dtype=np.float64, cache=False, model=None, fused=False):
+        # Lookback à strike fixe uniquement : le payoff à strike flottant ne dépend pas de K
+
+        accumulator = MonteCarloPricer.run_shared(
+            MonteCarloPricer.lookback_ladder_block,
+            dict(type_option=type_option, spot=spot, strikes=strikes, maturity=maturity, rate=rate,
+                 dividend_yield=dividend_yield, time_steps=time_steps,
+                 antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache),
+            MonteCarloPricer.path_model(volatility, model, fused), num_paths,
+            chunk_size=chunk_size, seed=seed, n_jobs=n_jobs)
+
+        return MonteCarloPricer.ladder_results(strikes, accumulator, np.exp(-rate * maturity))
 
-        valeur_actu =(np.mean(resultat) * np.exp(-rate * maturity))
+    @staticmethod
+    def price_barrier_strike_ladder(
+        type_option, spot, strikes, maturity, rate, volatility, dividend_yield,
+        barrier_level, barrier_type, rebate=0.0,
+        num_paths=500000, time_steps=200, seed=None, chunk_size=None, n_jobs=1,
+        antithetic=False, moment_matching=False, monitoring="discrete", dtype=np.float64, cache=False,
+        model=None, fused=False):
 
+        accumulator = MonteCarloPricer.run_shared(
+            MonteCarloPricer.barrier_ladder_block,
+            dict(payoff=BarrierPayoff(type_option, spot, None, maturity, rate, dividend_yield,
+                                      barrier_level, barrier_type, rebate, time_steps, monitoring),
+                 strikes=strikes, antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache),
+            MonteCarloPricer.path_model(volatility, model, fused), num_paths,
+            chunk_size=chunk_size, seed=seed, n_jobs=n_jobs)
 
+        return MonteCarloPricer.ladder_results(strikes, accumulator, np.exp(-rate * maturity))
 
 
+    @staticmethod
+    def evaluate_autocall(
+            spot,     
+            maturity,   
+            rate,            
+            volatility,     
+            dividend_yield,  
+            coupon,         
+            barrier_capital,
+            barrier_early,
+            barrier_coupon,
+            type_autocall='phoenix', 
+            frequency_per_year='semestrially',
+            memory_feature=True,
+            barriers_as_percentage=True,
+            num_paths=100000,
+            seed=None,
+            chunk_size=None,
+            n_jobs=1,
+            target_std_error=None,
+            time_budget=None,
+            antithetic=False,
+            moment_matching=False,
+            control_variate=False,
+            sampling="pseudo",
+            num_randomisations=None,
+            dtype=np.float64,
+            cache=False,
+            model=None,
+            fused=False,
+            measure_memory=False
+        ):
+        # Une seule simulation pour le prix et les probabilités : les tableaux
+        # de probabilités décrivent exactement les chemins utilisés pour le prix.
+        # Le contrôle (spot final, d'espérance le forward) reste valable quel que soit le modèle.
+
+        for evaluation in MonteCarloPricer.evaluate_autocall_progressive(
+                spot, maturity, rate, volatility, dividend_yield, coupon,
+                barrier_capital, barrier_early, barrier_coupon,
+                type_autocall=type_autocall, frequency_per_year=frequency_per_year,
+                memory_feature=memory_feature, barriers_as_percentage=barriers_as_percentage,
+                num_paths=num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+                target_std_error=target_std_error, time_budget=time_budget,
+                antithetic=antithetic, moment_matching=moment_matching, control_variate=control_variate,
+                sampling=sampling, num_randomisations=num_randomisations, dtype=dtype, cache=cache,
+                model=model, fused=fused, measure_memory=measure_memory, first_block=None):
+            pass
+        return evaluation
 
+    @staticmethod
+    def evaluate_autocall_progressive(
+            spot,     
+            maturity,   
+            rate,            
+            volatility,     
+            dividend_yield,  
+            coupon,         
+            barrier_capital,
+            barrier_early,
+            barrier_coupon,
+            type_autocall='phoenix', 
+            frequency_per_year='semestrially',
+            memory_feature=True,
+            barriers_as_percentage=True,
+            num_paths=100000,
+            seed=None,
+            chunk_size=None,
+            n_jobs=1,
+            target_std_error=None,
+            time_budget=None,
+            antithetic=False,
+            moment_matching=False,
+            control_variate=False,
+            sampling="pseudo",
+            num_randomisations=None,
+            dtype=np.float64,
+            cache=False,
+            model=None,
+            fused=False,
+            measure_memory=False,
+            first_block=MonteCarloEngine.FIRST_BLOCK
+        ):
+        # Générateur des résultats de evaluate_autocall, recalculés après chaque vague de blocs
+        # sur tous les chemins simulés jusque-là (mode progressif, cf. MonteCarloEngine.iterate_blocks).
+        # first_block=None : une seule vague, le résultat de evaluate_autocall.
+
+        barrier_capital_abs, barrier_coupon_abs, barrier_early_abs = AutocallPayoff.autocall_barriers(
+            spot, barrier_capital, barrier_coupon, barrier_early, type_autocall, barriers_as_percentage)
+        observation_times = AutocallPayoff.autocall_observation_times(maturity, frequency_per_year)
+        payoff = AutocallPayoff(spot, maturity, rate, dividend_yield, coupon, observation_times,
+                                barrier_capital_abs, barrier_coupon_abs, barrier_early_abs, memory_feature)
+
+        for accumulator in MonteCarloEngine.iterate(
+                MonteCarloPricer.path_model(volatility, model, fused), payoff,
+                num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+                target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+                moment_matching=moment_matching, control_variate=control_variate, sampling=sampling,
+                num_randomisations=num_randomisations, dtype=dtype, cache=cache, first_block=first_block,
+                measure_memory=measure_memory):
+            yield MonteCarloPricer.autocall_results(
+                accumulator, payoff, spot * np.exp((rate - dividend_yield) * maturity))
 
-        return valeur_actu
+    @staticmethod
+    def autocall_results(accumulator, payoff, forward_at_maturity):
+        # Probabilités rapportées au nombre de chemins simulés (raw_count) et non d'échantillons
+        # indépendants (count) : en antithétique, une paire de chemins ne fait qu'un échantillon
+        # mais les compteurs de sorties et de coupons portent sur les deux chemins
+        observation_times = payoff.observation_times
+        redemption_probabilities = accumulator.sums["exit_counts"] / accumulator.raw_count
+
+        return {
+            "price": MonteCarloResult.from_accumulator(accumulator, payoff.discount, payoff.time_steps),
+            "observation_times": observation_times,
+            "redemption_probabilities": redemption_probabilities,
+            "coupon_probabilities": accumulator.sums["coupon_counts"] / accumulator.raw_count,
+            "expected_maturity": float(np.dot(redemption_probabilities, observation_times)),
+            "capital_loss_probability": float(accumulator.sums["capital_losses"]) / accumulator.raw_count,
+            "forward_at_maturity": forward_at_maturity,
+        }
 
+    @staticmethod
+    def price_autocall(
+            spot,     
+            maturity,   
+            rate,            
+            volatility,     
+            dividend_yield,  
+            coupon,         
+            barrier_capital,
+            barrier_early,
+            barrier_coupon,
+            type_autocall='phoenix', 
+            frequency_per_year='semestrially',
+            memory_feature=True,
+            barriers_as_percentage=True,
+            num_paths=100000,
+            seed=None,
+            chunk_size=None,
+            n_jobs=1,
+            target_std_error=None,
+            time_budget=None,
+            antithetic=False,
+            moment_matching=False,
+            control_variate=False,
+            sampling="pseudo",
+            num_randomisations=None,
+            dtype=np.float64,
+            cache=False,
+            model=None,
+            fused=False,
+            measure_memory=False
+        ):
 
+        return MonteCarloPricer.evaluate_autocall(
+            spot, maturity, rate, volatility, dividend_yield, coupon,
+            barrier_capital, barrier_early, barrier_coupon,
+            type_autocall=type_autocall, frequency_per_year=frequency_per_year,
+            memory_feature=memory_feature, barriers_as_percentage=barriers_as_percentage,
+            num_paths=num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget,
+            antithetic=antithetic, moment_matching=moment_matching, control_variate=control_variate,
+            sampling=sampling, num_randomisations=num_randomisations, dtype=dtype, cache=cache,
+            model=model, fused=fused, measure_memory=measure_memory)["price"]
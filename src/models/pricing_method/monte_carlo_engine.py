@@ -0,0 +1,331 @@
+# monte_carlo_engine.py
+
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.pricing_method.monte_carlo_statistics import PayoffAccumulator, MonteCarloResult
+from models.pricing_method.path_cache import PATH_CACHE
+from models.pricing_method.quasi_random import QuasiRandom
+from models.pricing_method.random_streams import RandomStreams
+
+
+class MonteCarloEngine:
+    # Orchestration Monte Carlo commune à tous les produits : tirages (pseudo-aléatoires ou
+    # Sobol), cache de chemins, découpage en blocs, flux indépendants, parallélisme et statistiques.
+    # Un prix combine un modèle (dynamique du sous-jacent, cf. path_model.py) et un produit
+    # déclaratif (cf. payoffs.py) :
+    #   - payoff.observation(model) -> (nature, arguments) : "paths" (spots à des dates),
+    #     "extrema" (spot final, minimum, maximum) ou "barrier_survival", simulés par
+    #     model.simulate_<nature>(**arguments) ;
+    #   - payoff.evaluate(observations, model, control_variate) -> payoffs, contrôle, sommes annexes ;
+    #   - payoff.control_mean(model), payoff.discount, payoff.time_steps.
+
+    # Taille de bloc par défaut : borne la mémoire et fixe le découpage en flux aléatoires.
+    # Avec n_jobs > 1 elle est réduite pour donner au moins un bloc par processus : le découpage,
+    # donc le résultat, ne dépend alors de n_jobs que si chunk_size n'est pas imposé.
+    DEFAULT_CHUNK_SIZE = 100000
+    # Taille des vagues du mode adaptatif : assez petite pour s'arrêter tôt sur les produits simples
+    ADAPTIVE_CHUNK_SIZE = 10000
+    # Nombre de brouillages indépendants du Sobol en quasi-Monte Carlo randomisé
+    DEFAULT_RANDOMISATIONS = 16
+    # Premier bloc du mode progressif : une estimation affichable en une centaine de millisecondes
+    FIRST_BLOCK = 2000
+
+    @staticmethod
+    def simulation_dtype(dtype):
+        # Précision des chemins et des payoffs : float32 divise par deux la mémoire et le trafic
+        # des passes exp/cumsum ; les sommes des accumulateurs restent en float64.
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError("dtype must be float32 or float64.")
+        return dtype
+
+    @staticmethod
+    def cached_paths(key, seed, factory):
+        # Chemins simulés à spot unitaire, lus dans le cache du processus quand le flux
+        # aléatoire est reproductible : un changement de spot (courbes de prix, delta, gamma)
+        # ne demande qu'une multiplication. factory() renvoie le tuple de tableaux à stocker.
+        stream = RandomStreams.stream_key(seed)
+        if stream is None:
+            return tuple(factory())
+        return PATH_CACHE.get(key + (stream,), factory)
+
+    @staticmethod
+    def scale_paths(unit_paths, S):
+        return np.multiply(unit_paths, np.maximum(S, 1e-8), dtype=unit_paths.dtype)
+
+    @staticmethod
+    def standard_normals(rng, shape, antithetic=False, moment_matching=False, dtype=np.float64):
+        # Tirages gaussiens, avec réduction de variance optionnelle le long de l'axe des chemins :
+        # - antithetic : la seconde moitié des chemins reprend la première au signe près ;
+        # - moment_matching : moyenne nulle et variance unitaire exactes à chaque pas.
+        num_paths = shape[0]
+        if antithetic:
+            half = (num_paths + 1) // 2
+            Z = np.empty(shape, dtype=dtype)
+            rng.standard_normal(out=Z[:half], dtype=dtype)
+            np.negative(Z[:num_paths - half], out=Z[half:])
+        else:
+            Z = rng.standard_normal(shape, dtype=dtype)
+
+        if moment_matching and num_paths > 1:
+            Z -= Z.mean(axis=0)
+            Z /= Z.std(axis=0)
+        return Z
+
+    @staticmethod
+    def brownian_increments(rng, times, num_paths, antithetic=False, moment_matching=False, sampling="pseudo",
+                            dtype=np.float64):
+        # Accroissements browniens sur la grille `times` (déjà multipliés par la racine du pas) :
+        # - "pseudo" : tirages indépendants du générateur ;
+        # - "sobol" : Sobol brouillé par rng, dates construites par pont brownien.
+        dt = np.diff(np.asarray(times, dtype=float), prepend=0.0)
+        if np.any(dt < 0):
+            raise ValueError("observation_times must be non-decreasing and non-negative.")
+
+        if sampling == "sobol":
+            if antithetic or moment_matching:
+                raise ValueError("antithetic and moment_matching only apply to sampling='pseudo'.")
+            return QuasiRandom.brownian_increments(num_paths, times, rng).astype(dtype, copy=False)
+        if sampling != "pseudo":
+            raise ValueError("sampling must be 'pseudo' or 'sobol'.")
+
+        dW = MonteCarloEngine.standard_normals(rng, (num_paths, len(dt)), antithetic, moment_matching, dtype)
+        dW *= np.sqrt(dt).astype(dtype)
+        return dW
+
+    @staticmethod
+    def qmc_chunk_size(num_paths, num_randomisations=None):
+        # Un bloc par brouillage, de taille puissance de 2 (la plus proche de num_paths / R)
+        num_randomisations = num_randomisations or MonteCarloEngine.DEFAULT_RANDOMISATIONS
+        if num_randomisations < 2:
+            raise ValueError("num_randomisations must be at least 2 to estimate the error.")
+        return 2 ** max(int(round(np.log2(max(num_paths / num_randomisations, 1)))), 0)
+
+    @staticmethod
+    def chunk_sizes(num_paths, chunk_size=None):
+        if chunk_size is None or chunk_size >= num_paths:
+            return [num_paths]
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+        full_chunks, remainder = divmod(num_paths, chunk_size)
+        return [chunk_size] * full_chunks + ([remainder] if remainder else [])
+
+    @staticmethod
+    def run_shard(block_function, block_arguments, tasks, measure_memory=False):
+        # measure_memory=True : pic mémoire mesuré bloc par bloc (allocations numpy comprises).
+        # tracemalloc ralentit nettement la simulation, d'où une mesure à la demande ; un traçage
+        # déjà lancé par l'appelant n'est pas arrêté.
+        if not measure_memory:
+            return [block_function(size, rng, **block_arguments) for size, rng in tasks]
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        block_results = []
+        try:
+            for size, rng in tasks:
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                block_result = block_function(size, rng, **block_arguments)
+                block_result.peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+                block_results.append(block_result)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        return block_results
+
+    @staticmethod
+    def run_round(pool, n_shards, block_function, block_arguments, tasks, measure_memory=False):
+        if pool is None or len(tasks) <= 1:
+            return MonteCarloEngine.run_shard(block_function, block_arguments, tasks, measure_memory)
+
+        n_shards = min(n_shards, len(tasks))
+        bounds = np.linspace(0, len(tasks), n_shards + 1).astype(int)
+        futures = [
+            pool.submit(MonteCarloEngine.run_shard, block_function, block_arguments, tasks[start:stop],
+                        measure_memory)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        return [result for future in futures for result in future.result()]
+
+    @staticmethod
+    def progressive_sizes(num_paths, first_block, chunk_size=None):
+        # Blocs de taille doublée d'une vague à l'autre, de first_block jusqu'à chunk_size :
+        # une première estimation en quelques millisecondes, puis des estimations de plus en plus précises
+        if first_block <= 0:
+            raise ValueError("first_block must be a positive integer.")
+        chunk_size = chunk_size or MonteCarloEngine.DEFAULT_CHUNK_SIZE
+        sizes, size, remaining = [], min(first_block, chunk_size), num_paths
+        while remaining > 0:
+            sizes.append(min(size, remaining))
+            remaining -= sizes[-1]
+            size = min(2 * size, chunk_size)
+        return sizes
+
+    @staticmethod
+    def iterate_blocks(block_function, block_arguments, num_paths, chunk_size=None, seed=None, n_jobs=1,
+                       target_std_error=None, time_budget=None, discount=1.0, control_mean=None, stored=False,
+                       first_block=None, measure_memory=False):
+        # Générateur de run_blocks : renvoie l'accumulateur fusionné après chaque vague de blocs
+        # (le même objet, mis à jour : en extraire les valeurs avant de passer à la vague suivante).
+        # Mode progressif (first_block) : blocs de taille croissante (progressive_sizes) et une
+        # vague par groupe de n_jobs blocs, pour afficher une estimation affinée au fil de la simulation.
+        start_time = time.perf_counter()
+        adaptive = target_std_error is not None or time_budget is not None
+
+        if n_jobs is not None and n_jobs < 0:
+            n_jobs = os.cpu_count()
+        if chunk_size is None:
+            chunk_size = MonteCarloEngine.ADAPTIVE_CHUNK_SIZE if adaptive else MonteCarloEngine.DEFAULT_CHUNK_SIZE
+            if first_block is None and n_jobs is not None and n_jobs > 1:
+                # Au moins n_jobs blocs : sinon 500 000 chemins en blocs de 100 000 n'occupent que 5 processus
+                chunk_size = min(chunk_size, -(-num_paths // n_jobs))
+        if first_block is None:
+            sizes = MonteCarloEngine.chunk_sizes(num_paths, chunk_size)
+        else:
+            sizes = MonteCarloEngine.progressive_sizes(num_paths, first_block, chunk_size)
+        if stored:
+            tasks = list(zip(sizes, np.cumsum([0] + sizes[:-1]).tolist()))
+        else:
+            tasks = list(zip(sizes, RandomStreams.spawn(seed, len(sizes))))
+            # Sans graine, les flux enfants dérivent d'une entropie tirée au hasard : leurs chemins
+            # ne seraient jamais relus et évinceraient du cache des chemins réutilisables
+            if seed is None and block_arguments.get("cache"):
+                block_arguments = dict(block_arguments, cache=False)
+
+        n_shards = min(n_jobs or 1, len(tasks))
+        round_size = n_shards if adaptive or first_block is not None else len(tasks)
+
+        accumulator = PayoffAccumulator(control_mean)
+        pool = MonteCarloEngine.process_pool(n_shards) if n_shards > 1 else None
+        try:
+            for start in range(0, len(tasks), round_size):
+                for block_result in MonteCarloEngine.run_round(
+                        pool, n_shards, block_function, block_arguments, tasks[start:start + round_size],
+                        measure_memory):
+                    accumulator.merge(block_result)
+                accumulator.wall_time = time.perf_counter() - start_time
+                yield accumulator
+
+                if (target_std_error is not None and accumulator.count > 1
+                        and discount * accumulator.std_error <= target_std_error):
+                    break
+                if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    @staticmethod
+    def process_pool(max_workers):
+        # Processus issus d'un serveur de fork vierge (là où il existe) : un fork direct
+        # hérite des threads déjà lancés par le processus (pool TBB / OpenMP des noyaux numba
+        # fusionnés) et peut se bloquer. Le serveur précharge les pricers, pour des processus
+        # démarrés sans réimporter numpy et scipy. Comme avec "spawn", le script appelant doit
+        # protéger son point d'entrée par if __name__ == "__main__".
+        if "forkserver" not in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(max_workers=max_workers)
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["models.pricing_method.monte_carlo"])
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+    @staticmethod
+    def run_blocks(block_function, block_arguments, num_paths, chunk_size=None, seed=None, n_jobs=1,
+                   target_std_error=None, time_budget=None, discount=1.0, control_mean=None, stored=False,
+                   measure_memory=False):
+        # Exécute block_function(size, rng, **block_arguments) sur chaque bloc de chemins,
+        # en série ou réparti sur n_jobs processus. Chaque bloc renvoie un PayoffAccumulator ;
+        # ils sont fusionnés dans l'ordre des blocs, donc à chunk_size donné le résultat ne dépend
+        # pas de n_jobs (sans chunk_size, le découpage par défaut donne un bloc au moins par processus).
+        # stored=True : scénarios déjà simulés, chaque bloc reçoit l'indice de sa première ligne
+        # à la place de son flux aléatoire.
+        #
+        # Mode adaptatif : avec target_std_error (erreur standard visée sur le prix actualisé)
+        # et/ou time_budget (secondes), les blocs sont simulés par vagues et la simulation
+        # s'arrête dès que la cible est atteinte ; num_paths devient alors un plafond.
+        #
+        # control_mean : espérance connue de la variable de contrôle renvoyée par les blocs.
+        # measure_memory=True : pic mémoire des blocs (tracemalloc) dans accumulator.peak_memory.
+        for accumulator in MonteCarloEngine.iterate_blocks(
+                block_function, block_arguments, num_paths, chunk_size, seed, n_jobs,
+                target_std_error, time_budget, discount, control_mean, stored, measure_memory=measure_memory):
+            pass
+        return accumulator
+
+    @staticmethod
+    def sampling_plan(num_paths, chunk_size=None, sampling="pseudo", num_randomisations=None):
+        # En quasi-Monte Carlo randomisé, un bloc par brouillage : num_paths est arrondi
+        # à num_randomisations blocs de 2^m points
+        if sampling != "sobol":
+            return num_paths, chunk_size
+        chunk_size = MonteCarloEngine.qmc_chunk_size(num_paths, num_randomisations)
+        return chunk_size * (num_randomisations or MonteCarloEngine.DEFAULT_RANDOMISATIONS), chunk_size
+
+    @staticmethod
+    def path_block(size, rng, model, payoff, antithetic=False, moment_matching=False, control_variate=False,
+                   sampling="pseudo", dtype=np.float64, cache=False):
+        # Bloc générique : le produit décrit ce qu'il observe, le modèle le simule, le produit l'évalue
+        kind, arguments = payoff.observation(model)
+        if kind == "paths":
+            arguments = dict(arguments, sampling=sampling)
+        observations = getattr(model, "simulate_" + kind)(
+            num_paths=size, seed=rng, antithetic=antithetic, moment_matching=moment_matching,
+            dtype=dtype, cache=cache, **arguments)
+
+        evaluation = payoff.evaluate(observations, model, control_variate)
+        return PayoffAccumulator().add(
+            evaluation["payoffs"], antithetic, evaluation.get("control"),
+            pooled=sampling == "sobol").add_sums(**evaluation.get("sums", {}))
+
+    @staticmethod
+    def iterate(model, payoff, num_paths, seed=None, chunk_size=None, n_jobs=1, target_std_error=None,
+                time_budget=None, antithetic=False, moment_matching=False, control_variate=False,
+                sampling="pseudo", num_randomisations=None, dtype=np.float64, cache=False, first_block=None,
+                measure_memory=False):
+        # Générateur de run : accumulateur après chaque vague de blocs (cf. iterate_blocks)
+        kind, _ = payoff.observation(model)
+        if sampling != "pseudo" and kind != "paths":
+            raise ValueError("sampling='sobol' requires a payoff observed at fixed dates.")
+        if sampling != "pseudo" and first_block is not None:
+            raise ValueError("progressive pricing (first_block) requires sampling='pseudo'.")
+        num_paths, chunk_size = MonteCarloEngine.sampling_plan(num_paths, chunk_size, sampling, num_randomisations)
+        if model.stored_paths is not None and num_paths > model.stored_paths:
+            raise ValueError(f"num_paths exceeds the {model.stored_paths} stored scenarios.")
+
+        return MonteCarloEngine.iterate_blocks(
+            MonteCarloEngine.path_block,
+            dict(model=model, payoff=payoff, antithetic=antithetic, moment_matching=moment_matching,
+                 control_variate=control_variate, sampling=sampling, dtype=dtype, cache=cache),
+            num_paths, chunk_size=chunk_size, seed=seed, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, discount=payoff.discount,
+            control_mean=payoff.control_mean(model) if control_variate else None,
+            stored=model.stored_paths is not None, first_block=first_block, measure_memory=measure_memory)
+
+    @staticmethod
+    def run(model, payoff, num_paths, **options):
+        # Prix de `payoff` sous `model` : découpage en blocs, flux aléatoires, parallélisme,
+        # mode adaptatif, quasi-Monte Carlo et variable de contrôle sont traités ici une fois
+        # pour tous les produits. Renvoie l'accumulateur (statistiques annexes dans `sums`).
+        for accumulator in MonteCarloEngine.iterate(model, payoff, num_paths, **options):
+            pass
+        return accumulator
+
+    @staticmethod
+    def price(model, payoff, num_paths, **options):
+        accumulator = MonteCarloEngine.run(model, payoff, num_paths, **options)
+        return MonteCarloResult.from_accumulator(accumulator, payoff.discount, payoff.time_steps)
+
+    @staticmethod
+    def price_progressive(model, payoff, num_paths, first_block=FIRST_BLOCK, **options):
+        # Estimations successives du prix, chacune sur tous les chemins simulés jusque-là
+        # (erreur standard décroissante) ; la dernière porte sur num_paths chemins.
+        for accumulator in MonteCarloEngine.iterate(model, payoff, num_paths, first_block=first_block, **options):
+            yield MonteCarloResult.from_accumulator(accumulator, payoff.discount, payoff.time_steps)
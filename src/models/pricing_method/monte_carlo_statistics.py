@@ -0,0 +1,250 @@
+# monte_carlo_statistics.py
+
+import numpy as np
+
+
+class PayoffAccumulator:
+    # Somme et somme des carrés des payoffs, alimentées bloc par bloc :
+    # la mémoire ne dépend que de la taille du bloc, pas du nombre de chemins.
+    # `sums` regroupe des statistiques annexes additives (compteurs, probabilités...).
+    #
+    # Variable de contrôle : si des valeurs de contrôle X sont fournies avec les payoffs Y
+    # et que control_mean = E[X] est connu, mean et variance sont ceux de l'estimateur
+    # Y - beta (X - E[X]), avec beta = cov(X, Y) / var(X) estimé sur les mêmes chemins.
+    #
+    # Quasi-Monte Carlo randomisé (pooled=True) : les chemins d'un bloc ne sont pas indépendants,
+    # l'échantillon est la moyenne du bloc et l'erreur se mesure entre randomisations.
+
+    def __init__(self, control_mean=None):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        # Statistiques chemin par chemin, avant regroupement des paires antithétiques
+        self.raw_count = 0
+        self.raw_total = 0.0
+        self.raw_total_sq = 0.0
+        self.control_mean = control_mean
+        self.control_total = 0.0
+        self.control_total_sq = 0.0
+        self.cross_total = 0.0
+        self.sums = {}
+        self.wall_time = None
+        self.peak_memory = None
+
+    @staticmethod
+    def samples(values, antithetic=False, pooled=False):
+        # En mode antithétique, le chemin i et le chemin i + (n+1)//2 forment une paire
+        # (convention de MonteCarloEngine.standard_normals) : l'échantillon indépendant est
+        # la moyenne de la paire. Pour n impair, le chemin n//2 n'a pas de symétrique.
+        # L'axe 0 est celui des chemins : une matrice (chemins, contrats) est traitée colonne par colonne.
+        if pooled:
+            return values.mean(axis=0, keepdims=True)
+        if not antithetic:
+            return values
+        n = len(values)
+        samples = 0.5 * (values[:n // 2] + values[(n + 1) // 2:])
+        if n % 2:
+            samples = np.concatenate([samples, values[n // 2:n // 2 + 1]])
+        return samples
+
+    def add(self, payoffs, antithetic=False, control=None, pooled=False):
+        payoffs = np.asarray(payoffs, dtype=np.float64).ravel()
+        self.raw_count += payoffs.size
+        self.raw_total += float(np.sum(payoffs))
+        self.raw_total_sq += float(np.dot(payoffs, payoffs))
+
+        samples = PayoffAccumulator.samples(payoffs, antithetic, pooled)
+        self.count += samples.size
+        self.total += float(np.sum(samples))
+        self.total_sq += float(np.dot(samples, samples))
+
+        if control is not None:
+            control_samples = PayoffAccumulator.samples(
+                np.asarray(control, dtype=np.float64).ravel(), antithetic, pooled)
+            self.control_total += float(np.sum(control_samples))
+            self.control_total_sq += float(np.dot(control_samples, control_samples))
+            self.cross_total += float(np.dot(samples, control_samples))
+        return self
+
+    def add_batch(self, payoffs, antithetic=False, control=None, pooled=False):
+        # Plusieurs contrats évalués sur les mêmes chemins : payoffs et control sont des matrices
+        # (chemins, contrats). Les sommes par contrat sont tenues dans `sums` ; control_mean est
+        # alors le vecteur des espérances des contrôles.
+        payoffs = np.asarray(payoffs, dtype=np.float64)
+        samples = PayoffAccumulator.samples(payoffs, antithetic, pooled)
+        self.raw_count += len(payoffs)
+        self.count += len(samples)
+        self.add_sums(batch_total=samples.sum(axis=0),
+                      batch_total_sq=np.einsum("ij,ij->j", samples, samples))
+
+        if control is not None:
+            control_samples = PayoffAccumulator.samples(np.asarray(control, dtype=np.float64), antithetic, pooled)
+            self.add_sums(batch_control_total=control_samples.sum(axis=0),
+                          batch_control_total_sq=np.einsum("ij,ij->j", control_samples, control_samples),
+                          batch_cross_total=np.einsum("ij,ij->j", samples, control_samples))
+        return self
+
+    def add_batch_totals(self, num_paths, totals, totals_sq, antithetic=False, pooled=False):
+        # Variante de add_batch quand les sommes par contrat sont déjà calculées
+        # (ex. échelle de strikes par sommes cumulées). antithetic=True : sommes portant sur les
+        # échantillons moyennés par paire, au nombre de (num_paths + 1) // 2.
+        totals = np.asarray(totals, dtype=np.float64)
+        totals_sq = np.asarray(totals_sq, dtype=np.float64)
+        self.raw_count += num_paths
+        if pooled:
+            means = totals / num_paths
+            self.count += 1
+            return self.add_sums(batch_total=means, batch_total_sq=means**2)
+        self.count += (num_paths + 1) // 2 if antithetic else num_paths
+        return self.add_sums(batch_total=totals, batch_total_sq=totals_sq)
+
+    def batch_estimates(self):
+        # Moyennes et erreurs standard par contrat, corrigées par la variable de contrôle si elle est fournie
+        n = self.count
+        means = self.sums["batch_total"] / n
+        variances = (self.sums["batch_total_sq"] - self.sums["batch_total"]**2 / n) / max(n - 1, 1)
+
+        if self.control_mean is not None and "batch_control_total" in self.sums:
+            control_means = self.sums["batch_control_total"] / n
+            control_variances = (self.sums["batch_control_total_sq"]
+                                 - self.sums["batch_control_total"]**2 / n) / max(n - 1, 1)
+            covariances = (self.sums["batch_cross_total"]
+                           - self.sums["batch_total"] * self.sums["batch_control_total"] / n) / max(n - 1, 1)
+            betas = np.divide(covariances, control_variances,
+                              out=np.zeros_like(covariances), where=control_variances > 0)
+            means = means - betas * (control_means - np.asarray(self.control_mean, dtype=np.float64))
+            variances = variances - betas**2 * control_variances
+
+        return means, np.sqrt(np.maximum(variances, 0.0) / n)
+
+    def add_sums(self, **sums):
+        for name, value in sums.items():
+            value = np.asarray(value, dtype=np.float64)
+            self.sums[name] = self.sums[name] + value if name in self.sums else value.copy()
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.raw_count += other.raw_count
+        self.raw_total += other.raw_total
+        self.raw_total_sq += other.raw_total_sq
+        self.control_total += other.control_total
+        self.control_total_sq += other.control_total_sq
+        self.cross_total += other.cross_total
+        self.add_sums(**other.sums)
+        if other.peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, other.peak_memory)
+        return self
+
+    @property
+    def uses_control(self):
+        return self.control_mean is not None and self.count > 1 and self.control_variance > 0
+
+    @property
+    def control_variance(self):
+        if self.count < 2:
+            return 0.0
+        return max((self.control_total_sq - self.control_total**2 / self.count) / (self.count - 1), 0.0)
+
+    @property
+    def beta(self):
+        if not self.uses_control:
+            return 0.0
+        covariance = (self.cross_total - self.total * self.control_total / self.count) / (self.count - 1)
+        return covariance / self.control_variance
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            raise ValueError("Aucun payoff accumulé.")
+        mean = self.total / self.count
+        if self.uses_control:
+            mean -= self.beta * (self.control_total / self.count - self.control_mean)
+        return mean
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total**2 / self.count) / (self.count - 1)
+        if self.uses_control:
+            # Variance résiduelle : var(Y) - cov(X, Y)^2 / var(X)
+            variance -= self.beta**2 * self.control_variance
+        return max(variance, 0.0)
+
+    @property
+    def std_error(self):
+        if self.count == 0:
+            return float("nan")
+        return float(np.sqrt(self.variance / self.count))
+
+    @property
+    def variance_reduction_factor(self):
+        # Variance de l'estimateur naïf (chemins supposés indépendants) rapportée à celle
+        # de l'estimateur effectif, à nombre de chemins égal
+        if self.raw_count < 2 or self.count < 2 or self.variance == 0:
+            return 1.0
+        raw_variance = (self.raw_total_sq - self.raw_total**2 / self.raw_count) / (self.raw_count - 1)
+        return float((raw_variance / self.raw_count) / (self.variance / self.count))
+
+
+class MonteCarloResult(float):
+    # Prix Monte Carlo : se comporte comme un float (affichage, calculs, graphes)
+    # et porte la précision de l'estimation et le coût de la simulation.
+
+    def __new__(cls, price, std_error=0.0, num_paths=0, time_steps=None, wall_time=None, peak_memory=None,
+                variance_reduction_factor=1.0):
+        result = super().__new__(cls, price)
+        result.std_error = float(std_error)
+        result.num_paths = int(num_paths)
+        result.time_steps = time_steps
+        result.wall_time = wall_time
+        result.peak_memory = peak_memory
+        result.variance_reduction_factor = variance_reduction_factor
+        return result
+
+    @classmethod
+    def from_accumulator(cls, accumulator, discount=1.0, time_steps=None):
+        return cls(
+            discount * accumulator.mean,
+            std_error=discount * accumulator.std_error,
+            num_paths=accumulator.raw_count,
+            time_steps=time_steps,
+            wall_time=accumulator.wall_time,
+            peak_memory=accumulator.peak_memory,
+            variance_reduction_factor=accumulator.variance_reduction_factor,
+        )
+
+    @property
+    def price(self):
+        return float(self)
+
+    @property
+    def confidence_interval(self):
+        # Intervalle de confiance à 95 %
+        half_width = 1.959963984540054 * self.std_error
+        return float(self) - half_width, float(self) + half_width
+
+    def as_dict(self):
+        low, high = self.confidence_interval
+        return {
+            "Price": float(self),
+            "Std. Error": self.std_error,
+            "CI 95% Low": low,
+            "CI 95% High": high,
+            "Paths": self.num_paths,
+            "Steps": self.time_steps,
+            "Wall Time (s)": self.wall_time,
+            "Peak Memory (MB)": None if self.peak_memory is None else self.peak_memory / 1e6,
+            "Variance Reduction": self.variance_reduction_factor,
+        }
+
+    def __reduce__(self):
+        return (MonteCarloResult, (float(self), self.std_error, self.num_paths,
+                                   self.time_steps, self.wall_time, self.peak_memory,
+                                   self.variance_reduction_factor))
+
+    def __repr__(self):
+        return f"MonteCarloResult(price={float(self):.6f}, std_error={self.std_error:.6f}, num_paths={self.num_paths})"
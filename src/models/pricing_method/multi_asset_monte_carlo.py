@@ -0,0 +1,230 @@
+# multi_asset_monte_carlo.py
+
+import numpy as np
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.path_model import PathModel
+from models.pricing_method.payoffs import AutocallPayoff
+from models.pricing_method.random_streams import RandomStreams
+
+
+class MultiAssetMonteCarloPricer:
+    # Autocalls sur panier (worst-of, best-of, moyenne pondérée) : GBM corrélés simulés
+    # exactement aux seules dates d'observation. Un bloc occupe chemins x dates x actifs,
+    # indépendamment de toute grille de pas de temps.
+    # Les niveaux sont exprimés en performance du panier x notional (100 = niveau initial),
+    # de sorte que le produit mono-sous-jacent AutocallPayoff s'applique tel quel (cf. BasketModel).
+
+    BASKET_TYPES = ["worst-of", "best-of", "basket"]
+
+    @staticmethod
+    def correlation_factor(correlation, num_assets):
+        # Facteur L tel que corrélation = L L^T (Cholesky) ; un scalaire désigne une corrélation uniforme
+        correlation = np.asarray(correlation, dtype=float)
+        if correlation.ndim == 0:
+            correlation = np.full((num_assets, num_assets), float(correlation))
+            np.fill_diagonal(correlation, 1.0)
+
+        if correlation.shape != (num_assets, num_assets):
+            raise ValueError(f"correlation must be a scalar or a {num_assets}x{num_assets} matrix.")
+        if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1.0):
+            raise ValueError("correlation must be symmetric with a unit diagonal.")
+        try:
+            return np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            # Matrice semi-définie (ex. actifs parfaitement corrélés) : racine par valeurs propres
+            eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+            if eigenvalues.min() < -1e-10:
+                raise ValueError("correlation matrix must be positive semi-definite.")
+            return eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+
+    @staticmethod
+    def simulate_correlated_gbm(spots, rate, volatilities, dividend_yields, correlation, observation_times,
+                                num_paths, seed=None, antithetic=False, moment_matching=False, dtype=np.float64):
+        # Renvoie les spots simulés, de forme (chemins, dates, actifs) ; volatilités et dividendes
+        # peuvent être scalaires ou propres à chaque actif.
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+
+        spots = np.atleast_1d(np.asarray(spots, dtype=float))
+        num_assets = spots.size
+        volatilities = np.broadcast_to(np.asarray(volatilities, dtype=float), spots.shape)
+        dividend_yields = np.broadcast_to(np.asarray(dividend_yields, dtype=float), spots.shape)
+        factor = MultiAssetMonteCarloPricer.correlation_factor(correlation, num_assets)
+
+        dt = np.diff(np.asarray(observation_times, dtype=float), prepend=0.0)
+        if np.any(dt < 0):
+            raise ValueError("observation_times must be non-decreasing and non-negative.")
+
+        Z = MonteCarloEngine.standard_normals(
+            rng, (num_paths, len(dt) * num_assets), antithetic, moment_matching, dtype)
+        # Chocs corrélés entre actifs, indépendants d'une date à l'autre
+        log_S = Z.reshape(num_paths, len(dt), num_assets) @ factor.T.astype(dtype)
+        log_S *= (volatilities * np.sqrt(dt)[:, None]).astype(dtype)
+        log_S += ((rate - dividend_yields - 0.5 * volatilities**2) * dt[:, None]).astype(dtype)
+        np.cumsum(log_S, axis=1, out=log_S)
+        np.exp(log_S, out=log_S)
+        log_S *= spots.astype(dtype)
+        return log_S
+
+    @staticmethod
+    def basket_performance(S, spots, basket_type="worst-of", weights=None):
+        # Performance du panier à chaque date (1 = niveau initial), de forme (chemins, dates)
+        performances = S / np.asarray(spots, dtype=S.dtype)
+        if basket_type == "worst-of":
+            return performances.min(axis=2)
+        if basket_type == "best-of":
+            return performances.max(axis=2)
+        if basket_type == "basket":
+            return performances @ MultiAssetMonteCarloPricer.basket_weights(weights, S.shape[2]).astype(S.dtype)
+        raise ValueError(f"basket_type must be one of {MultiAssetMonteCarloPricer.BASKET_TYPES}.")
+
+    @staticmethod
+    def basket_weights(weights, num_assets):
+        if weights is None:
+            return np.full(num_assets, 1.0 / num_assets)
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (num_assets,):
+            raise ValueError(f"weights must contain {num_assets} values.")
+        return weights
+
+    @staticmethod
+    def evaluate_autocall(
+            spots,
+            maturity,
+            rate,
+            volatilities,
+            dividend_yields,
+            correlation,
+            coupon,
+            barrier_capital,
+            barrier_early,
+            barrier_coupon,
+            type_autocall='phoenix',
+            frequency_per_year='semestrially',
+            memory_feature=True,
+            basket_type='worst-of',
+            weights=None,
+            notional=100.0,
+            num_paths=100000,
+            seed=None,
+            chunk_size=None,
+            n_jobs=1,
+            target_std_error=None,
+            time_budget=None,
+            antithetic=False,
+            moment_matching=False,
+            control_variate=False,
+            dtype=np.float64,
+            measure_memory=False
+        ):
+        # Barrières en pourcentage du niveau initial du panier ; prix exprimé pour `notional`.
+        # Même dictionnaire de sortie que MonteCarloPricer.evaluate_autocall.
+        model = BasketModel(spots, volatilities, dividend_yields, correlation, basket_type, weights)
+        barrier_capital_abs, barrier_coupon_abs, barrier_early_abs = AutocallPayoff.autocall_barriers(
+            notional, barrier_capital, barrier_coupon, barrier_early, type_autocall, barriers_as_percentage=True)
+        observation_times = AutocallPayoff.autocall_observation_times(maturity, frequency_per_year)
+        # Les dividendes, propres à chaque actif, sont portés par le modèle
+        payoff = AutocallPayoff(notional, maturity, rate, 0.0, coupon, observation_times,
+                                barrier_capital_abs, barrier_coupon_abs, barrier_early_abs, memory_feature)
+
+        accumulator = MonteCarloEngine.run(
+            model, payoff, num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget, antithetic=antithetic,
+            moment_matching=moment_matching, control_variate=control_variate, dtype=dtype,
+            measure_memory=measure_memory)
+
+        # Forward : niveau moyen du panier à maturité (sous-jacent observé)
+        return MonteCarloPricer.autocall_results(
+            accumulator, payoff, float(accumulator.sums["final_levels"]) / accumulator.raw_count)
+
+    @staticmethod
+    def price_autocall(
+            spots,
+            maturity,
+            rate,
+            volatilities,
+            dividend_yields,
+            correlation,
+            coupon,
+            barrier_capital,
+            barrier_early,
+            barrier_coupon,
+            type_autocall='phoenix',
+            frequency_per_year='semestrially',
+            memory_feature=True,
+            basket_type='worst-of',
+            weights=None,
+            notional=100.0,
+            num_paths=100000,
+            seed=None,
+            chunk_size=None,
+            n_jobs=1,
+            target_std_error=None,
+            time_budget=None,
+            antithetic=False,
+            moment_matching=False,
+            control_variate=False,
+            dtype=np.float64,
+            measure_memory=False
+        ):
+
+        return MultiAssetMonteCarloPricer.evaluate_autocall(
+            spots, maturity, rate, volatilities, dividend_yields, correlation, coupon,
+            barrier_capital, barrier_early, barrier_coupon,
+            type_autocall=type_autocall, frequency_per_year=frequency_per_year,
+            memory_feature=memory_feature, basket_type=basket_type, weights=weights, notional=notional,
+            num_paths=num_paths, seed=seed, chunk_size=chunk_size, n_jobs=n_jobs,
+            target_std_error=target_std_error, time_budget=time_budget,
+            antithetic=antithetic, moment_matching=moment_matching, control_variate=control_variate,
+            dtype=dtype, measure_memory=measure_memory)["price"]
+
+
+class BasketModel(PathModel):
+    # Niveau d'un panier d'actifs corrélés, vu par MonteCarloEngine comme un sous-jacent unique :
+    # S x performance du panier aux dates d'observation. Taux de dividende propres à chaque actif :
+    # l'argument q des simulations est ignoré.
+
+    def __init__(self, spots, volatilities, dividend_yields, correlation, basket_type="worst-of", weights=None):
+        self.spots = np.atleast_1d(np.asarray(spots, dtype=float))
+        if basket_type not in MultiAssetMonteCarloPricer.BASKET_TYPES:
+            raise ValueError(f"basket_type must be one of {MultiAssetMonteCarloPricer.BASKET_TYPES}.")
+        self.volatilities = volatilities
+        self.dividend_yields = dividend_yields
+        self.correlation = correlation
+        self.basket_type = basket_type
+        self.weights = weights
+        # Validation immédiate de la matrice de corrélation
+        MultiAssetMonteCarloPricer.correlation_factor(correlation, self.spots.size)
+
+    def key(self):
+        weights = None if self.weights is None else tuple(np.ravel(self.weights).tolist())
+        return ("basket", tuple(self.spots.tolist()), tuple(np.ravel(self.volatilities).tolist()),
+                tuple(np.ravel(self.dividend_yields).tolist()), tuple(np.ravel(self.correlation).tolist()),
+                self.basket_type, weights)
+
+    def forward(self, S, r, q, T):
+        # Forward connu pour le seul panier pondéré : combinaison des forwards des actifs
+        if self.basket_type != "basket":
+            raise ValueError("control_variate requires basket_type='basket' (known forward).")
+        dividend_yields = np.broadcast_to(np.asarray(self.dividend_yields, dtype=float), self.spots.shape)
+        weights = MultiAssetMonteCarloPricer.basket_weights(self.weights, self.spots.size)
+        return S * float(np.dot(weights, np.exp((r - dividend_yields) * T)))
+
+    def simulate_paths(self, S, r, q, observation_times, num_paths, seed=None, antithetic=False,
+                       moment_matching=False, sampling="pseudo", dtype=np.float64, cache=False):
+        if sampling != "pseudo":
+            raise ValueError("sampling must be 'pseudo' for a basket.")
+        if cache:
+            (unit_paths,) = MonteCarloEngine.cached_paths(
+                self.key() + ("paths", r, tuple(observation_times), num_paths, antithetic, moment_matching,
+                              np.dtype(dtype).str), seed,
+                lambda: (self.simulate_paths(1.0, r, q, observation_times, num_paths, seed, antithetic,
+                                             moment_matching, dtype=dtype),))
+            return MonteCarloEngine.scale_paths(unit_paths, S)
+
+        paths = MultiAssetMonteCarloPricer.simulate_correlated_gbm(
+            self.spots, r, self.volatilities, self.dividend_yields, self.correlation, observation_times,
+            num_paths, seed=seed, antithetic=antithetic, moment_matching=moment_matching, dtype=dtype)
+        return S * MultiAssetMonteCarloPricer.basket_performance(paths, self.spots, self.basket_type, self.weights)
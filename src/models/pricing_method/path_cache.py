@@ -0,0 +1,90 @@
+# path_cache.py
+
+import threading
+from collections import OrderedDict
+
+
+class PathCache:
+    # Cache de jeux de chemins simulés, partagé par tout le processus (pricers, grecques, courbes).
+    # La clé décrit le modèle, la grille et le flux aléatoire ; l'éviction se fait du moins
+    # récemment utilisé au plus récent jusqu'à repasser sous le budget mémoire en octets.
+    # Les tableaux stockés sont en lecture seule : un appelant qui doit les modifier les copie.
+
+    DEFAULT_MAX_BYTES = 256 * 2**20
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def nbytes(arrays):
+        return sum(array.nbytes for array in arrays)
+
+    def get(self, key, factory):
+        # Renvoie le tuple de tableaux associé à key, calculé par factory() en cas d'absence
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        arrays = tuple(factory())
+        for array in arrays:
+            array.flags.writeable = False
+        self.put(key, arrays)
+        return arrays
+
+    def put(self, key, arrays):
+        size = PathCache.nbytes(arrays)
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= PathCache.nbytes(self.entries.pop(key))
+            # Un jeu plus gros que le budget n'est pas conservé
+            if size > self.max_bytes:
+                return
+            self.entries[key] = arrays
+            self.current_bytes += size
+            self.evict()
+
+    def evict(self):
+        with self.lock:
+            while self.current_bytes > self.max_bytes and self.entries:
+                _, arrays = self.entries.popitem(last=False)
+                self.current_bytes -= PathCache.nbytes(arrays)
+                self.evictions += 1
+
+    def resize(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def metrics(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else float("nan"),
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Instance unique du processus (chaque processus d'un pool a la sienne)
+PATH_CACHE = PathCache()
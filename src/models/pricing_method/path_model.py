@@ -0,0 +1,300 @@
+# path_model.py
+
+import numpy as np
+
+from models.pricing_method.fused_kernels import FusedKernels
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.random_streams import RandomStreams
+
+
+class PathModel:
+    # Dynamique du sous-jacent, vue par MonteCarloEngine à travers deux observations :
+    # simulate_paths (spots aux dates d'observation) et simulate_extrema (spot final et extrema).
+    # Par défaut la dynamique est simulée pas à pas (Heston, volatilité locale...) : une sous-classe
+    # fournit key() et log_increments(), générateur des accroissements du log-spot sur une grille
+    # de dates, pour un spot initial unitaire.
+
+    max_step = 1 / 52
+    # Volatilité Black-Scholes constante, connue seulement pour le GBM (contrôles, BGK)
+    volatility = None
+    # Nombre de chemins d'un modèle lu sur disque (cf. ScenarioModel) : MonteCarloEngine lui
+    # passe alors en `seed` la première ligne de chaque bloc au lieu d'un flux aléatoire
+    stored_paths = None
+
+    def key(self):
+        # Identifiant du modèle dans les clés du cache de chemins
+        raise NotImplementedError
+
+    def log_increments(self, rng, grid, num_paths, r, q, antithetic=False, moment_matching=False,
+                       dtype=np.float64):
+        raise NotImplementedError
+
+    def forward(self, S, r, q, T):
+        # Espérance du spot à T, d'après l'absence d'arbitrage
+        return S * np.exp((r - q) * T)
+
+    def simulation_grid(self, observation_times):
+        # Grille de simulation : dates d'observation, complétées de pas intermédiaires
+        # pour qu'aucun pas ne dépasse max_step. Renvoie la grille et la position des observations.
+        observation_times = np.asarray(observation_times, dtype=float)
+        if np.any(np.diff(observation_times, prepend=0.0) < 0):
+            raise ValueError("observation_times must be non-decreasing and non-negative.")
+
+        grid, indices, previous = [], [], 0.0
+        for time in observation_times:
+            substeps = int(np.ceil((time - previous) / self.max_step - 1e-12))
+            grid.extend(previous + (time - previous) * np.arange(1, substeps + 1) / substeps)
+            indices.append(len(grid))
+            previous = time
+        return np.asarray(grid), np.asarray(indices)
+
+    def simulate_paths(self, S, r, q, observation_times, num_paths, seed=None, antithetic=False,
+                       moment_matching=False, sampling="pseudo", dtype=np.float64, cache=False):
+        # Spots aux dates d'observation, de forme (num_paths, len(observation_times))
+        if sampling != "pseudo":
+            raise ValueError("sampling must be 'pseudo' for a model simulated step by step.")
+        if cache:
+            (unit_paths,) = MonteCarloEngine.cached_paths(
+                self.key() + ("paths", r, q, tuple(observation_times), num_paths, antithetic, moment_matching,
+                              np.dtype(dtype).str), seed,
+                lambda: (self.simulate_paths(1.0, r, q, observation_times, num_paths, seed, antithetic,
+                                             moment_matching, dtype=dtype),))
+            return MonteCarloEngine.scale_paths(unit_paths, S)
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        grid, indices = self.simulation_grid(observation_times)
+
+        # Colonne j+1 = log-rendement après le pas j ; les observations y sont relevées sans copie du chemin
+        log_return = np.zeros(num_paths, dtype=dtype)
+        S_obs = np.empty((num_paths, len(indices)), dtype=dtype)
+        observed = np.searchsorted(indices, 0, side="right")
+        S_obs[:, :observed] = 0.0
+        for step, increment in enumerate(self.log_increments(
+                rng, grid, num_paths, r, q, antithetic, moment_matching, dtype), start=1):
+            log_return += increment
+            end = np.searchsorted(indices, step, side="right")
+            S_obs[:, observed:end] = log_return[:, None]
+            observed = end
+
+        np.exp(S_obs, out=S_obs)
+        S_obs *= dtype.type(np.maximum(S, 1e-8))
+        return S_obs
+
+    def simulate_extrema(self, S, T, r, q, num_paths, time_steps, seed=None, antithetic=False,
+                         moment_matching=False, dtype=np.float64, cache=False):
+        # Spot final, minimum et maximum sur la grille de time_steps pas, en mémoire O(num_paths)
+        if cache:
+            unit_extrema = MonteCarloEngine.cached_paths(
+                self.key() + ("extrema", T, r, q, num_paths, time_steps, antithetic, moment_matching,
+                              np.dtype(dtype).str), seed,
+                lambda: self.simulate_extrema(1.0, T, r, q, num_paths, time_steps, seed, antithetic,
+                                              moment_matching, dtype))
+            return tuple(MonteCarloEngine.scale_paths(unit_S, S) for unit_S in unit_extrema)
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        grid = T * np.arange(1, time_steps + 1) / time_steps
+
+        log_return = np.zeros(num_paths, dtype=dtype)
+        log_min = np.zeros(num_paths, dtype=dtype)
+        log_max = np.zeros(num_paths, dtype=dtype)
+        for increment in self.log_increments(rng, grid, num_paths, r, q, antithetic, moment_matching, dtype):
+            log_return += increment
+            np.minimum(log_min, log_return, out=log_min)
+            np.maximum(log_max, log_return, out=log_max)
+
+        S = dtype.type(np.maximum(S, 1e-8))
+        return S * np.exp(log_return), S * np.exp(log_min), S * np.exp(log_max)
+
+
+class GBMModel(PathModel):
+    # Black-Scholes à volatilité constante : lois exactes aux dates d'observation (Sobol et
+    # pont brownien possibles), extrema pas à pas en mémoire O(num_paths), et probabilité
+    # de survie par pont brownien pour la surveillance continue des barrières.
+    # fused=True : mêmes observations calculées par les noyaux de fused_kernels.py
+    # (un passage par chemin, numba si disponible), sans Sobol ni moment_matching.
+
+    def __init__(self, volatility, fused=False):
+        self.volatility = float(volatility)
+        self.fused = fused
+
+    def key(self):
+        return ("gbm", self.volatility, self.fused)
+
+    def log_increments(self, rng, grid, num_paths, r, q, antithetic=False, moment_matching=False,
+                       dtype=np.float64):
+        sigma = self.volatility
+        for dt in np.diff(grid, prepend=0.0).tolist():
+            increment = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+            increment *= sigma * np.sqrt(dt)
+            increment += (r - q - 0.5 * sigma**2) * dt
+            yield increment
+
+    def simulate_paths(self, S, r, q, observation_times, num_paths, seed=None, antithetic=False,
+                       moment_matching=False, sampling="pseudo", dtype=np.float64, cache=False):
+        simulate = FusedKernels.gbm_paths if self.fused else GBMModel.simulate_gbm_exact
+        return simulate(
+            S, r, self.volatility, q, observation_times, num_paths, seed=seed, antithetic=antithetic,
+            moment_matching=moment_matching, sampling=sampling, dtype=dtype, cache=cache)
+
+    def simulate_extrema(self, S, T, r, q, num_paths, time_steps, seed=None, antithetic=False,
+                         moment_matching=False, dtype=np.float64, cache=False):
+        simulate = FusedKernels.gbm_extrema if self.fused else GBMModel.simulate_gbm_extrema
+        return simulate(
+            S, T, r, self.volatility, q, num_paths, time_steps, seed=seed, antithetic=antithetic,
+            moment_matching=moment_matching, dtype=dtype, cache=cache)
+
+    def simulate_barrier_survival(self, S, T, r, q, num_paths, time_steps, barrier_level, up, seed=None,
+                                  antithetic=False, moment_matching=False, dtype=np.float64, cache=False):
+        simulate = FusedKernels.gbm_barrier_survival if self.fused else GBMModel.simulate_gbm_barrier_survival
+        return simulate(
+            S, T, r, self.volatility, q, num_paths, time_steps, barrier_level, up, seed=seed,
+            antithetic=antithetic, moment_matching=moment_matching, dtype=dtype, cache=cache)
+
+    @staticmethod
+    def simulate_gbm_euler(S, T, r, sigma, q, num_paths, time_steps, seed=None,
+                           antithetic=False, moment_matching=False, sampling="pseudo", dtype=np.float64,
+                           cache=False):
+        if cache:
+            unit_paths, dW = MonteCarloEngine.cached_paths(
+                ("euler", T, r, sigma, q, num_paths, time_steps, antithetic, moment_matching, sampling,
+                 np.dtype(dtype).str), seed,
+                lambda: GBMModel.simulate_gbm_euler(
+                    1.0, T, r, sigma, q, num_paths, time_steps, seed, antithetic, moment_matching, sampling, dtype))
+            return MonteCarloEngine.scale_paths(unit_paths, S), dW
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+
+        dt = T / time_steps
+        dW = MonteCarloEngine.brownian_increments(
+            rng, dt * np.arange(1, time_steps + 1), num_paths, antithetic, moment_matching, sampling, dtype)
+
+        # Construction en place dans la matrice finale : pas de copie hstack
+        S_paths = np.empty((num_paths, time_steps + 1), dtype=dtype)
+        S_paths[:, 0] = S
+        log_S = S_paths[:, 1:]
+        np.multiply(dW, sigma, out=log_S)
+        log_S += (r - q - 0.5 * sigma**2) * dt
+        np.cumsum(log_S, axis=1, out=log_S)
+        log_S += np.log(np.maximum(S, 1e-8))
+        np.exp(log_S, out=log_S)
+
+        return S_paths, dW
+
+    @staticmethod
+    def simulate_gbm_exact(S, r, sigma, q, observation_times, num_paths, seed=None,
+                           antithetic=False, moment_matching=False, sampling="pseudo", dtype=np.float64,
+                           cache=False):
+        # Tirage exact de la loi log-normale aux seules dates d'observation :
+        # une variable gaussienne par date, sans grille d'Euler intermédiaire.
+        if cache:
+            (unit_paths,) = MonteCarloEngine.cached_paths(
+                ("exact", r, sigma, q, tuple(observation_times), num_paths, antithetic, moment_matching,
+                 sampling, np.dtype(dtype).str), seed,
+                lambda: (GBMModel.simulate_gbm_exact(
+                    1.0, r, sigma, q, observation_times, num_paths, seed, antithetic, moment_matching,
+                    sampling, dtype),))
+            return MonteCarloEngine.scale_paths(unit_paths, S)
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+
+        dt = np.diff(np.asarray(observation_times, dtype=float), prepend=0.0)
+        S_obs = MonteCarloEngine.brownian_increments(
+            rng, observation_times, num_paths, antithetic, moment_matching, sampling, dtype)
+        S_obs *= sigma
+        S_obs += ((r - q - 0.5 * sigma**2) * dt).astype(dtype)
+        np.cumsum(S_obs, axis=1, out=S_obs)
+        S_obs += np.log(np.maximum(S, 1e-8))
+        np.exp(S_obs, out=S_obs)
+
+        return S_obs
+
+    @staticmethod
+    def simulate_gbm_extrema(S, T, r, sigma, q, num_paths, time_steps, seed=None,
+                             antithetic=False, moment_matching=False, dtype=np.float64, cache=False):
+        # Schéma pas à pas : seul l'état courant de chaque chemin est conservé
+        # (log-rendement, minimum et maximum courants), soit O(num_paths) en mémoire.
+        # Le cumul porte sur le log-rendement (proche de 0) et non sur le log-spot,
+        # ce qui limite l'erreur d'arrondi en float32.
+        if cache:
+            unit_extrema = MonteCarloEngine.cached_paths(
+                ("extrema", T, r, sigma, q, num_paths, time_steps, antithetic, moment_matching,
+                 np.dtype(dtype).str), seed,
+                lambda: GBMModel.simulate_gbm_extrema(
+                    1.0, T, r, sigma, q, num_paths, time_steps, seed, antithetic, moment_matching, dtype))
+            return tuple(MonteCarloEngine.scale_paths(unit_S, S) for unit_S in unit_extrema)
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+
+        dt = T / time_steps
+        drift = dtype.type((r - q - 0.5 * sigma**2) * dt)
+        diffusion = dtype.type(sigma * np.sqrt(dt))
+
+        log_return = np.zeros(num_paths, dtype=dtype)
+        log_min = np.zeros(num_paths, dtype=dtype)
+        log_max = np.zeros(num_paths, dtype=dtype)
+
+        for _ in range(time_steps):
+            increment = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+            increment *= diffusion
+            increment += drift
+            log_return += increment
+            np.minimum(log_min, log_return, out=log_min)
+            np.maximum(log_max, log_return, out=log_max)
+
+        # Le spot initial fait partie du chemin observé (log_min <= 0 <= log_max)
+        S = dtype.type(np.maximum(S, 1e-8))
+        return S * np.exp(log_return), S * np.exp(log_min), S * np.exp(log_max)
+
+    @staticmethod
+    def simulate_gbm_barrier_survival(S, T, r, sigma, q, num_paths, time_steps, barrier_level, up,
+                                      seed=None, antithetic=False, moment_matching=False, dtype=np.float64,
+                                      cache=False):
+        # Surveillance continue : entre deux dates de la grille, le log-spot conditionné à ses
+        # extrémités x0 et x1 est un pont brownien, qui touche la barrière b avec probabilité
+        # exp(-2 (b - x0)(b - x1) / (sigma^2 dt)). On renvoie le spot final et la probabilité
+        # de ne jamais toucher la barrière sur [0, T], nulle si une date de la grille l'a franchie.
+        if cache:
+            # La survie ne dépend du spot qu'à travers le rapport barrière / spot
+            moneyness = barrier_level / np.maximum(S, 1e-8)
+            unit_final, survival = MonteCarloEngine.cached_paths(
+                ("survival", T, r, sigma, q, num_paths, time_steps, moneyness, up, antithetic, moment_matching,
+                 np.dtype(dtype).str), seed,
+                lambda: GBMModel.simulate_gbm_barrier_survival(
+                    1.0, T, r, sigma, q, num_paths, time_steps, moneyness, up, seed, antithetic,
+                    moment_matching, dtype))
+            return MonteCarloEngine.scale_paths(unit_final, S), survival
+
+        rng = RandomStreams.generator(seed)
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+
+        dt = T / time_steps
+        drift = dtype.type((r - q - 0.5 * sigma**2) * dt)
+        diffusion = dtype.type(sigma * np.sqrt(dt))
+        S = np.maximum(S, 1e-8)
+        # Barrière exprimée en log-rendement depuis le spot initial
+        log_barrier = dtype.type(np.log(barrier_level / S))
+        direction = 1.0 if up else -1.0
+
+        log_return = np.zeros(num_paths, dtype=dtype)
+        distance = np.full(num_paths, max(direction * log_barrier, 0.0), dtype=dtype)
+        survival = np.ones(num_paths, dtype=dtype)
+
+        for _ in range(time_steps):
+            increment = MonteCarloEngine.standard_normals(rng, (num_paths,), antithetic, moment_matching, dtype)
+            increment *= diffusion
+            increment += drift
+            log_return += increment
+
+            next_distance = np.maximum(direction * (log_barrier - log_return), 0.0)
+            crossing = distance * next_distance
+            crossing *= -2.0 / diffusion**2
+            np.exp(crossing, out=crossing)
+            survival *= 1.0 - crossing
+            distance = next_distance
+
+        return dtype.type(S) * np.exp(log_return), survival
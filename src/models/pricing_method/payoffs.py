@@ -0,0 +1,396 @@
+# payoffs.py
+
+import numpy as np
+
+from models.pricing_method.black_scholes import BlackScholesPricer
+
+
+class Payoff:
+    # Produit déclaratif pour MonteCarloEngine : ce qu'il observe sur les chemins (observation),
+    # ce qu'il paie (evaluate) et, le cas échéant, une variable de contrôle d'espérance connue.
+    # Les payoffs sont exprimés à maturité et actualisés par discount.
+
+    def __init__(self, spot, maturity, rate, dividend_yield):
+        self.spot = spot
+        self.maturity = maturity
+        self.rate = rate
+        self.dividend_yield = dividend_yield
+        self.time_steps = None
+
+    @property
+    def discount(self):
+        return np.exp(-self.rate * self.maturity)
+
+    def observation(self, model):
+        # (nature, arguments) de la simulation demandée au modèle
+        raise NotImplementedError
+
+    def evaluate(self, observations, model, control_variate=False):
+        # {"payoffs": ..., "control": ... (si control_variate), "sums": {...}}
+        raise NotImplementedError
+
+    def control_mean(self, model):
+        raise ValueError(f"{type(self).__name__} has no control variate.")
+
+    @staticmethod
+    def black_scholes_volatility(model):
+        # Les contrôles centrés par une formule fermée ne valent que sous le GBM
+        if model.volatility is None:
+            raise ValueError("control_variate relies on Black-Scholes prices and requires a GBM model.")
+        return model.volatility
+
+    @staticmethod
+    def vanilla_payoffs(final_S, strike, type_option):
+        if "call" in type_option:
+            return np.maximum(final_S - strike, 0.0)
+        return np.maximum(strike - final_S, 0.0)
+
+
+class BarrierPayoff(Payoff):
+    # monitoring :
+    # - "discrete" : barrière observée aux seules dates de la grille ;
+    # - "continuous" : correction par pont brownien entre les dates de la grille (GBM) ;
+    # - "bgk" : barrière discrète décalée de exp(+/- 0.5826 sigma sqrt(dt)) vers le spot,
+    #   approximation de Broadie-Glasserman-Kou du prix en surveillance continue (GBM).
+    # Contrôle : l'option vanille européenne de même strike.
+
+    # Constante de Broadie-Glasserman-Kou : -zeta(1/2) / sqrt(2 pi)
+    BGK_BETA = 0.5825971579390106
+
+    def __init__(self, type_option, spot, strike, maturity, rate, dividend_yield,
+                 barrier_level, barrier_type, rebate=0.0, time_steps=200, monitoring="discrete"):
+        super().__init__(spot, maturity, rate, dividend_yield)
+        if monitoring not in ("discrete", "continuous", "bgk"):
+            raise ValueError("monitoring must be 'discrete', 'continuous' or 'bgk'.")
+        self.type_option = type_option
+        self.strike = strike
+        self.barrier_level = barrier_level
+        self.barrier_type = barrier_type
+        self.rebate = rebate
+        self.time_steps = time_steps
+        self.monitoring = monitoring
+
+    def monitored_barrier(self, model):
+        if self.monitoring != "bgk":
+            return self.barrier_level
+        return BarrierPayoff.bgk_barrier(self.barrier_level, "up" in self.barrier_type, model,
+                                         self.maturity, self.time_steps)
+
+    @staticmethod
+    def bgk_barrier(barrier_level, up, model, maturity, time_steps):
+        # Barrière décalée vers le spot de exp(-/+ BGK_BETA sigma sqrt(dt)) ; barrier_level et up
+        # peuvent être des vecteurs (prix par lot)
+        if model.volatility is None:
+            raise ValueError("monitoring='bgk' requires a GBM model.")
+        shift = BarrierPayoff.BGK_BETA * model.volatility * np.sqrt(maturity / time_steps)
+        return barrier_level * np.exp(np.where(up, -shift, shift))
+
+    def observation(self, model):
+        arguments = dict(S=self.spot, T=self.maturity, r=self.rate, q=self.dividend_yield,
+                         time_steps=self.time_steps)
+        if self.monitoring == "continuous":
+            if not hasattr(model, "simulate_barrier_survival"):
+                raise ValueError("monitoring='continuous' requires a GBM model.")
+            return "barrier_survival", dict(arguments, barrier_level=self.barrier_level,
+                                            up="up" in self.barrier_type)
+        return "extrema", arguments
+
+    def evaluate(self, observations, model, control_variate=False):
+        if self.monitoring == "continuous":
+            final_S, survival = observations
+            payoffs = Payoff.vanilla_payoffs(final_S, self.strike, self.type_option)
+            if "in" in self.barrier_type:
+                survival = 1.0 - survival
+            payoffs = payoffs * survival + self.rebate * (1.0 - survival)
+        else:
+            final_S, min_S, max_S = observations
+            payoffs = BarrierPayoff.barrier_payoffs(
+                final_S, min_S, max_S, self.type_option, self.strike, self.monitored_barrier(model),
+                self.barrier_type, self.rebate)
+        control = Payoff.vanilla_payoffs(final_S, self.strike, self.type_option) if control_variate else None
+        return {"payoffs": payoffs, "control": control}
+
+    def control_mean(self, model):
+        return np.exp(self.rate * self.maturity) * BlackScholesPricer.price_vanilla_euro(
+            self.spot, self.strike, self.maturity, self.rate, Payoff.black_scholes_volatility(model),
+            self.dividend_yield, self.type_option)
+
+    @staticmethod
+    def barrier_payoffs(final_S, min_S, max_S, type_option, strike, barrier_level, barrier_type, rebate=0.0):
+        if "up" in barrier_type:
+            crossed = max_S >= barrier_level
+        else:  
+            crossed = min_S <= barrier_level
+
+        if "call" in type_option:
+            payoffs = np.maximum(final_S - strike, 0.0)
+        else:  
+            payoffs = np.maximum(strike - final_S, 0.0)
+
+        if "in" in barrier_type:
+            payoffs[~crossed] = rebate
+        else:
+            payoffs[crossed] = rebate
+        return payoffs
+
+
+class AsianPayoff(Payoff):
+    # Moyenne des spots aux dates d'observation ; contrôle : l'asiatique géométrique sur les mêmes dates.
+
+    def __init__(self, type_option, spot, strike, maturity, rate, dividend_yield, average_type,
+                 observation_frequency):
+        super().__init__(spot, maturity, rate, dividend_yield)
+        self.type_option = type_option
+        self.strike = strike
+        self.average_type = average_type
+        self.observation_times = AsianPayoff.asian_observation_times(maturity, observation_frequency)
+        self.time_steps = len(self.observation_times)
+
+    def observation(self, model):
+        return "paths", dict(S=self.spot, r=self.rate, q=self.dividend_yield,
+                             observation_times=self.observation_times)
+
+    def evaluate(self, observations, model, control_variate=False):
+        payoffs = AsianPayoff.asian_payoffs(observations, self.type_option, self.strike, self.average_type)
+        control = (AsianPayoff.asian_payoffs(observations, self.type_option, self.strike, "geometric")
+                   if control_variate else None)
+        return {"payoffs": payoffs, "control": control}
+
+    def control_mean(self, model):
+        return np.exp(self.rate * self.maturity) * BlackScholesPricer.price_asian_geometric(
+            self.spot, self.strike, self.maturity, self.rate, Payoff.black_scholes_volatility(model),
+            self.dividend_yield, self.observation_times, self.type_option)
+
+    @staticmethod
+    def asian_observation_times(maturity, observation_frequency):
+        if observation_frequency == 'daily':
+            num_observations = round(maturity * 365)
+        elif observation_frequency == 'weekly':
+            num_observations = round(maturity * 52)
+        elif observation_frequency == 'monthly':
+            num_observations = round(maturity * 12)
+        else:
+            raise ValueError("frequency must be 'daily', 'weekly', or 'monthly'.")
+
+        return np.arange(num_observations) * maturity / num_observations
+
+    @staticmethod
+    def averages(observed_prices, average_type):
+        if average_type == "arithmetic":
+            return np.mean(observed_prices, axis=1)
+        elif average_type == "geometric":
+            return np.exp(np.mean(np.log(observed_prices), axis=1))
+        else:
+            raise ValueError("average_type must be 'arithmetic' or 'geometric'.")
+
+    @staticmethod
+    def asian_payoffs(observed_prices, type_option, strike, average_type):
+        averages = AsianPayoff.averages(observed_prices, average_type)
+
+        if type_option == "call":
+            return np.maximum(averages - strike, 0)
+        else:  # put
+            return np.maximum(strike - averages, 0)
+
+
+class LookbackPayoff(Payoff):
+    # Contrôle : vanille européenne au strike fixe, ou à la monnaie pour un strike flottant.
+
+    def __init__(self, type_option, spot, strike, maturity, rate, dividend_yield, strike_type, time_steps=200):
+        super().__init__(spot, maturity, rate, dividend_yield)
+        self.type_option = type_option
+        self.strike = strike
+        self.strike_type = strike_type
+        self.time_steps = time_steps
+
+    @property
+    def control_strike(self):
+        return self.strike if self.strike_type == "fixed" else self.spot
+
+    def observation(self, model):
+        return "extrema", dict(S=self.spot, T=self.maturity, r=self.rate, q=self.dividend_yield,
+                               time_steps=self.time_steps)
+
+    def evaluate(self, observations, model, control_variate=False):
+        final_S, min_S, max_S = observations
+        payoffs = LookbackPayoff.lookback_payoffs(
+            final_S, min_S, max_S, self.type_option, self.strike, self.strike_type)
+        control = Payoff.vanilla_payoffs(final_S, self.control_strike, self.type_option) if control_variate else None
+        return {"payoffs": payoffs, "control": control}
+
+    def control_mean(self, model):
+        return np.exp(self.rate * self.maturity) * BlackScholesPricer.price_vanilla_euro(
+            self.spot, self.control_strike, self.maturity, self.rate, Payoff.black_scholes_volatility(model),
+            self.dividend_yield, self.type_option)
+
+    @staticmethod
+    def lookback_payoffs(final_S, min_S, max_S, type_option, strike, strike_type):
+        if strike_type == "fixed":
+            if type_option == "call":
+                return np.maximum(max_S - strike, 0)
+            else:  
+                return np.maximum(strike - min_S, 0)
+        elif strike_type == "floating":
+            if type_option == "call":
+                return np.maximum(final_S - min_S, 0)
+            else:  
+                return np.maximum(max_S - final_S, 0)
+        else:
+            raise ValueError("strike_type must be 'fixed' or 'floating'.")
+
+
+class AutocallPayoff(Payoff):
+    # Autocall phoenix / athena sur le niveau simulé aux dates d'observation.
+    # Sommes annexes : sorties par date, coupons par date, pertes en capital et niveau final,
+    # pour les probabilités publiées par evaluate_autocall.
+    # Contrôle : le niveau final, d'espérance model.forward(...) quel que soit le modèle.
+
+    def __init__(self, spot, maturity, rate, dividend_yield, coupon, observation_times,
+                 barrier_capital_abs, barrier_coupon_abs, barrier_early_abs, memory_feature=True):
+        super().__init__(spot, maturity, rate, dividend_yield)
+        self.coupon = coupon
+        self.observation_times = observation_times
+        self.barrier_capital_abs = barrier_capital_abs
+        self.barrier_coupon_abs = barrier_coupon_abs
+        self.barrier_early_abs = barrier_early_abs
+        self.memory_feature = memory_feature
+        self.time_steps = len(observation_times)
+
+    def observation(self, model):
+        return "paths", dict(
+            S=self.spot, r=self.rate, q=self.dividend_yield,
+            observation_times=AutocallPayoff.autocall_simulation_times(self.observation_times, self.maturity))
+
+    def evaluate(self, observations, model, control_variate=False):
+        evaluation = AutocallPayoff.autocall_engine(
+            observations, self.observation_times, self.spot, self.maturity, self.rate, self.coupon,
+            self.barrier_capital_abs, self.barrier_coupon_abs, self.barrier_early_abs, self.memory_feature)
+        return {
+            "payoffs": evaluation["payoffs"],
+            "control": observations[:, -1] if control_variate else None,
+            "sums": dict(
+                exit_counts=np.bincount(evaluation["exit_index"], minlength=len(self.observation_times)),
+                coupon_counts=np.sum(evaluation["coupons"], axis=0),
+                capital_losses=np.count_nonzero(evaluation["capital_loss"]),
+                final_levels=np.sum(observations[:, -1], dtype=np.float64)),
+        }
+
+    def control_mean(self, model):
+        return model.forward(self.spot, self.rate, self.dividend_yield, self.maturity)
+
+    @staticmethod
+    def autocall_observation_times(maturity, frequency_per_year):
+        FREQUENCIES = {
+            'annually': 1,
+            'semestrially': 2,
+            'quarterly': 4,
+            'monthly': 12
+        }
+
+        if frequency_per_year not in FREQUENCIES:
+            raise ValueError(f"Fréquence non reconnue : {frequency_per_year}. "
+                            f"Choisir parmi {list(FREQUENCIES.keys())}.")
+
+        obs_per_year = FREQUENCIES[frequency_per_year]
+
+        # Nombre total d'observations
+        total_observations = int(round(obs_per_year * maturity))
+
+        # Dates d'observation en fraction d'années
+        return [(k+1)/obs_per_year for k in range(total_observations)]
+
+    @staticmethod
+    def autocall_simulation_times(observation_times, maturity):
+        # Dates d'observation, plus la maturité si elle n'en fait pas partie :
+        # la dernière colonne simulée correspond toujours au spot final.
+        simulation_times = list(observation_times)
+        if not simulation_times or simulation_times[-1] < maturity:
+            simulation_times.append(maturity)
+        return simulation_times
+
+    @staticmethod
+    def autocall_barriers(spot, barrier_capital, barrier_coupon, barrier_early, type_autocall='phoenix', barriers_as_percentage=True):
+        if type_autocall == 'athena':
+            barrier_coupon = barrier_early 
+
+        if barriers_as_percentage:
+            return (spot * barrier_capital / 100,
+                    spot * barrier_coupon / 100,
+                    spot * barrier_early / 100)
+        return barrier_capital, barrier_coupon, barrier_early
+
+    @staticmethod
+    def memory_coupons(histo_coupon):
+        # Effet mémoire : un coupon versé rattrape les coupons manqués depuis le
+        # dernier paiement. histo_coupon est rangé par date (n_observations, n_chemins) ;
+        # la longueur de la série en cours est tenue pour tous les chemins à la fois.
+        paid = histo_coupon > 0
+        coupons = np.empty(paid.shape)
+        pending = np.ones(paid.shape[1])
+
+        for j in range(paid.shape[0]):
+            np.multiply(paid[j], pending, out=coupons[j])
+            pending += 1
+            np.copyto(pending, 1.0, where=paid[j])
+
+        return coupons
+
+    @staticmethod
+    def autocall_engine(
+            S, observation_times, spot, maturity, rate, coupon,
+            barrier_capital_abs, barrier_coupon_abs, barrier_early_abs, memory_feature=True):
+        # S : spot simulé aux dates d'observation, dernière colonne = spot à maturité.
+        # Les chemins sont traités par masques (vivant, remboursé, perte en capital) ;
+        # seule la boucle sur les dates d'observation reste en Python.
+        num_paths = S.shape[0]
+        num_observations = len(observation_times)
+        last_observation = num_observations - 1
+
+        # Rangement par date pour des accès contigus à chaque observation
+        levels = np.ascontiguousarray(S[:, :num_observations].T)
+
+        # Capitalisation jusqu'à maturité des flux versés à chaque observation
+        tabl_actualisation = np.exp(rate * (maturity - np.asarray(observation_times, dtype=float)))
+
+        resultat = np.zeros(num_paths)
+        alive = np.ones(num_paths, dtype=bool)
+        exit_index = np.full(num_paths, last_observation)
+        histo_coupon = np.zeros((num_observations, num_paths), dtype=bool)
+        capital_loss = np.zeros(num_paths, dtype=bool)
+
+        for j in range(num_observations):
+            S_obs = levels[j]
+
+            np.logical_and(alive, S_obs >= barrier_coupon_abs, out=histo_coupon[j])
+
+            early = alive & (S_obs >= barrier_early_abs)
+            np.copyto(resultat, spot * tabl_actualisation[j], where=early)
+
+            # A la dernière observation les chemins remboursés restent "vivants"
+            # pour le test de protection du capital et le remboursement final
+            if j < last_observation:
+                alive &= ~early
+                np.copyto(exit_index, j, where=early)
+
+            crash = alive & (S_obs <= barrier_capital_abs)
+            np.copyto(resultat, S_obs * tabl_actualisation[j], where=crash)
+            capital_loss |= crash
+
+            if j < last_observation:
+                alive &= ~crash
+                np.copyto(exit_index, j, where=crash)
+
+        if memory_feature:
+            coupons = AutocallPayoff.memory_coupons(histo_coupon)
+        else:
+            coupons = histo_coupon.astype(float)
+
+        np.copyto(resultat, spot, where=alive & (S[:, -1] >= barrier_capital_abs))
+        resultat += coupon * (tabl_actualisation @ coupons)
+
+        return {
+            "payoffs": resultat,
+            "exit_index": exit_index,
+            "coupons": coupons.T,
+            "capital_loss": capital_loss,
+        }
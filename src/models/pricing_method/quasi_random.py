@@ -0,0 +1,78 @@
+# quasi_random.py
+
+import numpy as np
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+from models.pricing_method.random_streams import RandomStreams
+
+
+class QuasiRandom:
+    # Quasi-Monte Carlo randomisé : points de Sobol brouillés (brouillage matriciel linéaire
+    # LMS et décalage numérique aléatoire, cf. scipy.stats.qmc.Sobol),
+    # convertis en gaussiennes puis ordonnés par pont brownien.
+    # Chaque brouillage indépendant donne un estimateur sans biais ; l'erreur standard
+    # s'estime sur la dispersion entre brouillages et non entre chemins.
+
+    @staticmethod
+    def sobol_normals(num_paths, dimension, seed=None):
+        rng = RandomStreams.generator(seed)
+        sampler = qmc.Sobol(d=dimension, scramble=True, seed=rng)
+
+        # Les propriétés d'équirépartition portent sur des puissances de 2 : on tire
+        # le premier bloc de 2^m points couvrant num_paths et on le tronque.
+        m = max(int(np.ceil(np.log2(max(num_paths, 1)))), 0)
+        uniforms = sampler.random_base2(m)[:num_paths]
+        np.clip(uniforms, 1e-12, 1 - 1e-12, out=uniforms)
+        return ndtri(uniforms)
+
+    @staticmethod
+    def bridge_schedule(num_times):
+        # Ordre de construction du pont : date finale d'abord, puis bissections successives
+        # en largeur. Chaque entrée (point, gauche, droite) utilise la dimension suivante
+        # du Sobol ; gauche = -1 désigne l'origine W(0) = 0.
+        schedule = [(num_times - 1, -1, None)]
+        intervals = [(-1, num_times - 1)]
+        while intervals:
+            next_intervals = []
+            for left, right in intervals:
+                if right - left < 2:
+                    continue
+                middle = (left + right + 1) // 2
+                schedule.append((middle, left, right))
+                next_intervals += [(left, middle), (middle, right)]
+            intervals = next_intervals
+        return schedule
+
+    @staticmethod
+    def brownian_bridge(Z, times):
+        # Mouvement brownien aux dates `times` : la première colonne de Z fixe W(T),
+        # les suivantes remplissent les dates intermédiaires de la plus grossière à la plus fine,
+        # de sorte que les premières dimensions du Sobol portent l'essentiel de la variance.
+        times = np.asarray(times, dtype=float)
+        if np.any(np.diff(times, prepend=0.0) < 0):
+            raise ValueError("times must be non-decreasing and non-negative.")
+
+        W = np.empty_like(Z)
+        for column, (point, left, right) in enumerate(QuasiRandom.bridge_schedule(len(times))):
+            if right is None:
+                W[:, point] = np.sqrt(times[point]) * Z[:, column]
+                continue
+
+            t_left = 0.0 if left < 0 else times[left]
+            W_left = 0.0 if left < 0 else W[:, left]
+            span = times[right] - t_left
+            if span <= 0:
+                W[:, point] = W_left
+                continue
+            weight = (times[point] - t_left) / span
+            std = np.sqrt((times[point] - t_left) * (times[right] - times[point]) / span)
+            W[:, point] = W_left + weight * (W[:, right] - W_left) + std * Z[:, column]
+        return W
+
+    @staticmethod
+    def brownian_increments(num_paths, times, seed=None):
+        # Accroissements browniens (déjà multipliés par la racine du pas) sur la grille `times`
+        Z = QuasiRandom.sobol_normals(num_paths, len(times), seed)
+        W = QuasiRandom.brownian_bridge(Z, times)
+        return np.diff(W, axis=1, prepend=0.0)
@@ -0,0 +1,68 @@
+# random_streams.py
+
+import numpy as np
+
+
+class RandomStreams:
+    # Générateurs np.random.Generator indépendants du RandomState global.
+    # Toute fonction Monte Carlo accepte un `seed` qui peut être None, un entier,
+    # une SeedSequence ou directement un np.random.Generator.
+
+    BIT_GENERATORS = {
+        "pcg64": np.random.PCG64,
+        "pcg64dxsm": np.random.PCG64DXSM,
+        "philox": np.random.Philox,
+        "sfc64": np.random.SFC64,
+        "mt19937": np.random.MT19937,
+    }
+
+    @staticmethod
+    def seed_sequence(seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            return seed
+        if isinstance(seed, np.random.Generator):
+            return seed.bit_generator.seed_seq
+        return np.random.SeedSequence(seed)
+
+    @staticmethod
+    def bit_generator_class(seed=None, bit_generator="pcg64"):
+        if isinstance(seed, np.random.Generator):
+            return type(seed.bit_generator)
+        if bit_generator not in RandomStreams.BIT_GENERATORS:
+            raise ValueError(f"bit_generator must be one of {list(RandomStreams.BIT_GENERATORS)}.")
+        return RandomStreams.BIT_GENERATORS[bit_generator]
+
+    @staticmethod
+    def generator(seed=None, bit_generator="pcg64"):
+        if isinstance(seed, np.random.Generator):
+            return seed
+        bit_generator_class = RandomStreams.bit_generator_class(seed, bit_generator)
+        return np.random.Generator(bit_generator_class(RandomStreams.seed_sequence(seed)))
+
+    @staticmethod
+    def spawn(seed, num_streams, bit_generator="pcg64"):
+        # Flux enfants statistiquement indépendants : le flux k ne dépend que de la
+        # graine et de k, donc le résultat ne dépend pas du découpage du travail.
+        bit_generator_class = RandomStreams.bit_generator_class(seed, bit_generator)
+        children = RandomStreams.seed_sequence(seed).spawn(num_streams)
+        return [np.random.Generator(bit_generator_class(child)) for child in children]
+
+    @staticmethod
+    def stream_key(seed=None, bit_generator="pcg64"):
+        # Identifiant reproductible d'un flux, utilisé comme clé du cache de chemins.
+        # None si le flux n'est pas reproductible : graine absente, ou générateur déjà entamé.
+        if seed is None:
+            return None
+        if isinstance(seed, np.random.Generator):
+            bit_generator_class = type(seed.bit_generator)
+            seed_sequence = seed.bit_generator.seed_seq
+            if bit_generator_class(seed_sequence).state != seed.bit_generator.state:
+                return None
+        else:
+            bit_generator_class = RandomStreams.bit_generator_class(seed, bit_generator)
+            seed_sequence = RandomStreams.seed_sequence(seed)
+
+        entropy = seed_sequence.entropy
+        if not isinstance(entropy, int):
+            entropy = tuple(np.atleast_1d(entropy).tolist())
+        return bit_generator_class.__name__, entropy, tuple(seed_sequence.spawn_key)
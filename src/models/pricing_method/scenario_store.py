@@ -0,0 +1,201 @@
+# scenario_store.py
+
+import datetime
+import json
+import os
+
+import numpy as np
+
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.path_model import PathModel
+from models.pricing_method.random_streams import RandomStreams
+
+
+class ScenarioStore:
+    # Jeu de scénarios simulé une fois, écrit sur disque et relu par projection mémoire :
+    # <nom>.npy (matrice chemins x dates, écrite par blocs avec np.lib.format.open_memmap)
+    # et <nom>.json (en-tête : version du format, contenu, modèle, grille, taux, graine).
+    # Deux contenus :
+    # - "paths" : spots à spot unitaire aux dates `times`, pour un modèle et des taux donnés ;
+    #   toute position sur le sous-jacent les relit à son spot, sans simulation ;
+    # - "shocks" : gaussiennes centrées réduites par date, d'où ScenarioModel reconstruit
+    #   des chemins GBM pour toute volatilité et tous taux.
+    # La lecture se fait par blocs de lignes contiguës (vues sans copie de la projection),
+    # la mémoire ne dépend que de la taille des blocs, pas du nombre de chemins stockés.
+    # float32 divise par deux la taille sur disque.
+
+    FORMAT_VERSION = 1
+    CONTENTS = ("paths", "shocks")
+
+    def __init__(self, path):
+        self.path = ScenarioStore.base_path(path)
+        with open(self.path + ".json") as file:
+            self.metadata = json.load(file)
+        if self.metadata.get("format_version") != ScenarioStore.FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported scenario format version "
+                             f"{self.metadata.get('format_version')} (expected {ScenarioStore.FORMAT_VERSION}).")
+
+        self.data = np.load(self.path + ".npy", mmap_mode="r")
+        self.times = np.asarray(self.metadata["times"], dtype=float)
+        if self.data.shape != (self.metadata["num_paths"], len(self.times)):
+            raise ValueError(f"{self.path}: data shape {self.data.shape} does not match its metadata.")
+
+    def __getstate__(self):
+        # Transmis aux processus de calcul par son chemin : chacun rouvre la projection
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    @property
+    def content(self):
+        return self.metadata["content"]
+
+    @property
+    def num_paths(self):
+        return self.metadata["num_paths"]
+
+    def rows(self, start, stop):
+        return self.data[start:stop]
+
+    def chunks(self, chunk_size=None):
+        # Blocs successifs de lignes, vues sans copie du fichier
+        start = 0
+        for size in MonteCarloEngine.chunk_sizes(self.num_paths, chunk_size or MonteCarloEngine.DEFAULT_CHUNK_SIZE):
+            yield self.rows(start, start + size)
+            start += size
+
+    @staticmethod
+    def base_path(path):
+        root, extension = os.path.splitext(os.fspath(path))
+        return root if extension in (".npy", ".json") else os.fspath(path)
+
+    @staticmethod
+    def write(path, times, num_paths, model=None, rate=0.0, dividend_yield=0.0, content="paths", seed=None,
+              chunk_size=None, dtype=np.float64):
+        # Simule et écrit le jeu bloc par bloc (flux enfants de seed, comme MonteCarloEngine.run_blocks),
+        # puis renvoie le ScenarioStore ouvert en lecture. Les fichiers sont remplacés atomiquement.
+        if content not in ScenarioStore.CONTENTS:
+            raise ValueError(f"content must be one of {list(ScenarioStore.CONTENTS)}.")
+        if content == "paths" and model is None:
+            raise ValueError("content='paths' requires a model.")
+        dtype = MonteCarloEngine.simulation_dtype(dtype)
+        times = np.asarray(times, dtype=float)
+        if times.ndim != 1 or len(times) == 0 or np.any(np.diff(times, prepend=0.0) < 0):
+            raise ValueError("times must be a non-empty, non-decreasing array of non-negative dates.")
+
+        base = ScenarioStore.base_path(path)
+        directory = os.path.dirname(base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        sizes = MonteCarloEngine.chunk_sizes(num_paths, chunk_size or MonteCarloEngine.DEFAULT_CHUNK_SIZE)
+        data = np.lib.format.open_memmap(base + ".npy.tmp", mode="w+", dtype=dtype, shape=(num_paths, len(times)))
+        start = 0
+        for size, rng in zip(sizes, RandomStreams.spawn(seed, len(sizes))):
+            if content == "paths":
+                data[start:start + size] = model.simulate_paths(
+                    1.0, rate, dividend_yield, times, size, seed=rng, dtype=dtype)
+            else:
+                rng.standard_normal(out=data[start:start + size], dtype=dtype)
+            start += size
+        data.flush()
+        del data
+
+        metadata = {
+            "format_version": ScenarioStore.FORMAT_VERSION,
+            "content": content,
+            "model": None if model is None else list(model.key()),
+            "volatility": None if model is None else model.volatility,
+            "rate": rate,
+            "dividend_yield": dividend_yield,
+            "times": times.tolist(),
+            "num_paths": num_paths,
+            "dtype": dtype.str,
+            "seed": RandomStreams.stream_key(seed),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(base + ".json.tmp", "w") as file:
+            json.dump(metadata, file, indent=2)
+        os.replace(base + ".npy.tmp", base + ".npy")
+        os.replace(base + ".json.tmp", base + ".json")
+        return ScenarioStore(base)
+
+
+class ScenarioModel(PathModel):
+    # Modèle lu dans un ScenarioStore : MonteCarloEngine.run lui confie des blocs de lignes
+    # contiguës (le `seed` des simulations est alors l'indice de la première ligne du bloc),
+    # répartis comme d'habitude sur n_jobs processus. Les observations demandées doivent
+    # tomber sur la grille stockée ; rien n'est simulé. Pas d'antithétique ni de moment
+    # matching (fixés à l'écriture), dtype des scénarios stockés.
+    # volatility : volatilité des chemins GBM reconstruits depuis des chocs ("shocks").
+
+    def __init__(self, store, volatility=None):
+        self.store = store if isinstance(store, ScenarioStore) else ScenarioStore(store)
+        if self.store.content == "shocks":
+            if volatility is None:
+                raise ValueError("stored shocks require a volatility.")
+            self.volatility = float(volatility)
+        else:
+            self.volatility = self.store.metadata["volatility"]
+
+    @property
+    def stored_paths(self):
+        return self.store.num_paths
+
+    def key(self):
+        return ("scenarios", self.store.path, self.volatility)
+
+    def block_rows(self, first_row, num_paths, antithetic=False, moment_matching=False, sampling="pseudo"):
+        if antithetic or moment_matching or sampling != "pseudo":
+            raise ValueError("stored scenarios do not support antithetic, moment_matching or sampling='sobol'.")
+        first_row = 0 if first_row is None else int(first_row)
+        if first_row + num_paths > self.store.num_paths:
+            raise ValueError(f"only {self.store.num_paths} scenarios are stored.")
+        return self.store.rows(first_row, first_row + num_paths)
+
+    def unit_paths(self, rows, r, q):
+        # Spots à spot unitaire sur la grille stockée
+        if self.store.content == "paths":
+            if not np.isclose(r, self.store.metadata["rate"]) or not np.isclose(q, self.store.metadata["dividend_yield"]):
+                raise ValueError("stored paths were simulated with rate "
+                                 f"{self.store.metadata['rate']} and dividend_yield {self.store.metadata['dividend_yield']}.")
+            return rows
+
+        dt = np.diff(self.store.times, prepend=0.0)
+        sigma = self.volatility
+        paths = np.multiply(rows, (sigma * np.sqrt(dt)).astype(rows.dtype))
+        paths += ((r - q - 0.5 * sigma**2) * dt).astype(rows.dtype)
+        np.cumsum(paths, axis=1, out=paths)
+        np.exp(paths, out=paths)
+        return paths
+
+    def columns(self, observation_times):
+        # Colonnes de la grille stockée correspondant aux dates demandées
+        observation_times = np.asarray(observation_times, dtype=float)
+        columns = np.searchsorted(self.store.times, observation_times - 1e-12)
+        columns = np.minimum(columns, len(self.store.times) - 1)
+        if not np.allclose(self.store.times[columns], observation_times, atol=1e-10):
+            raise ValueError("observation_times must belong to the stored time grid.")
+        if len(columns) == len(self.store.times):
+            return slice(None)
+        return columns
+
+    def simulate_paths(self, S, r, q, observation_times, num_paths, seed=None, antithetic=False,
+                       moment_matching=False, sampling="pseudo", dtype=np.float64, cache=False):
+        rows = self.block_rows(seed, num_paths, antithetic, moment_matching, sampling)
+        unit_paths = self.unit_paths(rows, r, q)[:, self.columns(observation_times)]
+        return np.multiply(unit_paths, np.maximum(S, 1e-8), dtype=unit_paths.dtype)
+
+    def simulate_extrema(self, S, T, r, q, num_paths, time_steps, seed=None, antithetic=False,
+                         moment_matching=False, dtype=np.float64, cache=False):
+        # Extrema sur la grille stockée, qui doit être la grille régulière de time_steps pas jusqu'à T
+        if len(self.store.times) != time_steps or not np.allclose(
+                self.store.times, T * np.arange(1, time_steps + 1) / time_steps):
+            raise ValueError(f"stored time grid does not match {time_steps} regular steps up to T={T}.")
+        unit_paths = self.unit_paths(self.block_rows(seed, num_paths, antithetic, moment_matching), r, q)
+        S = unit_paths.dtype.type(np.maximum(S, 1e-8))
+        # Le spot initial fait partie du chemin observé
+        return (S * unit_paths[:, -1],
+                S * np.minimum(unit_paths.min(axis=1), 1.0),
+                S * np.maximum(unit_paths.max(axis=1), 1.0))
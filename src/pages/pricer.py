@@ -19,6 +19,7 @@ from models.option_models import (
 
 
 from models.plot_tools import Plotter, SmoothedGreek, OptionGraph, GreekPlotter
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
 
 
 option_data = {
@@ -143,6 +144,7 @@ option_data = {
         "class": AsianOption,
         "payoff_function": None,
         "pricing_function": AsianOption.price,
+        "progressive_pricing_function": AsianOption.price_progressive,
         "greek_function": AsianOption.greek,
  
         "graph_price": {"function": Plotter, "add_parameters": {}}, 
@@ -395,6 +397,7 @@ option_data = {
         "class": AutoCallOption,
         "payoff_function": None,
         "pricing_function": AutoCallOption.price,
+        "progressive_pricing_function": AutoCallOption.price_progressive,
         "greek_function": AutoCallOption.prob_tab,
 
         "graph_price": {"function": SmoothedGreek.interpolation, "add_parameters": {"nb_points" : 70,  "percentage"  : 0.1}},
@@ -448,6 +451,7 @@ option_data = {
         "class": AutoCallOption,
         "payoff_function": None,
         "pricing_function": AutoCallOption.price,
+        "progressive_pricing_function": AutoCallOption.price_progressive,
         "greek_function": AutoCallOption.prob_tab,
 
         "graph_price": {"function": SmoothedGreek.interpolation, "add_parameters": {"nb_points" : 70, "percentage"  : 0.1}},
@@ -1321,6 +1325,29 @@ def display_greeks_table(greeks_dict):
     st.dataframe(df)
 
 
+def format_price(price):
+    # Les prix Monte Carlo portent leur erreur standard : on affiche l'IC à 95 %
+    if getattr(price, "std_error", 0) > 0:
+        half_width = price.confidence_interval[1] - float(price)
+        return f'{price:.2f} <span style="font-size: 16px; font-weight: normal;">± {half_width:.2f}</span>'
+    return f"{price:.2f}"
+
+
+def display_progressive_price(estimates):
+    # Estimations Monte Carlo successives affichées en place : un premier prix après quelques
+    # milliers de chemins, puis un intervalle de confiance qui se resserre jusqu'au prix final
+    placeholder = st.empty()
+    for price in estimates:
+        placeholder.markdown(
+            f'<div style="display: flex; justify-content: center; align-items: center; gap: 20px;">'
+            f'<span style="color: #FFB400; font-size: 30px;">Price :</span>'
+            f'<span style="color: white; font-size: 24px; font-weight: bold;">{format_price(price)}</span>'
+            f'<span style="color: #AAAAAA; font-size: 14px;">{price.num_paths:,} paths</span></div>',
+            unsafe_allow_html=True)
+    placeholder.empty()
+    return price
+
+
 def display_price_and_greeks_table(price, greeks):
 
     BLOOMBERG_YELLOW = "#FFB400"
@@ -1375,7 +1402,7 @@ def display_price_and_greeks_table(price, greeks):
         st.markdown('<div class="pg-header">Price :</div>', unsafe_allow_html=True)
 
     with col2:
-        st.markdown(f'<div class="pg-value">{price:.2f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="pg-value">{format_price(price)}</div>', unsafe_allow_html=True)
 
     with col3:
         st.markdown('<div class="pg-header">Greeks :</div>', unsafe_allow_html=True)
@@ -1448,7 +1475,7 @@ def display_price_and_prob_autocall(price, tab1, tab2):
         st.markdown('<div class="pg-header">Price :</div>', unsafe_allow_html=True)
 
     with col2:
-        st.markdown(f'<div class="pg-value">{price:.2f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="pg-value">{format_price(price)}</div>', unsafe_allow_html=True)
 
 
     with col4:
@@ -1818,6 +1845,10 @@ def main():
 
             elif config.get("class") == VanillaOption and config.get("type_option") == "american":
                 pricing_params["type_option"] = "american"
+
+            # Pricing Monte Carlo progressif : premier prix affiché après un petit bloc de chemins
+            if "progressive_pricing_function" in config:
+                pricing_params["first_block"] = MonteCarloEngine.FIRST_BLOCK
             
             # Appel à la fonction de pricing
             try:
@@ -1826,7 +1857,10 @@ def main():
                 option_instance = option_class(**pricing_params)
                 
 
-                price = config["pricing_function"](option_instance)
+                if "progressive_pricing_function" in config:
+                    price = display_progressive_price(config["progressive_pricing_function"](option_instance))
+                else:
+                    price = config["pricing_function"](option_instance)
                 
 
 
@@ -0,0 +1,53 @@
+# test_antithetic.py
+#
+# Appariement des chemins antithétiques : le chemin i et le chemin i + (n+1)//2 sont
+# symétriques (MonteCarloEngine.standard_normals), y compris pour un nombre impair de chemins.
+
+import numpy as np
+import pytest
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.monte_carlo_statistics import PayoffAccumulator
+from models.pricing_method.random_streams import RandomStreams
+
+
+@pytest.mark.parametrize("num_paths", [10, 11])
+def test_samples_pair_mirrored_paths(num_paths):
+    Z = MonteCarloEngine.standard_normals(RandomStreams.generator(0), (num_paths, 1), antithetic=True)[:, 0]
+    samples = PayoffAccumulator.samples(Z, antithetic=True)
+
+    assert len(samples) == (num_paths + 1) // 2
+    # Chaque paire se compense exactement ; le chemin sans symétrique est gardé tel quel
+    np.testing.assert_array_equal(samples[:num_paths // 2], 0.0)
+    if num_paths % 2:
+        assert samples[-1] == Z[num_paths // 2]
+
+
+def test_odd_num_paths_keeps_antithetic_variance_reduction():
+    results = [
+        MonteCarloPricer.price_asian("call", 100.0, 100.0, 1.0, 0.03, 0.2, 0.0, "arithmetic", "monthly",
+                                     num_paths=num_paths, seed=3, antithetic=True)
+        for num_paths in (20000, 20001)
+    ]
+    even, odd = results
+
+    assert odd.variance_reduction_factor > 1.5
+    assert odd.std_error == pytest.approx(even.std_error, rel=0.02)
+    assert odd.variance_reduction_factor == pytest.approx(even.variance_reduction_factor, rel=0.02)
+
+
+def test_odd_blocks_keep_antithetic_variance_reduction():
+    # Blocs de taille impaire d'une simulation par blocs
+    result = MonteCarloPricer.price_asian("call", 100.0, 100.0, 1.0, 0.03, 0.2, 0.0, "arithmetic", "monthly",
+                                          num_paths=20001, seed=3, chunk_size=3999, antithetic=True)
+    assert result.variance_reduction_factor > 1.5
+
+
+def test_antithetic_autocall_probabilities_use_simulated_paths():
+    evaluation = MonteCarloPricer.evaluate_autocall(100.0, 5.0, 0.03, 0.2, 0.01, 5.0, 65.0, 100.0, 80.0,
+                                                    num_paths=20001, seed=2, antithetic=True)
+
+    assert evaluation["redemption_probabilities"].sum() == pytest.approx(1.0)
+    assert np.all(evaluation["coupon_probabilities"] <= 1.0)
+    assert 0.0 < evaluation["capital_loss_probability"] < 1.0
@@ -0,0 +1,83 @@
+# test_autocall.py
+#
+# Moteur d'autocall vectorisé (AutocallPayoff.autocall_engine) comparé aux boucles chemin par
+# chemin de l'implémentation d'origine, appliquées aux mêmes chemins.
+
+import numpy as np
+import pytest
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.path_model import GBMModel
+from models.pricing_method.payoffs import AutocallPayoff
+
+
+def reference_autocall_payoffs(S, observation_times, spot, maturity, rate, coupon,
+                               barrier_capital_abs, barrier_coupon_abs, barrier_early_abs, memory_feature):
+    # Boucles d'origine (verif_coupon, verif_remboursement, verif_capital, memory_app),
+    # S étant relevé aux dates d'observation, dernière colonne à maturité
+    num_paths = S.shape[0]
+    last = len(observation_times) - 1
+    tabl_actualisation = np.exp(rate * (maturity - np.asarray(observation_times)))
+    resultat = np.zeros(num_paths)
+    duree_vie = np.full(num_paths, last)
+    histo_coupon = np.zeros((num_paths, len(observation_times)))
+
+    for j in range(len(observation_times)):
+        for i in range(num_paths):
+            if S[i, j] >= barrier_coupon_abs and duree_vie[i] == last:
+                histo_coupon[i, j] = 1
+        for i in range(num_paths):
+            if S[i, j] >= barrier_early_abs and duree_vie[i] == last:
+                resultat[i] = spot * tabl_actualisation[j]
+                duree_vie[i] = j
+        for i in range(num_paths):
+            if S[i, j] <= barrier_capital_abs and duree_vie[i] == last:
+                resultat[i] = S[i, j] * tabl_actualisation[j]
+                duree_vie[i] = j
+
+    if memory_feature:
+        transformed = histo_coupon.copy()
+        for i in range(num_paths):
+            count = 0
+            for j in range(histo_coupon.shape[1]):
+                if histo_coupon[i, j] == 1:
+                    transformed[i, j] = count + 1
+                    count = 0
+                else:
+                    count += 1
+        histo_coupon = transformed
+
+    tab_coupon = histo_coupon * tabl_actualisation * coupon
+    for i in range(num_paths):
+        if duree_vie[i] == last and S[i, -1] >= barrier_capital_abs:
+            resultat[i] = spot
+        resultat[i] += np.sum(tab_coupon[i, :])
+    return resultat
+
+
+@pytest.mark.parametrize("type_autocall", ["phoenix", "athena"])
+@pytest.mark.parametrize("memory_feature", [True, False])
+def test_vectorised_engine_matches_path_loops(type_autocall, memory_feature):
+    spot, maturity, rate, coupon = 100.0, 3.0, 0.03, 5.0
+    observation_times = AutocallPayoff.autocall_observation_times(maturity, "quarterly")
+    barriers = AutocallPayoff.autocall_barriers(spot, 65.0, 80.0, 100.0, type_autocall)
+    S = GBMModel.simulate_gbm_exact(spot, rate, 0.3, 0.0, observation_times, 2000, seed=8)
+
+    payoffs = AutocallPayoff.autocall_engine(S, observation_times, spot, maturity, rate, coupon,
+                                             *barriers, memory_feature)["payoffs"]
+    expected = reference_autocall_payoffs(S, observation_times, spot, maturity, rate, coupon,
+                                          *barriers, memory_feature)
+    np.testing.assert_allclose(payoffs, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_single_pass_evaluation_tables():
+    evaluation = MonteCarloPricer.evaluate_autocall(100.0, 5.0, 0.03, 0.2, 0.01, 5.0, 65.0, 100.0, 80.0,
+                                                    num_paths=20000, seed=2)
+    price = MonteCarloPricer.price_autocall(100.0, 5.0, 0.03, 0.2, 0.01, 5.0, 65.0, 100.0, 80.0,
+                                            num_paths=20000, seed=2)
+
+    assert float(evaluation["price"]) == float(price)
+    assert evaluation["redemption_probabilities"].sum() == pytest.approx(1.0)
+    assert len(evaluation["coupon_probabilities"]) == len(evaluation["observation_times"])
+    assert 0.0 < evaluation["capital_loss_probability"] < 1.0
+    assert evaluation["observation_times"][0] <= evaluation["expected_maturity"] <= 5.0
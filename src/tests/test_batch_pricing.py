@@ -0,0 +1,80 @@
+# test_batch_pricing.py
+#
+# Prix par lot : mêmes chemins que les pricers à un contrat pour une même graine
+# et un même découpage en blocs, donc mêmes prix.
+
+import numpy as np
+import pytest
+
+from models.pricing_method.heston import HestonModel
+from models.pricing_method.monte_carlo import MonteCarloPricer
+
+
+MARKET = dict(spot=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+STRIKES = [90.0, 100.0, 110.0]
+
+
+def test_asian_batch_matches_single_contract():
+    options = dict(num_paths=20000, seed=1, chunk_size=7000, **MARKET)
+    single = [MonteCarloPricer.price_asian("call", strike=strike, average_type="arithmetic",
+                                           observation_frequency="monthly", **options)
+              for strike in STRIKES]
+    batch = MonteCarloPricer.price_asian_batch({"type_option": ["call"] * 3, "strike": STRIKES},
+                                               observation_frequency="monthly", **options)
+
+    np.testing.assert_allclose(batch["Price"], single, rtol=1e-12)
+    np.testing.assert_allclose(batch["Std. Error"], [price.std_error for price in single], rtol=1e-9)
+
+
+def test_barrier_batch_matches_single_contract():
+    options = dict(num_paths=20000, time_steps=50, seed=1, **MARKET)
+    single = [MonteCarloPricer.price_barrier("put", strike=strike, barrier_level=85.0,
+                                             barrier_type="down-and-out", **options)
+              for strike in STRIKES]
+    batch = MonteCarloPricer.price_barrier_batch(
+        {"type_option": ["put"] * 3, "strike": STRIKES, "barrier_level": [85.0] * 3,
+         "barrier_type": ["down-and-out"] * 3}, **options)
+
+    np.testing.assert_allclose(batch["Price"], single, rtol=1e-12)
+    np.testing.assert_allclose(batch["Std. Error"], [price.std_error for price in single], rtol=1e-9)
+
+
+@pytest.mark.parametrize("dynamics", [dict(model=HestonModel(0.04, 1.5, 0.04, 0.5, -0.7)), dict(fused=True)])
+def test_batch_and_ladder_follow_the_model(dynamics):
+    options = dict(num_paths=10000, time_steps=50, seed=5, **MARKET)
+    single = [MonteCarloPricer.price_barrier("call", strike=strike, barrier_level=125.0, barrier_type="up-and-out",
+                                             **dynamics, **options)
+              for strike in STRIKES]
+    batch = MonteCarloPricer.price_barrier_batch(
+        {"type_option": ["call"] * 3, "strike": STRIKES, "barrier_level": [125.0] * 3,
+         "barrier_type": ["up-and-out"] * 3}, **dynamics, **options)
+    ladder = MonteCarloPricer.price_barrier_strike_ladder("call", strikes=STRIKES, barrier_level=125.0,
+                                                          barrier_type="up-and-out", **dynamics, **options)
+
+    np.testing.assert_allclose(batch["Price"], single, rtol=1e-12)
+    np.testing.assert_allclose(ladder["Price"], single, rtol=1e-12)
+
+
+def test_asian_batch_under_heston():
+    model = HestonModel(0.04, 1.5, 0.04, 0.5, -0.7)
+    options = dict(num_paths=10000, seed=5, observation_frequency="monthly", model=model, **MARKET)
+    single = [MonteCarloPricer.price_asian("put", strike=strike, average_type="arithmetic", **options)
+              for strike in STRIKES]
+    batch = MonteCarloPricer.price_asian_batch({"type_option": ["put"] * 3, "strike": STRIKES}, **options)
+    ladder = MonteCarloPricer.price_asian_strike_ladder("put", strikes=STRIKES, average_type="arithmetic",
+                                                        **options)
+
+    np.testing.assert_allclose(batch["Price"], single, rtol=1e-12)
+    np.testing.assert_allclose(ladder["Price"], single, rtol=1e-12)
+
+
+def test_bgk_batch_matches_single_contract():
+    options = dict(num_paths=10000, time_steps=20, seed=1, monitoring="bgk", **MARKET)
+    single = [MonteCarloPricer.price_barrier("put", strike=strike, barrier_level=85.0,
+                                             barrier_type="down-and-out", **options)
+              for strike in STRIKES]
+    batch = MonteCarloPricer.price_barrier_batch(
+        {"type_option": ["put"] * 3, "strike": STRIKES, "barrier_level": [85.0] * 3,
+         "barrier_type": ["down-and-out"] * 3}, **options)
+
+    np.testing.assert_allclose(batch["Price"], single, rtol=1e-12)
@@ -0,0 +1,56 @@
+# test_fused_kernels.py
+#
+# Noyaux compilés et versions NumPy tirent les mêmes nombres (générateur à compteur) :
+# les deux chemins de code doivent donner les mêmes simulations.
+
+import numpy as np
+import pytest
+
+from models.pricing_method import fused_kernels
+from models.pricing_method.fused_kernels import FusedKernels
+from models.pricing_method.monte_carlo import MonteCarloPricer
+
+
+GBM = dict(S=100.0, r=0.03, sigma=0.2, q=0.01)
+
+SIMULATIONS = {
+    "extrema": lambda: FusedKernels.gbm_extrema(T=1.0, num_paths=5001, time_steps=40, seed=3, antithetic=True, **GBM),
+    "survival": lambda: FusedKernels.gbm_barrier_survival(
+        T=1.0, num_paths=5001, time_steps=40, barrier_level=85.0, up=False, seed=3, **GBM),
+    "paths": lambda: (FusedKernels.gbm_paths(observation_times=[0.25, 0.5, 0.75, 1.0], num_paths=5001, seed=3,
+                                             **GBM),),
+}
+
+
+@pytest.mark.skipif(not fused_kernels.NUMBA_AVAILABLE, reason="numba is not installed")
+@pytest.mark.parametrize("simulation", SIMULATIONS)
+def test_compiled_kernels_match_numpy_fallback(simulation, monkeypatch):
+    compiled = SIMULATIONS[simulation]()
+    monkeypatch.setattr(fused_kernels, "NUMBA_AVAILABLE", False)
+    fallback = SIMULATIONS[simulation]()
+
+    for compiled_array, fallback_array in zip(compiled, fallback):
+        np.testing.assert_allclose(compiled_array, fallback_array, rtol=1e-12)
+
+
+def test_fused_barrier_price_agrees_with_vectorised():
+    options = dict(type_option="put", spot=100.0, strike=100.0, maturity=1.0, rate=0.03, volatility=0.2,
+                   dividend_yield=0.01, barrier_level=85.0, barrier_type="down-and-out", num_paths=50000,
+                   time_steps=50, seed=0)
+    vectorised = MonteCarloPricer.price_barrier(**options)
+    fused = MonteCarloPricer.price_barrier(fused=True, **options)
+
+    # Flux aléatoires différents : accord à l'erreur statistique près
+    assert abs(float(fused) - float(vectorised)) < 4 * np.hypot(fused.std_error, vectorised.std_error)
+
+
+def test_fused_kernels_with_worker_processes():
+    # Noyaux lancés dans le processus principal puis dans les processus de calcul :
+    # même prix qu'en série, sans blocage des processus
+    options = dict(type_option="put", spot=100.0, strike=100.0, maturity=1.0, rate=0.03, volatility=0.2,
+                   dividend_yield=0.01, barrier_level=85.0, barrier_type="down-and-out", num_paths=40000,
+                   time_steps=50, seed=0, chunk_size=10000, fused=True)
+    sequential = MonteCarloPricer.price_barrier(**options)
+    parallel = MonteCarloPricer.price_barrier(n_jobs=2, **options)
+
+    assert float(parallel) == float(sequential)
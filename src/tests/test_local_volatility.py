@@ -0,0 +1,40 @@
+# test_local_volatility.py
+
+import numpy as np
+import pytest
+
+from models.pricing_method.local_volatility import LocalVolatilityModel
+from models.pricing_method.path_cache import PATH_CACHE
+
+
+MATURITIES = [0.25, 0.5, 1.0, 2.0]
+MONEYNESS = [0.7, 0.85, 1.0, 1.15, 1.3]
+
+
+def test_flat_surface_gives_flat_local_volatility():
+    model = LocalVolatilityModel(MATURITIES, MONEYNESS, np.full((4, 5), 0.2))
+    np.testing.assert_allclose(model.local_vols, 0.2, rtol=1e-6)
+
+
+def test_surface_cache_is_separate_from_path_cache():
+    PATH_CACHE.clear()
+    implied_vols = 0.2 + 0.05 * np.abs(np.log(MONEYNESS))[None, :] * np.ones((4, 1))
+    first = LocalVolatilityModel(MATURITIES, MONEYNESS, implied_vols)
+    second = LocalVolatilityModel(MATURITIES, MONEYNESS, implied_vols)
+
+    assert second.local_vols is first.local_vols
+    assert first.surface_key in LocalVolatilityModel.SURFACES
+    assert PATH_CACHE.hits == PATH_CACHE.misses == 0
+    assert len(PATH_CACHE.entries) == 0
+
+
+@pytest.mark.parametrize("num_maturities, num_moneyness", [(2, 5), (4, 3)])
+def test_rejects_grids_too_small_for_dupire_derivatives(num_maturities, num_moneyness):
+    with pytest.raises(ValueError):
+        LocalVolatilityModel(np.linspace(0.5, 2.0, num_maturities), np.linspace(0.8, 1.2, num_moneyness),
+                             np.full((num_maturities, num_moneyness), 0.2))
+
+
+def test_smallest_valid_grid():
+    model = LocalVolatilityModel([0.5, 1.0, 2.0], [0.8, 0.9, 1.1, 1.2], np.full((3, 4), 0.2))
+    np.testing.assert_allclose(model.local_vols, 0.2, rtol=1e-6)
@@ -0,0 +1,84 @@
+# test_monte_carlo_engine.py
+#
+# Reproductibilité : chaque bloc a son propre flux, dérivé de la graine, si bien que le résultat
+# ne dépend ni du nombre de processus ni de l'ordre d'exécution des blocs.
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.monte_carlo_engine import MonteCarloEngine
+from models.pricing_method.monte_carlo_statistics import PayoffAccumulator
+
+
+MARKET = dict(spot=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+
+PRICERS = {
+    "asian": lambda n_jobs: MonteCarloPricer.price_asian(
+        "call", strike=100.0, average_type="arithmetic", observation_frequency="monthly",
+        num_paths=40000, seed=2, chunk_size=10000, n_jobs=n_jobs, antithetic=True, **MARKET),
+    "barrier": lambda n_jobs: MonteCarloPricer.price_barrier(
+        "put", strike=100.0, barrier_level=85.0, barrier_type="down-and-out",
+        num_paths=40000, time_steps=50, seed=2, chunk_size=10000, n_jobs=n_jobs, **MARKET),
+    "autocall": lambda n_jobs: MonteCarloPricer.price_autocall(
+        100.0, 3.0, 0.03, 0.2, 0.01, 5.0, 65.0, 100.0, 80.0,
+        num_paths=40000, seed=2, chunk_size=10000, n_jobs=n_jobs),
+}
+
+
+@pytest.mark.parametrize("pricer", PRICERS)
+def test_results_independent_of_n_jobs(pricer):
+    sequential, parallel = PRICERS[pricer](1), PRICERS[pricer](2)
+    assert float(parallel) == float(sequential)
+    assert parallel.std_error == sequential.std_error
+    assert parallel.num_paths == sequential.num_paths == 40000
+
+
+def counting_block(size, rng):
+    return PayoffAccumulator().add(np.zeros(size)).add_sums(blocks=1)
+
+
+@pytest.mark.parametrize("n_jobs, chunk_size, blocks", [(1, None, 5), (8, None, 8), (8, 250000, 2)])
+def test_default_chunks_give_every_worker_a_block(n_jobs, chunk_size, blocks):
+    accumulator = MonteCarloEngine.run_blocks(counting_block, {}, 500000, chunk_size=chunk_size, seed=0,
+                                              n_jobs=n_jobs)
+    assert int(accumulator.sums["blocks"]) == blocks
+    assert accumulator.raw_count == 500000
+
+
+def test_progressive_estimates_converge_to_requested_paths():
+    estimates = list(MonteCarloPricer.price_asian_progressive(
+        "call", strike=100.0, average_type="arithmetic", observation_frequency="monthly",
+        num_paths=30000, first_block=2000, seed=4, **MARKET))
+
+    paths = [estimate.num_paths for estimate in estimates]
+    assert paths[0] == 2000 and paths[-1] == 30000
+    assert paths == sorted(paths)
+    assert estimates[-1].std_error < estimates[0].std_error
+
+
+def test_progressive_sizes_cover_num_paths():
+    sizes = MonteCarloEngine.progressive_sizes(100000, 2000, 50000)
+    assert sum(sizes) == 100000
+    assert sizes[0] == 2000 and max(sizes) <= 50000
+    assert np.all(np.diff(sizes[:-1]) >= 0)
+
+
+def test_memory_measured_on_request_only():
+    def price(**options):
+        return MonteCarloPricer.price_barrier(
+            "put", strike=100.0, barrier_level=85.0, barrier_type="down-and-out",
+            num_paths=20000, time_steps=50, seed=2, **options, **MARKET)
+
+    assert price().peak_memory is None
+    assert price(measure_memory=True).peak_memory > 0
+
+    # Traçage lancé par l'appelant : laissé actif
+    tracemalloc.start()
+    try:
+        assert price(measure_memory=True).peak_memory > 0
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
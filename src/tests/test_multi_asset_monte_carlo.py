@@ -0,0 +1,20 @@
+# test_multi_asset_monte_carlo.py
+
+import numpy as np
+
+from models.pricing_method.multi_asset_monte_carlo import BasketModel
+from models.pricing_method.path_cache import PATH_CACHE
+
+
+def test_basket_paths_are_cached_at_unit_spot():
+    PATH_CACHE.clear()
+    model = BasketModel([100.0, 50.0], [0.2, 0.3], 0.01, 0.5, basket_type="worst-of")
+    times = [0.5, 1.0]
+
+    direct = model.simulate_paths(100.0, 0.03, 0.0, times, 1000, seed=4)
+    cached = model.simulate_paths(100.0, 0.03, 0.0, times, 1000, seed=4, cache=True)
+    bumped = model.simulate_paths(101.0, 0.03, 0.0, times, 1000, seed=4, cache=True)
+
+    np.testing.assert_allclose(cached, direct, rtol=1e-12)
+    np.testing.assert_allclose(bumped, direct * 1.01, rtol=1e-12)
+    assert PATH_CACHE.misses == 1 and PATH_CACHE.hits == 1
@@ -0,0 +1,41 @@
+# test_path_cache.py
+
+import pytest
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.path_cache import PATH_CACHE
+
+
+MARKET = dict(spot=100.0, strike=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    PATH_CACHE.clear()
+    yield
+    PATH_CACHE.clear()
+
+
+def price_asian(**options):
+    return MonteCarloPricer.price_asian("call", average_type="arithmetic", observation_frequency="monthly",
+                                        num_paths=20000, cache=True, **dict(MARKET, **options))
+
+
+def test_seeded_runs_reuse_cached_paths_across_spots():
+    price_asian(seed=1)
+    price_asian(seed=1, spot=101.0)
+
+    assert PATH_CACHE.misses > 0
+    assert PATH_CACHE.hits == PATH_CACHE.misses
+
+
+def test_unseeded_runs_are_not_cached():
+    for _ in range(3):
+        price_asian(seed=None)
+    MonteCarloPricer.price_barrier_batch(
+        {"type_option": ["put"], "strike": [100.0], "barrier_level": [85.0], "barrier_type": ["down-and-out"]},
+        spot=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01, num_paths=20000,
+        time_steps=20, cache=True)
+
+    assert PATH_CACHE.hits == PATH_CACHE.misses == 0
+    assert PATH_CACHE.current_bytes == 0
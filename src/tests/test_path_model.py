@@ -0,0 +1,18 @@
+# test_path_model.py
+
+import numpy as np
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.path_model import GBMModel
+
+
+def test_pricer_simulate_gbm_euler_delegates_to_model():
+    expected_paths, expected_dW = GBMModel.simulate_gbm_euler(100.0, 1.0, 0.03, 0.2, 0.01, 1001, 12, seed=7,
+                                                              antithetic=True)
+    S_paths, dW = MonteCarloPricer.simulate_gbm_euler(100.0, 1.0, 0.03, 0.2, 0.01, 1001, 12, seed=7,
+                                                      antithetic=True)
+
+    np.testing.assert_array_equal(S_paths, expected_paths)
+    np.testing.assert_array_equal(dW, expected_dW)
+    assert S_paths.shape == (1001, 13)
+    np.testing.assert_array_equal(S_paths[:, 0], 100.0)
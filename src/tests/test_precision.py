@@ -0,0 +1,66 @@
+# test_precision.py
+#
+# Mode float32 : chaque simulateur rend ses tableaux dans le dtype demandé,
+# y compris à travers le cache de chemins et après mise à l'échelle du spot.
+
+import numpy as np
+import pytest
+
+from models.pricing_method.heston import HestonModel
+from models.pricing_method.local_volatility import LocalVolatilityModel
+from models.pricing_method.multi_asset_monte_carlo import BasketModel
+from models.pricing_method.path_cache import PATH_CACHE
+from models.pricing_method.path_model import GBMModel
+from models.pricing_method.scenario_store import ScenarioModel, ScenarioStore
+
+
+TIMES = [0.25, 0.5, 0.75, 1.0]
+
+MODELS = {
+    "gbm": lambda: GBMModel(0.2),
+    "gbm fused": lambda: GBMModel(0.2, fused=True),
+    "heston": lambda: HestonModel(0.04, 1.5, 0.04, 0.5, -0.7),
+    "local volatility": lambda: LocalVolatilityModel([0.5, 1.0, 2.0], [0.8, 0.9, 1.1, 1.2], np.full((3, 4), 0.2)),
+}
+
+
+def simulations(model, dtype, cache):
+    options = dict(seed=1, dtype=dtype, cache=cache)
+    yield from model.simulate_extrema(100.0, 1.0, 0.03, 0.01, 1000, 12, **options)
+    yield model.simulate_paths(100.0, 0.03, 0.01, TIMES, 1000, **options)
+    if isinstance(model, GBMModel):
+        yield from model.simulate_barrier_survival(100.0, 1.0, 0.03, 0.01, 1000, 12, 85.0, False, **options)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("cache", [False, True])
+@pytest.mark.parametrize("model", MODELS)
+def test_model_simulators_keep_dtype(model, dtype, cache):
+    PATH_CACHE.clear()
+    for array in simulations(MODELS[model](), dtype, cache):
+        assert array.dtype == dtype
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_gbm_static_simulators_keep_dtype(dtype):
+    S_paths, dW = GBMModel.simulate_gbm_euler(100.0, 1.0, 0.03, 0.2, 0.01, 1000, 12, seed=1, dtype=dtype)
+    arrays = [S_paths, dW, GBMModel.simulate_gbm_exact(100.0, 0.03, 0.2, 0.01, TIMES, 1000, seed=1, dtype=dtype)]
+    arrays += GBMModel.simulate_gbm_extrema(100.0, 1.0, 0.03, 0.2, 0.01, 1000, 12, seed=1, dtype=dtype)
+    arrays += GBMModel.simulate_gbm_barrier_survival(100.0, 1.0, 0.03, 0.2, 0.01, 1000, 12, 85.0, False,
+                                                     seed=1, dtype=dtype)
+    for array in arrays:
+        assert array.dtype == dtype
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_basket_and_stored_scenarios_keep_dtype(dtype, tmp_path):
+    basket = BasketModel([100.0, 50.0], [0.2, 0.3], 0.01, 0.5)
+    assert basket.simulate_paths(100.0, 0.03, 0.0, TIMES, 1000, seed=1, dtype=dtype).dtype == dtype
+
+    grid = np.arange(1, 13) / 12
+    store = ScenarioStore.write(tmp_path / "gbm", grid, 1000, GBMModel(0.2), rate=0.03, dividend_yield=0.01,
+                                seed=1, dtype=dtype)
+    model = ScenarioModel(store)
+    for array in model.simulate_extrema(100.0, 1.0, 0.03, 0.01, 1000, 12, seed=0):
+        assert array.dtype == dtype
+    assert model.simulate_paths(100.0, 0.03, 0.01, grid, 1000, seed=0).dtype == dtype
@@ -0,0 +1,23 @@
+# test_quasi_random.py
+
+import numpy as np
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.quasi_random import QuasiRandom
+
+
+def test_sobol_normals_reproducible_from_seed():
+    first = QuasiRandom.sobol_normals(1000, 4, seed=11)
+    second = QuasiRandom.sobol_normals(1000, 4, seed=11)
+
+    assert first.shape == (1000, 4)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, QuasiRandom.sobol_normals(1000, 4, seed=12))
+
+
+def test_sobol_asian_price_is_reproducible():
+    price = lambda: MonteCarloPricer.price_asian("call", 100.0, 100.0, 1.0, 0.03, 0.2, 0.0, "arithmetic", "monthly",
+                                                 num_paths=8192, seed=5, sampling="sobol")
+    first, second = price(), price()
+    assert float(first) == float(second)
+    assert first.std_error > 0
@@ -0,0 +1,76 @@
+# test_scenario_store.py
+
+import json
+
+import numpy as np
+import pytest
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+from models.pricing_method.path_model import GBMModel
+from models.pricing_method.payoffs import AsianPayoff
+from models.pricing_method.scenario_store import ScenarioModel, ScenarioStore
+
+
+MARKET = dict(spot=100.0, strike=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+GRID = AsianPayoff.asian_observation_times(1.0, "monthly")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScenarioStore.write(tmp_path / "gbm", GRID, 20000, GBMModel(0.2), rate=0.03, dividend_yield=0.01,
+                               seed=3, chunk_size=5000)
+
+
+def test_write_read_round_trip(store, tmp_path):
+    reopened = ScenarioStore(tmp_path / "gbm.npy")
+
+    assert reopened.num_paths == 20000 and reopened.content == "paths"
+    np.testing.assert_array_equal(reopened.times, GRID)
+    np.testing.assert_array_equal(reopened.rows(0, 20000), store.rows(0, 20000))
+    # Mêmes flux par bloc que la simulation directe
+    expected = GBMModel(0.2).simulate_paths(1.0, 0.03, 0.01, GRID, 5000,
+                                            seed=np.random.SeedSequence(3).spawn(4)[1])
+    np.testing.assert_allclose(reopened.rows(5000, 10000), expected, rtol=1e-12)
+    assert sum(len(chunk) for chunk in reopened.chunks(6000)) == 20000
+
+
+def test_stored_paths_reproduce_direct_pricing(store):
+    # Asiatique mensuelle observée sur toute la grille stockée : mêmes tirages que la simulation directe
+    options = dict(type_option="call", average_type="arithmetic", observation_frequency="monthly",
+                   num_paths=20000, chunk_size=5000, **MARKET)
+    stored = MonteCarloPricer.price_asian(model=ScenarioModel(store), **options)
+    direct = MonteCarloPricer.price_asian(seed=3, **options)
+
+    assert float(stored) == pytest.approx(float(direct), rel=1e-10)
+    assert stored.std_error == pytest.approx(direct.std_error, rel=1e-10)
+
+
+def test_rejects_unknown_format_version(store):
+    with open(store.path + ".json") as file:
+        metadata = json.load(file)
+    metadata["format_version"] = ScenarioStore.FORMAT_VERSION + 1
+    with open(store.path + ".json", "w") as file:
+        json.dump(metadata, file)
+
+    with pytest.raises(ValueError):
+        ScenarioStore(store.path)
+
+
+def test_rejects_more_paths_than_stored(store):
+    with pytest.raises(ValueError):
+        MonteCarloPricer.price_barrier(type_option="put", barrier_level=85.0, barrier_type="down-and-out",
+                                       num_paths=20001, time_steps=50, model=ScenarioModel(store), **MARKET)
+
+
+def test_stored_paths_price_batches_and_ladders(store):
+    strikes = [95.0, 105.0]
+    options = dict(observation_frequency="monthly", num_paths=20000, chunk_size=5000,
+                   **{name: value for name, value in MARKET.items() if name != "strike"})
+    batch = MonteCarloPricer.price_asian_batch({"type_option": ["call"] * 2, "strike": strikes},
+                                               model=ScenarioModel(store), **options)
+    ladder = MonteCarloPricer.price_asian_strike_ladder("call", strikes=strikes, average_type="arithmetic",
+                                                        model=ScenarioModel(store), **options)
+    direct = MonteCarloPricer.price_asian_batch({"type_option": ["call"] * 2, "strike": strikes}, seed=3, **options)
+
+    np.testing.assert_allclose(batch["Price"], direct["Price"], rtol=1e-10)
+    np.testing.assert_allclose(ladder["Price"], direct["Price"], rtol=1e-10)
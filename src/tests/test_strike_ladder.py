@@ -0,0 +1,81 @@
+# test_strike_ladder.py
+#
+# Échelles de strikes (tri et sommes cumulées) : mêmes prix que les pricers à un strike
+# évalués sur les mêmes chemins.
+
+import numpy as np
+
+from models.pricing_method.monte_carlo import MonteCarloPricer
+
+
+MARKET = dict(spot=100.0, maturity=1.0, rate=0.03, volatility=0.2, dividend_yield=0.01)
+STRIKES = [90.0, 100.0, 110.0]
+
+
+def test_asian_ladder_matches_single_strike():
+    options = dict(num_paths=20000, seed=1, chunk_size=7000, **MARKET)
+    single = [MonteCarloPricer.price_asian("call", strike=strike, average_type="arithmetic",
+                                           observation_frequency="monthly", **options)
+              for strike in STRIKES]
+    ladder = MonteCarloPricer.price_asian_strike_ladder("call", strikes=STRIKES, average_type="arithmetic",
+                                                        observation_frequency="monthly", **options)
+
+    np.testing.assert_allclose(ladder["Price"], single, rtol=1e-12)
+    np.testing.assert_allclose(ladder["Std. Error"], [price.std_error for price in single], rtol=1e-9)
+
+
+def test_barrier_ladder_matches_single_strike():
+    options = dict(num_paths=20000, time_steps=50, seed=1, **MARKET)
+    single = [MonteCarloPricer.price_barrier("put", strike=strike, barrier_level=85.0,
+                                             barrier_type="down-and-out", **options)
+              for strike in STRIKES]
+    ladder = MonteCarloPricer.price_barrier_strike_ladder("put", strikes=STRIKES, barrier_level=85.0,
+                                                          barrier_type="down-and-out", **options)
+
+    np.testing.assert_allclose(ladder["Price"], single, rtol=1e-12)
+
+
+def test_lookback_ladder_matches_single_strike():
+    options = dict(num_paths=20000, time_steps=50, seed=1, **MARKET)
+    single = [MonteCarloPricer.price_lookback("call", strike=strike, strike_type="fixed", **options)
+              for strike in STRIKES]
+    ladder = MonteCarloPricer.price_lookback_strike_ladder("call", strikes=STRIKES, **options)
+
+    np.testing.assert_allclose(ladder["Price"], single, rtol=1e-12)
+
+
+def test_antithetic_ladders_match_single_strike():
+    # Nombre de chemins impair et blocs impairs : chemin du milieu non apparié dans chaque bloc
+    asian_options = dict(num_paths=20001, seed=3, chunk_size=6667, antithetic=True, **MARKET)
+    options = dict(asian_options, time_steps=50)
+    cases = {
+        "asian": (
+            lambda strike: MonteCarloPricer.price_asian(
+                "put", strike=strike, average_type="arithmetic", observation_frequency="monthly",
+                **asian_options),
+            lambda: MonteCarloPricer.price_asian_strike_ladder(
+                "put", strikes=STRIKES, average_type="arithmetic", observation_frequency="monthly",
+                **asian_options)),
+        "lookback": (
+            lambda strike: MonteCarloPricer.price_lookback("call", strike=strike, strike_type="fixed", **options),
+            lambda: MonteCarloPricer.price_lookback_strike_ladder("call", strikes=STRIKES, **options)),
+        "barrier": (
+            lambda strike: MonteCarloPricer.price_barrier(
+                "call", strike=strike, barrier_level=120.0, barrier_type="up-and-out", rebate=1.5, **options),
+            lambda: MonteCarloPricer.price_barrier_strike_ladder(
+                "call", strikes=STRIKES, barrier_level=120.0, barrier_type="up-and-out", rebate=1.5, **options)),
+        "continuous barrier": (
+            lambda strike: MonteCarloPricer.price_barrier(
+                "put", strike=strike, barrier_level=85.0, barrier_type="down-and-in", rebate=1.5,
+                monitoring="continuous", **options),
+            lambda: MonteCarloPricer.price_barrier_strike_ladder(
+                "put", strikes=STRIKES, barrier_level=85.0, barrier_type="down-and-in", rebate=1.5,
+                monitoring="continuous", **options)),
+    }
+
+    for single_pricer, ladder_pricer in cases.values():
+        single = [single_pricer(strike) for strike in STRIKES]
+        ladder = ladder_pricer()
+
+        np.testing.assert_allclose(ladder["Price"], single, rtol=1e-10)
+        np.testing.assert_allclose(ladder["Std. Error"], [price.std_error for price in single], rtol=1e-7)